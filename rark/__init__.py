@@ -1,12 +1,24 @@
+from .core.admission import AdmissionError, AdmissionPolicy
+from .core.preemption import Preemption, PreemptionPolicy
 from .core.runner import SkillRunner
+from .core.scheduler import AgingPolicy
 from .core.task import Task
 from .core.events import Event, EventType
 from .core.transitions import LifecycleState
+from .persistence.blobs import Blob
+from .persistence.retention import RetentionPolicy
 
 __all__ = [
     "SkillRunner",
+    "AgingPolicy",
     "Task",
     "Event",
     "EventType",
     "LifecycleState",
+    "RetentionPolicy",
+    "Blob",
+    "AdmissionPolicy",
+    "AdmissionError",
+    "PreemptionPolicy",
+    "Preemption",
 ]
@@ -0,0 +1,157 @@
+"""
+Interrupt latency while the HTTP API is saturated
+=================================================
+
+A long-running skill is active while concurrent clients hammer
+``POST /tasks`` and ``GET /tasks/{id}`` through the ASGI app; then a sensor
+thread fires an interrupt straight into the kernel. The benchmark measures
+the time from the interrupt until the active skill has been cancelled.
+
+Runs once with the kernel sharing the server's event loop (the default
+lifespan) and once with ``create_app(runner, threaded=True)``, where the
+kernel runs on its own thread and loop.
+
+    python -m rark.benchmarks.api_saturation
+    python -m rark.benchmarks.api_saturation --clients 64 --interrupts 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+from rark.server import create_app
+
+# Enough nested metadata that validation and JSON encoding cost something.
+PAYLOAD = {
+    "waypoints": [{"x": i * 0.1, "y": i * 0.2, "theta": i * 0.01} for i in range(50)],
+    "note": "pick up the cup on the left of the sink",
+}
+
+
+async def measure_once(
+    threaded: bool, clients: int, warmup: float, db_path: str
+) -> Tuple[float, float]:
+    """Return (interrupt latency in seconds, API requests per second)."""
+    runner = SkillRunner(db_path=db_path)
+    active = threading.Event()
+    preempted = threading.Event()
+    stamps: Dict[str, object] = {}
+
+    @runner.skill("avoid_obstacle")
+    async def avoid_obstacle(task: Task) -> None:
+        pass
+
+    @runner.skill("plan_step")
+    async def plan_step(task: Task) -> None:
+        pass
+
+    @runner.skill("hold")
+    async def hold(task: Task) -> None:
+        stamps["loop"] = asyncio.get_running_loop()  # whichever loop runs the kernel
+        active.set()
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            stamps["preempted"] = time.perf_counter()
+            preempted.set()
+            raise
+
+    def sensor() -> float:
+        t0 = time.perf_counter()
+        asyncio.run_coroutine_threadsafe(
+            runner.interrupt(Task(name="avoid_obstacle", priority=10)),
+            stamps["loop"],
+        )
+        preempted.wait()
+        return stamps["preempted"] - t0
+
+    async def on_kernel(coro) -> None:
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, stamps["loop"]))
+
+    app = create_app(runner, threaded=threaded)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            await c.post("/tasks", json={"name": "hold", "priority": 9})
+            await asyncio.to_thread(active.wait)
+
+            requests = 0
+            flooding = True
+
+            async def client() -> None:
+                nonlocal requests
+                while flooding:
+                    r = await c.post(
+                        "/tasks",
+                        json={"name": "plan_step", "priority": 1, "metadata": PAYLOAD},
+                    )
+                    await c.get(f"/tasks/{r.json()['id']}")
+                    requests += 2
+                    await asyncio.sleep(0)  # ASGITransport never yields; a socket would
+
+            flood = [asyncio.create_task(client()) for _ in range(clients)]
+            t_flood = time.perf_counter()
+            await asyncio.sleep(warmup)
+            active.clear()
+            latency = await asyncio.to_thread(sensor)
+            flooding = False
+            await asyncio.gather(*flood)
+            rate = requests / (time.perf_counter() - t_flood)
+
+            await asyncio.to_thread(active.wait)  # hold resumed after the interrupt
+            await on_kernel(runner._queue.join())  # drain before closing the store
+            await on_kernel(runner._cancel_running_skill())
+    return latency, rate
+
+
+async def run(
+    threaded: bool, clients: int, warmup: float, rounds: int, db_dir: str
+) -> Tuple[List[float], List[float]]:
+    latencies, rates = [], []
+    for i in range(rounds):
+        db_path = os.path.join(db_dir, f"threaded-{threaded}-{i}.db")
+        latency, rate = await measure_once(threaded, clients, warmup, db_path)
+        latencies.append(latency)
+        rates.append(rate)
+    return latencies, rates
+
+
+def _summary(latencies: List[float], rates: List[float]) -> str:
+    ms = sorted(x * 1000 for x in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    return (
+        f"median {statistics.median(ms):8.2f} ms   p99 {p99:8.2f} ms"
+        f"   API {statistics.median(rates):8,.0f} req/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--warmup", type=float, default=0.3, help="seconds of load")
+    parser.add_argument("--interrupts", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        print(f"{args.interrupts} interrupts under {args.clients} saturating clients")
+        for threaded in (False, True):
+            latencies, rates = await run(
+                threaded, args.clients, args.warmup, args.interrupts, db_dir
+            )
+            label = "kernel thread" if threaded else "shared loop"
+            print(f"{label:>13}: {_summary(latencies, rates)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
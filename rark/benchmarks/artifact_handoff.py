@@ -0,0 +1,95 @@
+"""
+Handoff cost between dependent skills, metadata vs shared-memory artifact
+=========================================================================
+
+``detect_object`` hands a float32 point cloud (``--mb`` megabytes) to
+``grasp_object``, which is blocked by it. Through metadata the cloud is
+stored as a JSON list, written to SQLite with the task row and decoded again
+by the consumer. Through an artifact the producer copies it once into a
+shared-memory segment (``task.publish()``) and the consumer gets a zero-copy
+view (``task.artifacts``).
+
+Times cover the producer's write plus the consumer's access to the data.
+
+    python -m rark.benchmarks.artifact_handoff
+    python -m rark.benchmarks.artifact_handoff --mb 16 --rounds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from array import array
+from typing import List
+
+from rark.core.artifacts import ArtifactStore
+from rark.core.task import Task
+from rark.persistence.sqlite_store import SQLiteStore
+
+
+async def via_metadata(cloud: array, rounds: int, db_path: str) -> List[float]:
+    store = SQLiteStore(db_path)
+    await store.open()
+    times = []
+    try:
+        for _ in range(rounds):
+            producer = Task(name="detect_object", priority=5)
+            t0 = time.perf_counter()
+            producer.metadata["cloud"] = cloud.tolist()
+            await store.upsert(producer)
+            loaded = await store.get(producer.id)
+            received = array("f", loaded.metadata["cloud"])
+            times.append(time.perf_counter() - t0)
+            assert len(received) == len(cloud)
+    finally:
+        await store.close()
+    return times
+
+
+def via_artifact(cloud: array, rounds: int) -> List[float]:
+    artifacts = ArtifactStore()
+    times = []
+    try:
+        for i in range(rounds):
+            producer, consumer = f"detect-{i}", f"grasp-{i}"
+            artifacts.link(consumer, [producer])
+            t0 = time.perf_counter()
+            artifacts.publish(producer, "cloud", cloud)
+            received = artifacts.views(consumer)["cloud"]
+            times.append(time.perf_counter() - t0)
+            assert len(received) == len(cloud)
+            received.release()
+            artifacts.finish(producer)
+            artifacts.finish(consumer)
+    finally:
+        artifacts.close()
+    return times
+
+
+def _summary(times: List[float]) -> str:
+    ms = [x * 1000 for x in times]
+    return f"median {statistics.median(ms):8.2f} ms   max {max(ms):8.2f} ms"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=float, default=4.0, help="cloud size in MB")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    points = int(args.mb * 1024 * 1024 / 4)
+    cloud = array("f", (i * 0.001 for i in range(points)))
+
+    print(f"{args.mb:g} MB float32 cloud, {args.rounds} handoffs")
+    with tempfile.TemporaryDirectory() as tmp:
+        times = await via_metadata(cloud, args.rounds, os.path.join(tmp, "handoff.db"))
+    print(f"  metadata: {_summary(times)}")
+    print(f"  artifact: {_summary(via_artifact(cloud, args.rounds))}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
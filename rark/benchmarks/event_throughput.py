@@ -0,0 +1,66 @@
+"""
+Kernel event throughput under bursty submits
+============================================
+
+A planner enqueues a burst of ``TASK_SUBMIT`` events and the benchmark times
+``run_loop`` until the queue has drained, once handling one event per round
+(``max_batch=1``) and once draining the queue in batches whose store writes
+share one transaction.
+
+    python -m rark.benchmarks.event_throughput
+    python -m rark.benchmarks.event_throughput --burst 5000 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from rark.core.events import Event, EventType
+from rark.core.kernel import RARKKernel
+from rark.core.task import Task
+
+
+async def measure_once(max_batch: int, burst: int, db_path: str) -> float:
+    kernel = RARKKernel(db_path=db_path, crash_policy="fail", max_batch=max_batch)
+    await kernel.start()
+    for i in range(burst):
+        task = Task(name="plan_step", priority=i % 10)
+        await kernel.emit(Event(type=EventType.TASK_SUBMIT, payload={"task": task}))
+
+    t0 = time.perf_counter()
+    loop_task = asyncio.create_task(kernel.run_loop())
+    await kernel._queue.join()
+    elapsed = time.perf_counter() - t0
+
+    kernel._running = False
+    await loop_task
+    await kernel.stop()
+    return burst / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--burst", type=int, default=2000, help="submits per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        print(f"{args.rounds} rounds of {args.burst} submits")
+        for max_batch in (1, 256):
+            rates = [
+                await measure_once(
+                    max_batch, args.burst, os.path.join(db_dir, f"b{max_batch}-{i}.db")
+                )
+                for i in range(args.rounds)
+            ]
+            label = f"max_batch={max_batch}"
+            print(f"{label:>14}: median {statistics.median(rates):>10,.0f} events/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Interrupt-to-preemption latency under submit load
+=================================================
+
+A long-running skill is active while a planner floods the kernel with
+``TASK_SUBMIT`` events, then an obstacle interrupt fires. The benchmark
+measures the time from ``runner.interrupt()`` until the active
+skill has been cancelled (i.e. the robot has been told to stop).
+
+Runs once with a single FIFO event queue and once with event lanes.
+
+    python -m rark.benchmarks.interrupt_latency
+    python -m rark.benchmarks.interrupt_latency --burst 500 --interrupts 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+
+
+async def measure_once(event_lanes: bool, burst: int, db_path: str) -> float:
+    runner = SkillRunner(db_path=db_path, event_lanes=event_lanes)
+    active = asyncio.Event()
+    preempted = asyncio.Event()
+
+    @runner.skill("avoid_obstacle")
+    async def avoid_obstacle(task: Task) -> None:
+        pass
+
+    @runner.skill("work")
+    async def work(task: Task) -> None:
+        active.set()
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            preempted.set()
+            raise
+
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+
+    await runner.submit(Task(name="work", priority=9))
+    await active.wait()
+    for _ in range(burst):
+        await runner.submit(Task(name="work", priority=1))
+    t0 = time.perf_counter()
+    await runner.interrupt(Task(name="avoid_obstacle", priority=10))
+    await preempted.wait()
+    latency = time.perf_counter() - t0
+
+    await runner._queue.join()  # let the backlog drain before closing the store
+    # Same shutdown order as KernelThread._serve: let run_loop finish its
+    # round so nothing is still writing when the store closes.
+    runner._running = False
+    await loop_task
+    await runner._cancel_running_skill()
+    await runner.stop()
+    return latency
+
+
+async def run(
+    event_lanes: bool, burst: int, rounds: int, db_dir: str
+) -> List[float]:
+    latencies = []
+    for i in range(rounds):
+        db_path = os.path.join(db_dir, f"lanes-{event_lanes}-{i}.db")
+        latencies.append(await measure_once(event_lanes, burst, db_path))
+    return latencies
+
+
+def _summary(latencies: List[float]) -> str:
+    ms = sorted(x * 1000 for x in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    return f"median {statistics.median(ms):8.2f} ms   p99 {p99:8.2f} ms"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--burst", type=int, default=200, help="submits per round")
+    parser.add_argument("--interrupts", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        print(f"{args.interrupts} interrupts, each behind {args.burst} submits")
+        for lanes in (False, True):
+            latencies = await run(lanes, args.burst, args.interrupts, db_dir)
+            label = "event lanes" if lanes else "single FIFO"
+            print(f"{label:>12}: {_summary(latencies)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
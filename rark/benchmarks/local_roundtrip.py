@@ -0,0 +1,98 @@
+"""
+Local command channel round-trip latency
+========================================
+
+Times request/reply round trips over the Unix-socket msgpack channel
+(``rark.local``) and, for reference, the same calls through the FastAPI
+app over ``httpx.ASGITransport``. The ASGI figures skip the TCP socket and
+HTTP parsing in uvicorn entirely, so they are a lower bound for real HTTP.
+
+Client and server share one event loop, so each round trip includes both
+sides' work.
+
+    python -m rark.benchmarks.local_roundtrip
+    python -m rark.benchmarks.local_roundtrip --calls 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+from rark.local import LocalClient, serve_unix
+from rark.server import create_app
+
+
+async def _time(call: Callable[[], Awaitable[object]], calls: int) -> List[float]:
+    for _ in range(min(calls, 200)):  # warm up
+        await call()
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def _summary(samples: List[float]) -> str:
+    us = sorted(x * 1e6 for x in samples)
+    p99 = us[min(len(us) - 1, int(len(us) * 0.99))]
+    return f"median {statistics.median(us):8.1f} µs   p99 {p99:8.1f} µs"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Repeat interrupts coalesce into the first one, so the timed calls
+        # measure the channel rather than preemption churn.
+        runner = SkillRunner(db_path=os.path.join(tmp, "rark.db"), interrupt_window=3600)
+
+        @runner.skill("hold")
+        @runner.skill("stop")
+        async def hold(task: Task) -> None:
+            await asyncio.sleep(3600)
+
+        await runner.start()
+        loop_task = asyncio.create_task(runner.run_loop())
+        server = await serve_unix(runner, os.path.join(tmp, "rark.sock"))
+        client = await LocalClient.connect(os.path.join(tmp, "rark.sock"))
+        task = await client.submit("hold", priority=5)
+
+        transport = httpx.ASGITransport(app=create_app(runner))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            rows = [
+                ("uds get", lambda: client.get(task["id"])),
+                ("uds interrupt", lambda: client.interrupt("stop")),
+                ("asgi get", lambda: c.get(f"/tasks/{task['id']}")),
+                (
+                    "asgi interrupt",
+                    lambda: c.post("/interrupt", json={"name": "stop"}),
+                ),
+            ]
+            print(f"{args.calls} calls each")
+            for label, call in rows:
+                print(f"{label:>15}: {_summary(await _time(call, args.calls))}")
+
+        await client.close()
+        server.close()
+        await server.wait_closed()
+        await runner._queue.join()
+        await runner._cancel_running_skill()
+        await runner.stop()
+        loop_task.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
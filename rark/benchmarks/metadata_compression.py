@@ -0,0 +1,122 @@
+"""
+Metadata encoding: database size, upsert latency and recovery time
+==================================================================
+
+Checkpoint-heavy skills rewrite a large, repetitive ``metadata`` payload (a
+trajectory log here) on every checkpoint. Each configuration upserts
+``--tasks`` tasks ``--checkpoints`` times each, one commit per upsert as
+task.checkpoint() does, and then measures the database size (after a WAL
+checkpoint) and the time a fresh store takes to open and ``load_all()``,
+as in crash recovery.
+
+    python -m rark.benchmarks.metadata_compression
+    python -m rark.benchmarks.metadata_compression --tasks 500 --points 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from rark.core.task import Task
+from rark.persistence.sqlite_store import SQLiteStore
+
+CONFIGS: List[Tuple[str, Optional[str]]] = [
+    ("json", None),
+    ("json", "zlib"),
+    ("json", "zlib-dict"),
+    ("msgpack", None),
+    ("msgpack", "zlib-dict"),
+]
+SKILLS = ("wipe_table", "pour_water", "fold_towel")
+
+
+def _trajectory(rng: random.Random, points: int) -> List[Dict]:
+    return [
+        {
+            "t": round(i * 0.02, 2),
+            "joints": [round(rng.uniform(-3.14, 3.14), 3) for _ in range(6)],
+            "gripper": "closed" if i % 3 else "open",
+            "status": "ok",
+        }
+        for i in range(points)
+    ]
+
+
+async def measure(
+    metadata_format: str,
+    metadata_codec: Optional[str],
+    tasks: int,
+    checkpoints: int,
+    points: int,
+    db_path: str,
+    seed: int,
+) -> Tuple[List[float], int, float]:
+    """Return (upsert latencies in seconds, database bytes, recovery seconds)."""
+    rng = random.Random(seed)
+    options = {"metadata_format": metadata_format, "metadata_codec": metadata_codec}
+    store = SQLiteStore(db_path, **options)
+    await store.open()
+    latencies = []
+    for i in range(tasks):
+        task = Task(name=SKILLS[i % len(SKILLS)], priority=5)
+        for stage in range(checkpoints):
+            task.metadata = {"stage": stage, "trajectory": _trajectory(rng, points)}
+            t0 = time.perf_counter()
+            await store.upsert(task)
+            latencies.append(time.perf_counter() - t0)
+    await store.checkpoint("TRUNCATE")
+    await store.close()
+    size = os.path.getsize(db_path)
+
+    t0 = time.perf_counter()
+    store = SQLiteStore(db_path, **options)
+    await store.open()
+    loaded = await store.load_all()
+    recovery = time.perf_counter() - t0
+    await store.close()
+    assert len(loaded) == tasks
+    return latencies, size, recovery
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--checkpoints", type=int, default=5, help="upserts per task")
+    parser.add_argument("--points", type=int, default=200, help="trajectory length")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.tasks} tasks x {args.checkpoints} checkpoints,"
+        f" {args.points}-point trajectories"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for metadata_format, metadata_codec in CONFIGS:
+            label = f"{metadata_format}/{metadata_codec or 'none'}"
+            latencies, size, recovery = await measure(
+                metadata_format,
+                metadata_codec,
+                args.tasks,
+                args.checkpoints,
+                args.points,
+                os.path.join(tmp, label.replace("/", "-") + ".db"),
+                args.seed,
+            )
+            ms = sorted(x * 1000 for x in latencies)
+            p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+            print(
+                f"{label:>18}: db {size / 1024:8.0f} KiB"
+                f"   upsert median {statistics.median(ms):6.2f} ms   p99 {p99:6.2f} ms"
+                f"   recovery {recovery * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Preemption latency vs redone work, hard cancel vs grace period
+==============================================================
+
+A skill works through fixed-length steps (``--step`` seconds each, e.g. one
+wipe stroke) and marks a safe point after every step. Interrupts arrive at
+random moments. With a hard cancel (``preempt_grace=0``) the step in flight
+is lost and, since the arm stopped mid-motion, it has to re-home
+(``--rehome`` seconds) before resuming. With a grace period the skill
+finishes its step, parks and yields, so nothing is redone, at the cost of
+waiting for the step to end.
+
+Latency is measured from ``runner.interrupt()`` until the skill has
+stopped; redone work is lost partial steps plus re-homing, per interrupt.
+
+    python -m rark.benchmarks.preemption_grace
+    python -m rark.benchmarks.preemption_grace --step 0.05 --interrupts 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+
+
+async def measure(
+    grace: float, interrupts: int, step: float, rehome: float, db_path: str, seed: int
+) -> Tuple[List[float], float]:
+    """Return (per-interrupt latencies in seconds, redone work per interrupt)."""
+    rng = random.Random(seed)
+    runner = SkillRunner(db_path=db_path, preempt_grace=grace)
+    running = asyncio.Event()
+    stats = {"redone": 0.0, "stopped": 0.0}
+
+    @runner.skill("wipe_table")
+    async def wipe_table(task: Task) -> None:
+        try:
+            if not task.metadata.get("parked", True):
+                t0 = time.perf_counter()
+                try:
+                    await asyncio.sleep(rehome)
+                finally:
+                    stats["redone"] += time.perf_counter() - t0
+            task.metadata["parked"] = False
+            running.set()
+            for i in range(task.metadata.get("step", 0), 10**9):
+                t0 = time.perf_counter()
+                try:
+                    await asyncio.sleep(step)
+                except asyncio.CancelledError:
+                    stats["redone"] += time.perf_counter() - t0
+                    raise
+                task.metadata["step"] = i + 1
+                if task.preempt_requested:
+                    task.metadata["parked"] = True
+                await task.safe_point()
+        finally:
+            stats["stopped"] = time.perf_counter()
+
+    @runner.skill("avoid_obstacle")
+    async def avoid_obstacle(task: Task) -> None:
+        pass
+
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+    await runner.submit(Task(name="wipe_table", priority=5))
+
+    latencies = []
+    for _ in range(interrupts):
+        await running.wait()
+        await asyncio.sleep(step * (1 + rng.random()))
+        running.clear()
+        t0 = time.perf_counter()
+        await runner.interrupt(Task(name="avoid_obstacle", priority=10))
+        await running.wait()  # handled the obstacle and resumed
+        latencies.append(stats["stopped"] - t0)
+
+    await runner._queue.join()
+    await runner._cancel_running_skill()
+    await runner.stop()
+    loop_task.cancel()
+    return latencies, stats["redone"] / interrupts
+
+
+def _summary(latencies: List[float], redone: float) -> str:
+    ms = sorted(x * 1000 for x in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    return (
+        f"latency median {statistics.median(ms):7.2f} ms   p99 {p99:7.2f} ms"
+        f"   redone {redone * 1000:7.2f} ms/interrupt"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--step", type=float, default=0.02, help="seconds per step")
+    parser.add_argument("--rehome", type=float, default=0.1, help="re-homing seconds")
+    parser.add_argument("--grace", type=float, default=0.5, help="grace period")
+    parser.add_argument("--interrupts", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.interrupts} interrupts, {args.step * 1000:.0f} ms steps,"
+        f" {args.rehome * 1000:.0f} ms re-homing"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for grace in (0.0, args.grace):
+            latencies, redone = await measure(
+                grace,
+                args.interrupts,
+                args.step,
+                args.rehome,
+                os.path.join(tmp, f"grace-{grace}.db"),
+                args.seed,
+            )
+            label = f"grace {grace:g}s" if grace else "hard cancel"
+            print(f"{label:>11}: {_summary(latencies, redone)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Ready-queue backend benchmark
+=============================
+
+Compares the scheduler's heap backend with the bucketed backend
+(per-priority FIFOs + bitmap) on priorities drawn from 0–10.
+
+Two measurements per backend:
+
+* raw queue push/pop throughput, isolating the data structure;
+* ``Scheduler.add`` + ``pick_next`` round trips, which is what the kernel pays.
+
+    python -m rark.benchmarks.queue_backends
+    python -m rark.benchmarks.queue_backends --tasks 200000 --depth 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from rark.core.scheduler import Scheduler, _BucketQueue, _HeapQueue
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+
+
+def bench_raw(queue, priorities, depth: int) -> float:
+    """Keep ``depth`` entries queued; each op is one push plus one pop."""
+    for seq in range(depth):
+        queue.push((-priorities[seq], seq, ""))
+    t0 = time.perf_counter()
+    for seq in range(depth, len(priorities)):
+        queue.push((-priorities[seq], seq, ""))
+        queue.pop()
+    return (len(priorities) - depth) / (time.perf_counter() - t0)
+
+
+def bench_scheduler(queue: str, priorities, depth: int) -> float:
+    sched = Scheduler(queue=queue)
+    tasks = [Task(name="t", priority=p) for p in priorities]
+    for task in tasks[:depth]:
+        sched.add(task)
+    t0 = time.perf_counter()
+    for task in tasks[depth:]:
+        sched.add(task)
+        picked = sched.pick_next()
+        picked.state = LifecycleState.COMPLETED  # skip transition bookkeeping
+    return (len(tasks) - depth) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--depth", type=int, default=100, help="queued backlog")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    priorities = [rng.randint(0, 10) for _ in range(args.tasks)]
+
+    print(f"{args.tasks} ops, backlog {args.depth}, priorities 0–10")
+    print(f"{'':>10} {'raw ops/s':>12} {'scheduler ops/s':>16}")
+    for name, queue in (("heap", _HeapQueue()), ("bucket", _BucketQueue(0, 10))):
+        raw = bench_raw(queue, priorities, args.depth)
+        sched = bench_scheduler(name, priorities, args.depth)
+        print(f"{name:>10} {raw:>12,.0f} {sched:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Scheduler tail-latency benchmark
+================================
+
+Simulates a robot under steady high-priority load with occasional
+low-priority housekeeping, and reports queueing latency per priority level
+with and without priority aging.
+
+Time is simulated: one service slot per second, arrivals drawn from a fixed
+seed, so runs are reproducible and take well under a second.
+
+    python -m rark.benchmarks.scheduler_latency
+    python -m rark.benchmarks.scheduler_latency --slots 50000 --aging-interval 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from rark.core.scheduler import AgingPolicy, Scheduler
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+
+# priority -> arrival probability per slot; total load ≈ 0.98
+ARRIVALS = {9: 0.60, 8: 0.25, 5: 0.10, 1: 0.03}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def run(slots: int, aging: Optional[AgingPolicy], seed: int) -> Dict[int, dict]:
+    rng = random.Random(seed)
+    clock = _Clock()
+    sched = Scheduler(aging=aging, clock=clock)
+    submitted: Dict[str, float] = {}
+    waits: Dict[int, List[float]] = defaultdict(list)
+
+    for slot in range(slots):
+        clock.now = float(slot)
+        for priority, p in ARRIVALS.items():
+            if rng.random() < p:
+                task = Task(name=f"p{priority}", priority=priority)
+                submitted[task.id] = clock.now
+                sched.add(task)
+        task = sched.pick_next()
+        if task is not None:
+            waits[task.priority].append(clock.now - submitted.pop(task.id))
+            task.transition(LifecycleState.ACTIVE)
+            task.transition(LifecycleState.COMPLETED)
+
+    unserved: Dict[int, List[float]] = defaultdict(list)
+    for task_id, t0 in submitted.items():
+        unserved[sched.get(task_id).priority].append(clock.now - t0)
+
+    report = {}
+    for priority in sorted(ARRIVALS, reverse=True):
+        w = waits.get(priority, [])
+        report[priority] = {
+            "served": len(w),
+            "p50": _percentile(w, 0.50) if w else float("nan"),
+            "p99": _percentile(w, 0.99) if w else float("nan"),
+            "max": max(w) if w else float("nan"),
+            "unserved": len(unserved[priority]),
+            "oldest_unserved": max(unserved[priority], default=0.0),
+        }
+    return report
+
+
+def _print(title: str, report: Dict[int, dict]) -> None:
+    print(f"\n{title}")
+    print(
+        f"{'prio':>4} {'served':>7} {'p50':>8} {'p99':>8} {'max':>8}"
+        f" {'unserved':>9} {'oldest':>8}"
+    )
+    for priority, r in report.items():
+        print(
+            f"{priority:>4} {r['served']:>7} {r['p50']:>8.0f} {r['p99']:>8.0f}"
+            f" {r['max']:>8.0f} {r['unserved']:>9} {r['oldest_unserved']:>8.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slots", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--aging-interval", type=float, default=10.0)
+    parser.add_argument("--max-boost", type=int, default=None)
+    args = parser.parse_args()
+
+    _print("strict priority, waits in slots", run(args.slots, None, args.seed))
+    policy = AgingPolicy(interval=args.aging_interval, max_boost=args.max_boost)
+    _print(
+        f"aging interval={args.aging_interval:g}s max_boost={args.max_boost}",
+        run(args.slots, policy, args.seed),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+First-task and per-task latency with pooled skill resources
+===========================================================
+
+Each skill needs a driver connection that takes ``--connect`` seconds to
+open. Without resource hooks the skill connects (and disconnects) on every
+run; with ``@runner.skill(..., on_startup=..., on_shutdown=...)`` the
+runner opens one connection per skill during ``start()``, all skills in
+parallel, and injects it into every run.
+
+Reports boot time (``runner.start()``), latency of the first task after
+boot, and the median task latency from submit to completion.
+
+    python -m rark.benchmarks.skill_warmup
+    python -m rark.benchmarks.skill_warmup --skills 8 --tasks 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+
+
+async def measure(
+    pooled: bool, skills: int, tasks: int, connect: float, db_path: str
+) -> Tuple[float, List[float]]:
+    """Return (boot seconds, per-task latencies in submit order)."""
+    runner = SkillRunner(db_path=db_path)
+
+    async def open_driver() -> object:
+        await asyncio.sleep(connect)
+        return object()
+
+    async def close_driver(driver: object) -> None:
+        await asyncio.sleep(0)
+
+    for i in range(skills):
+        if pooled:
+
+            async def step(task: Task, driver: object) -> None:
+                await asyncio.sleep(0)
+
+            runner.register(
+                f"skill{i}", step, on_startup=open_driver, on_shutdown=close_driver
+            )
+        else:
+
+            async def step(task: Task) -> None:
+                driver = await open_driver()
+                await asyncio.sleep(0)
+                await close_driver(driver)
+
+            runner.register(f"skill{i}", step)
+
+    t0 = time.perf_counter()
+    await runner.start()
+    boot = time.perf_counter() - t0
+    loop_task = asyncio.create_task(runner.run_loop())
+
+    latencies = []
+    for n in range(tasks):
+        t0 = time.perf_counter()
+        task = await runner.submit(Task(name=f"skill{n % skills}", priority=5))
+        await runner.wait_for(task.id)
+        latencies.append(time.perf_counter() - t0)
+
+    await runner._queue.join()
+    await runner.stop()
+    loop_task.cancel()
+    return boot, latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--skills", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--connect", type=float, default=0.05, help="seconds")
+    args = parser.parse_args()
+
+    print(
+        f"{args.skills} skills, {args.tasks} tasks,"
+        f" {args.connect * 1000:.0f} ms driver connect"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for pooled in (False, True):
+            boot, latencies = await measure(
+                pooled,
+                args.skills,
+                args.tasks,
+                args.connect,
+                os.path.join(tmp, f"pooled-{pooled}.db"),
+            )
+            label = "pooled" if pooled else "per task"
+            print(
+                f"{label:>8}: boot {boot * 1000:7.1f} ms"
+                f"   first task {latencies[0] * 1000:7.2f} ms"
+                f"   median task {statistics.median(latencies) * 1000:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,179 @@
+import heapq
+import itertools
+import time
+from operator import attrgetter
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .task import Task
+from .transitions import LifecycleState
+
+
+class AdmissionError(Exception):
+    """A submission was refused; retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class AdmissionPolicy:
+    """Limits on ``SkillRunner.submit``; interrupts are always admitted.
+
+    At ``max_pending`` not-yet-started tasks, a new task displaces the
+    lowest-priority pending one if it outranks it (``shed=True``) and is
+    refused otherwise. Pending tasks are ranked at their current priority,
+    including raises from merges and priority inheritance. Submissions are refused outright while the kernel
+    event queue holds ``max_queue_depth`` events, or when the client's token
+    bucket (``rate`` per second, bursts of ``burst``) is empty.
+    """
+
+    max_pending: Optional[int] = None
+    max_queue_depth: Optional[int] = None
+    rate: Optional[float] = None  # submissions per second per client
+    burst: int = 10
+    shed: bool = True  # displace lower-priority pending tasks when full
+    retry_after: float = 1.0  # hint (seconds) for pending / queue-depth refusals
+
+    def __post_init__(self):
+        if self.rate is not None and self.rate <= 0:
+            raise ValueError("rate must be positive")
+        if self.burst < 1:
+            raise ValueError("burst must be at least 1")
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = now
+
+    def take(self, now: float) -> float:
+        """Take a token; return 0, or the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Applies an AdmissionPolicy; owned by the kernel.
+
+    Tracks admitted tasks until they leave PENDING (reported through
+    ``observe``), with a min-heap on ``priority(task)`` so the shedding
+    victim is found without scanning. Priority changes are reported through
+    ``reprioritize``.
+    """
+
+    _MAX_BUCKETS = 1024
+
+    def __init__(
+        self,
+        policy: AdmissionPolicy,
+        clock: Callable[[], float] = time.monotonic,
+        priority: Callable[[Task], int] = attrgetter("priority"),
+    ):
+        self.policy = policy
+        self._clock = clock
+        self._priority = priority
+        # task id -> (task, -admission seq)
+        self._pending: Dict[str, Tuple[Task, int]] = {}
+        # (priority, -admission seq, task id): lowest priority, newest first.
+        # A priority change pushes a fresh entry; one whose priority is no
+        # longer the task's is stale.
+        self._heap: List[Tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._buckets: Dict[Optional[str], _TokenBucket] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def admit(self, task: Task, client: Optional[str], queue_depth: int) -> Optional[Task]:
+        """Admit ``task`` or raise AdmissionError; returns a task to shed, if any.
+
+        Checks run cheapest-refusal first, and a refused submission does not
+        spend a rate-limit token.
+        """
+        policy = self.policy
+        if policy.max_queue_depth is not None and queue_depth >= policy.max_queue_depth:
+            raise AdmissionError("event queue full", policy.retry_after)
+
+        victim = None
+        if policy.max_pending is not None and len(self._pending) >= policy.max_pending:
+            victim = self._lowest()
+            if (
+                not policy.shed
+                or victim is None
+                or self._priority(victim) >= task.priority
+            ):
+                raise AdmissionError("too many pending tasks", policy.retry_after)
+
+        if policy.rate is not None:
+            now = self._clock()
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                if len(self._buckets) >= self._MAX_BUCKETS:
+                    self._drop_full_buckets(now)
+                bucket = self._buckets[client] = _TokenBucket(policy.rate, policy.burst, now)
+            wait = bucket.take(now)
+            if wait > 0:
+                raise AdmissionError("rate limit exceeded", wait)
+
+        if victim is not None:
+            del self._pending[victim.id]
+        self.track(task)
+        return victim
+
+    def track(self, task: Task) -> None:
+        """Count a PENDING task without checks, e.g. one restored by crash recovery.
+
+        It takes a ``max_pending`` slot and can be shed like any admitted task.
+        """
+        order = -next(self._seq)
+        self._pending[task.id] = (task, order)
+        self._push(task, order)
+
+    def reprioritize(self, task: Task) -> None:
+        """Re-rank a tracked task whose priority changed, e.g. raised by a merge."""
+        entry = self._pending.get(task.id)
+        if entry is not None:
+            self._push(task, entry[1])
+
+    def observe(self, task: Task) -> None:
+        """Forget a task once it is no longer waiting to start."""
+        if task.state != LifecycleState.PENDING:
+            self._pending.pop(task.id, None)
+
+    def _push(self, task: Task, order: int) -> None:
+        heapq.heappush(self._heap, (self._priority(task), order, task.id))
+        if len(self._heap) > 2 * len(self._pending) + 64:
+            self._heap = [
+                (self._priority(pending), seq, task_id)
+                for task_id, (pending, seq) in self._pending.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _lowest(self) -> Optional[Task]:
+        # Entries of tasks that are no longer pending are dropped lazily, and
+        # an entry whose priority is out of date is re-ranked.
+        while self._heap:
+            priority, order, task_id = self._heap[0]
+            entry = self._pending.get(task_id)
+            if entry is None:
+                heapq.heappop(self._heap)
+            elif self._priority(entry[0]) != priority:
+                heapq.heapreplace(self._heap, (self._priority(entry[0]), order, task_id))
+            else:
+                return entry[0]
+        return None
+
+    def _drop_full_buckets(self, now: float) -> None:
+        for client, bucket in list(self._buckets.items()):
+            if bucket.tokens + (now - bucket.stamp) * bucket.rate >= bucket.burst:
+                del self._buckets[client]
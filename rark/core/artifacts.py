@@ -0,0 +1,128 @@
+import logging
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+logger = logging.getLogger("rark")
+
+
+@dataclass
+class Artifact:
+    """One published output: a shared-memory segment and the layout of its data."""
+
+    name: str
+    segment: shared_memory.SharedMemory
+    format: str
+    shape: Tuple[int, ...]
+    nbytes: int
+
+    def view(self) -> memoryview:
+        """Zero-copy, read-only view with the published item format and shape."""
+        return self.segment.buf[: self.nbytes].toreadonly().cast(self.format, self.shape)
+
+
+class ArtifactStore:
+    """Named skill outputs in shared memory, handed to dependent tasks as views.
+
+    A producer publishes into a segment of its own; tasks whose
+    ``blocked_by`` named the producer when they were submitted are its
+    consumers. The segments are unlinked once the producer has finished and
+    every consumer has finished too, or as soon as the producer finishes if
+    nothing depends on it. Segment names (``Artifact.segment.name``) can be
+    attached from other processes while the artifact lives.
+    """
+
+    def __init__(self):
+        # producer id -> artifact name -> artifact
+        self._published: Dict[str, Dict[str, Artifact]] = {}
+        # producer id -> consumers that have not finished
+        self._consumers: Dict[str, Set[str]] = {}
+        # consumer id -> its producers
+        self._sources: Dict[str, Set[str]] = {}
+        # finished producers whose artifacts are still being consumed
+        self._done: Set[str] = set()
+        # unlinked segments a consumer still holds a buffer of
+        self._lingering: List[shared_memory.SharedMemory] = []
+
+    def __len__(self) -> int:
+        return sum(len(artifacts) for artifacts in self._published.values())
+
+    def link(self, consumer_id: str, producer_ids: Iterable[str]) -> None:
+        producers = set(producer_ids)
+        self._sources.setdefault(consumer_id, set()).update(producers)
+        for producer_id in producers:
+            self._consumers.setdefault(producer_id, set()).add(consumer_id)
+
+    def publish(self, producer_id: str, name: str, data: Any) -> Artifact:
+        """Copy ``data`` into a new shared-memory segment.
+
+        ``data`` is any C-contiguous buffer: bytes, a NumPy array, an
+        array.array. Publishing a name again replaces the earlier artifact.
+        """
+        source = memoryview(data)
+        if not source.c_contiguous:
+            raise ValueError(f"artifact {name!r} must be C-contiguous")
+        nbytes = source.nbytes
+        segment = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        segment.buf[:nbytes] = source.cast("B")
+        artifact = Artifact(name, segment, source.format, source.shape, nbytes)
+        try:
+            artifact.view().release()
+        except (TypeError, ValueError):  # layout memoryview cannot cast to
+            artifact.format, artifact.shape = "B", (nbytes,)
+        previous = self._published.setdefault(producer_id, {}).get(name)
+        self._published[producer_id][name] = artifact
+        if previous is not None:
+            self._unlink(previous)
+        return artifact
+
+    def get(self, producer_id: str, name: str) -> Artifact:
+        return self._published[producer_id][name]
+
+    def views(self, consumer_id: str) -> Dict[str, memoryview]:
+        """Views of every artifact published by the consumer's producers, by name."""
+        views: Dict[str, memoryview] = {}
+        for producer_id in self._sources.get(consumer_id, ()):
+            for name, artifact in self._published.get(producer_id, {}).items():
+                views[name] = artifact.view()
+        return views
+
+    def finish(self, task_id: str) -> None:
+        """Record that a task reached a terminal state; free what nobody needs anymore."""
+        for producer_id in self._sources.pop(task_id, ()):
+            consumers = self._consumers.get(producer_id)
+            if consumers is not None:
+                consumers.discard(task_id)
+                if not consumers:
+                    del self._consumers[producer_id]
+            if producer_id in self._done and producer_id not in self._consumers:
+                self._free(producer_id)
+        if task_id in self._published:
+            if task_id in self._consumers:
+                self._done.add(task_id)
+            else:
+                self._free(task_id)
+
+    def close(self) -> None:
+        for producer_id in list(self._published):
+            self._free(producer_id)
+        self._consumers.clear()
+        self._sources.clear()
+        lingering, self._lingering = self._lingering, []
+        for segment in lingering:
+            try:
+                segment.close()
+            except BufferError:
+                logger.warning("artifact segment %s still in use", segment.name)
+
+    def _free(self, producer_id: str) -> None:
+        self._done.discard(producer_id)
+        for artifact in self._published.pop(producer_id, {}).values():
+            self._unlink(artifact)
+
+    def _unlink(self, artifact: Artifact) -> None:
+        artifact.segment.unlink()
+        try:
+            artifact.segment.close()
+        except BufferError:  # the memory goes once the last view is released
+            self._lingering.append(artifact.segment)
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .runner import SkillRunner
+from .task import Task
+from .transitions import TERMINAL_STATES, LifecycleState
+
+logger = logging.getLogger("rark")
+
+
+def _detach(value: Any) -> Any:
+    if isinstance(value, Task):
+        return value.snapshot()
+    if isinstance(value, list):
+        return [_detach(v) for v in value]
+    return value
+
+
+class KernelBridge:
+    """Command/query facade over a SkillRunner, safe to call from another loop.
+
+    Without a kernel loop (``loop=None``) every call goes straight to the
+    runner on the caller's loop. Once a KernelThread has attached its loop,
+    commands are scheduled onto it with ``run_coroutine_threadsafe`` and
+    queries return detached snapshots, so callers never touch a Task the
+    kernel thread is mutating.
+    """
+
+    def __init__(
+        self,
+        runner: SkillRunner,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self._runner = runner
+        self._loop = loop
+
+    async def _call(self, coro: Awaitable[Any]) -> Any:
+        if self._loop is None:
+            return await coro
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return await asyncio.wrap_future(future)
+
+    def _detached(self, value: Any) -> Any:
+        return _detach(value) if self._loop is not None else value
+
+    async def _query(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._loop is None:
+            return fn(*args)
+
+        async def run() -> Any:
+            return self._detached(fn(*args))
+
+        return await self._call(run())
+
+    # ── Commands ──────────────────────────────────────────────────────────
+
+    async def submit(
+        self,
+        task: Task,
+        client: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Task:
+        async def run() -> Task:
+            return self._detached(
+                await self._runner.submit(
+                    task, client=client, idempotency_key=idempotency_key
+                )
+            )
+
+        return await self._call(run())
+
+    async def interrupt(self, task: Task, dedup_key: Optional[str] = None) -> Task:
+        async def run() -> Task:
+            return self._detached(
+                await self._runner.interrupt(task, dedup_key=dedup_key)
+            )
+
+        return await self._call(run())
+
+    async def cancel(self, task_id: str) -> None:
+        await self._call(self._runner.cancel(task_id))
+
+    # ── Queries ───────────────────────────────────────────────────────────
+
+    async def get_task(self, task_id: str) -> Optional[Task]:
+        return await self._query(self._runner.get_task, task_id)
+
+    async def list_tasks(self) -> List[Task]:
+        return await self._query(self._runner.list_tasks)
+
+    async def active_task(self) -> Optional[Task]:
+        return await self._query(lambda: self._runner._active_task)
+
+    async def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        return await self._query(self._runner.cache_stats)
+
+    async def changes(self, since: int = 0, limit: int = 500) -> List[Tuple[int, Task]]:
+        return await self._call(self._runner.changes(since=since, limit=limit))
+
+    async def get_result(self, task_id: str) -> Any:
+        return await self._call(self._runner.get_result(task_id))
+
+    async def result_info(self, task_id: str) -> Optional[Tuple[str, int, int]]:
+        return await self._call(self._runner.result_info(task_id))
+
+    async def result_chunks(self, task_id: str, chunks: int) -> AsyncIterator[bytes]:
+        # One hop per chunk, so a large result is never held whole on
+        # either loop.
+        for index in range(chunks):
+            yield await self._call(self._runner.result_chunk(task_id, index))
+
+    async def wait_for(
+        self,
+        task_id: str,
+        states: Iterable[LifecycleState] = TERMINAL_STATES,
+        timeout: Optional[float] = None,
+    ) -> Task:
+        async def run() -> Task:
+            return self._detached(
+                await self._runner.wait_for(task_id, states=states, timeout=timeout)
+            )
+
+        return await self._call(run())
+
+    async def history(
+        self,
+        state: Optional[LifecycleState] = None,
+        name: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Task]:
+        # Rows are decoded fresh from the store (here and in changes()), so
+        # no snapshot is needed.
+        return await self._call(
+            self._runner.history(state=state, name=name, limit=limit, offset=offset)
+        )
+
+
+class KernelThread:
+    """Run a SkillRunner's event loop on a dedicated thread.
+
+    Skill execution, scheduling and persistence all happen on the kernel
+    thread, so request parsing and serialization on the caller's loop cannot
+    delay preemption. Talk to the runner only through ``bridge``.
+
+    Usage::
+
+        kernel = KernelThread(runner)
+        kernel.start()
+        task = await kernel.bridge.submit(Task(name="pour_water", priority=5))
+        ...
+        kernel.stop()
+    """
+
+    def __init__(self, runner: SkillRunner, name: str = "rark-kernel"):
+        self._runner = runner
+        self._name = name
+        self.bridge = KernelBridge(runner)
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        """Start the kernel thread; returns once runner.start() has finished."""
+        if self._thread is not None:
+            raise RuntimeError("kernel thread already started")
+        self._thread = threading.Thread(target=self._main, name=self._name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Shut the runner down on its own loop and join the thread."""
+        if self._thread is None:
+            return
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _main(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._serve(loop))
+        finally:
+            self.bridge._loop = None
+            loop.close()
+
+    async def _serve(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._stopping = asyncio.Event()
+        try:
+            await self._runner.start()
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            return
+        loop_task = asyncio.create_task(self._runner.run_loop())
+        self._loop = loop
+        self.bridge._loop = loop
+        self._ready.set()
+        logger.info("kernel thread %s started", self._name)
+
+        await self._stopping.wait()
+        # Let run_loop finish its current round instead of cancelling it, so
+        # no dispatch or _tick is still writing when the store closes.
+        self._runner._running = False
+        try:
+            await loop_task
+        except Exception:
+            pass
+        await self._runner._cancel_running_skill()
+        await self._runner.stop()
+        logger.info("kernel thread %s stopped", self._name)
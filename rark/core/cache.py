@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class ResultCache:
+    """Skill results by key, expiring after ``ttl`` seconds, LRU-bounded at ``max_size``.
+
+    Used by SkillRunner for skills registered with ``cache_key``: a fresh
+    hit completes a submission without scheduling it.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_size: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        # key -> (stored at, value); least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return ``(True, value)`` for a fresh entry, else ``(False, None)``; counted."""
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        hit, value = self.lookup(key)
+        return value if hit else default
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when ``key`` is None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        stored_at, value = entry
+        if self.ttl is not None and self._clock() - stored_at >= self.ttl:
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
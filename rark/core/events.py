@@ -1,7 +1,9 @@
+import asyncio
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from enum import Enum
-from typing import Any, Dict, Optional
+from enum import Enum, IntEnum
+from typing import Any, Deque, Dict, Iterator, List, Optional
 
 
 class EventType(str, Enum):
@@ -12,6 +14,7 @@ class EventType(str, Enum):
     TASK_RETRY = "task_retry"
     TASK_PAUSE = "task_pause"
     TASK_RESUME = "task_resume"
+    TASK_SUSPEND = "task_suspend"
     INTERRUPT = "interrupt"
 
 
@@ -21,3 +24,73 @@ class Event:
     task_id: Optional[str] = None
     payload: Dict[str, Any] = field(default_factory=dict)
     timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class Lane(IntEnum):
+    """Event queue lanes, served in ascending order."""
+
+    SAFETY = 0  # stop or redirect the robot: never waits behind bulk work
+    CONTROL = 1  # outcomes of running skills
+    BULK = 2  # new work from planners
+
+
+EVENT_LANES: Dict[EventType, Lane] = {
+    EventType.INTERRUPT: Lane.SAFETY,
+    EventType.TASK_CANCEL: Lane.SAFETY,
+    EventType.TASK_PAUSE: Lane.SAFETY,
+    EventType.TASK_COMPLETE: Lane.CONTROL,
+    EventType.TASK_FAIL: Lane.CONTROL,
+    EventType.TASK_RETRY: Lane.CONTROL,
+    EventType.TASK_SUSPEND: Lane.CONTROL,
+    EventType.TASK_RESUME: Lane.CONTROL,
+    EventType.TASK_SUBMIT: Lane.BULK,
+}
+
+
+class _Lanes:
+    """Per-lane FIFOs with a bound on how long a non-empty lane is passed over."""
+
+    def __init__(self, starvation_limit: int):
+        self._fifos: List[Deque[Event]] = [deque() for _ in Lane]
+        self._passed_over = [0] * len(Lane)
+        self._starvation_limit = starvation_limit
+
+    def __len__(self) -> int:
+        return sum(len(fifo) for fifo in self._fifos)
+
+    def __iter__(self) -> Iterator[Event]:
+        for fifo in self._fifos:
+            yield from fifo
+
+    def append(self, event: Event) -> None:
+        self._fifos[EVENT_LANES.get(event.type, Lane.CONTROL)].append(event)
+
+    def popleft(self) -> Event:
+        fifos = self._fifos
+        chosen = next(i for i, fifo in enumerate(fifos) if fifo)
+        for lane in range(len(fifos) - 1, chosen, -1):
+            if fifos[lane] and self._passed_over[lane] >= self._starvation_limit:
+                chosen = lane  # starving: let one through
+                break
+        for lane in range(chosen + 1, len(fifos)):
+            if fifos[lane]:
+                self._passed_over[lane] += 1
+        self._passed_over[chosen] = 0
+        return fifos[chosen].popleft()
+
+
+class EventQueue(asyncio.Queue):
+    """asyncio.Queue that serves safety events ahead of control and bulk events.
+
+    Order is FIFO within a lane. A non-empty lane is passed over at most
+    ``starvation_limit`` times in a row before one of its events is served,
+    so sustained interrupt or completion traffic cannot stall submissions
+    indefinitely.
+    """
+
+    def __init__(self, maxsize: int = 0, starvation_limit: int = 32):
+        self._starvation_limit = starvation_limit
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        self._queue = _Lanes(self._starvation_limit)
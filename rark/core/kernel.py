@@ -1,18 +1,39 @@
 import asyncio
 import logging
-from typing import Callable, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
 
-from .events import Event, EventType
-from .scheduler import Scheduler
+from .admission import AdmissionController, AdmissionPolicy
+from .events import Event, EventQueue, EventType
+from .preemption import Preemption, PreemptionPolicy
+from .scheduler import AgingPolicy, Scheduler
 from .task import Task
-from .transitions import LifecycleState
+from .transitions import TERMINAL_STATES, LifecycleState
+from ..persistence.retention import RetentionEngine, RetentionPolicy
 from ..persistence.sqlite_store import SQLiteStore
 
 logger = logging.getLogger("rark")
 
 
 class RARKKernel:
-    def __init__(self, db_path: str = "rark.db", crash_policy: str = "resume"):
+    def __init__(
+        self,
+        db_path: str = "rark.db",
+        crash_policy: str = "resume",
+        retention: Optional[RetentionPolicy] = None,
+        aging: Optional[AgingPolicy] = None,
+        queue: str = "heap",
+        priority_range: Tuple[int, int] = (0, 10),
+        priority_inheritance: bool = False,
+        event_lanes: bool = True,
+        max_batch: int = 256,
+        admission: Optional[AdmissionPolicy] = None,
+        idempotency_ttl: float = 86400.0,
+        preemption: Optional[PreemptionPolicy] = None,
+        blob_threshold: Optional[int] = None,
+        metadata_codec: Optional[str] = None,
+        metadata_format: str = "json",
+    ):
         """
         Parameters
         ----------
@@ -24,11 +45,104 @@ class RARKKernel:
               适合幂等 skill 或已实现断点续传的 skill。
             - "fail"：ACTIVE → FAILED，不自动重试。适合物理状态一致性要求严格、
               skill 无法安全重跑的场景（需手动重提交任务）。
+        retention : RetentionPolicy, optional
+            终态任务归档策略。设置后后台引擎按策略把终态行移入归档库，
+            并从内存中移除；归档仍可通过 ``SQLiteStore.load_archived`` 查询。
+            默认 None：不归档，tasks 表无限增长。
+        aging : AgingPolicy, optional
+            优先级老化策略：等待越久，有效优先级越高，避免低优先级任务
+            在持续高优先级负载下饿死。默认 None：严格按优先级调度。
+        queue : str
+            就绪队列实现（未启用 aging 时生效）：
+            - "heap"（默认）：二叉堆，支持任意整数优先级，O(log n)。
+            - "bucket"：按优先级分桶的 FIFO + 非空位图，O(1) 入队/出队；
+              适用于 priority_range 内的小整数优先级，范围外的任务回退到堆。
+        priority_range : (int, int)
+            "bucket" 队列覆盖的优先级闭区间，默认 (0, 10)。
+        priority_inheritance : bool
+            优先级继承：被依赖的任务以其所有（传递）依赖者中的最高优先级调度，
+            避免高优先级任务的低优先级前置任务排在无关的中优先级任务之后。
+            默认 False。
+        event_lanes : bool
+            事件队列分道（默认 True）：INTERRUPT / TASK_CANCEL / TASK_PAUSE
+            总是先于完成类事件和 TASK_SUBMIT 处理，同一道内保持 FIFO，
+            并限制低优先级道被连续跳过的次数。False：单一 FIFO 队列。
+        max_batch : int
+            run_loop 每轮最多取出的事件数。一批事件依次分发后，其产生的
+            存储写入在同一个事务中提交，然后做一次调度决策。1 即逐个处理。
+        admission : AdmissionPolicy, optional
+            提交准入控制：限制未开始的任务数、事件队列深度和每个客户端的
+            提交速率；超限时按优先级淘汰最低的待执行任务或拒绝提交
+            （AdmissionError）。中断不受限制。默认 None：不限制。
+        idempotency_ttl : float
+            提交幂等键的保留时间（秒），默认 24 小时。期限内以同一键重复提交
+            直接返回原任务；键与任务在同一事务中持久化，崩溃恢复后依然有效。
+        preemption : PreemptionPolicy, optional
+            抢占代价模型：中断到来时，根据当前任务的进度（metadata["progress"]
+            或 skill 提供的估计）和中断的紧急程度，决定立即抢占、在安全点抢占，
+            还是等当前任务完成（最多 max_defer 秒）后再执行中断。
+            metadata["urgency"] == "critical" 的中断总是立即抢占。
+            默认 None：总是抢占。
+        blob_threshold : int, optional
+            大元数据阈值（字节）：JSON 编码后不小于该值的顶层 metadata 值
+            按内容哈希写入 ``<db_path>-blobs`` 下的 blob 文件（相同内容只存一份），
+            任务行中只保留引用，避免每次状态变更和 checkpoint 重写大字段。
+            ``Blob`` 值不论大小都这样存储；加载得到惰性的 ``Blob`` 句柄，
+            原样写回时只写引用，不重新编码。
+            归档时值内联回归档行，不再被引用的 blob 随后被回收。
+            默认 None：metadata 全部内联存储。
+        metadata_codec : str, optional
+            metadata 列压缩：序列化后不小于 1 KiB 的 metadata 用 "zlib" 压缩，
+            或用 "zlib-dict"（每个 skill 以其首个大负载作为 zlib 预置字典，
+            同一 skill 的重复性 checkpoint 压缩率更高）。每行带格式标记，
+            不同设置写入的行可以混合读取。默认 None：不压缩。
+        metadata_format : str
+            metadata 列序列化格式："json"（默认）或 "msgpack"（二进制，
+            需要 local extra）。
         """
         self._crash_policy = crash_policy
-        self._scheduler = Scheduler()
-        self._store = SQLiteStore(db_path)
-        self._queue: asyncio.Queue[Event] = asyncio.Queue()
+        self._scheduler = Scheduler(
+            aging=aging,
+            queue=queue,
+            priority_range=priority_range,
+            priority_inheritance=priority_inheritance,
+            merge_key=self._merge_key,
+            on_reprioritize=self._on_reprioritize,
+        )
+        store_options = {
+            "blob_threshold": blob_threshold,
+            "metadata_codec": metadata_codec,
+            "metadata_format": metadata_format,
+        }
+        if retention is not None:
+            store_options["archive_dir"] = retention.archive_dir
+            store_options["archive_format"] = retention.archive_format
+        self._store = SQLiteStore(db_path, **store_options)
+        self._retention: Optional[RetentionEngine] = None
+        if retention is not None:
+            self._retention = RetentionEngine(
+                self._store,
+                retention,
+                is_idle=self._is_idle,
+                on_archived=self._forget,
+            )
+        self._queue: asyncio.Queue[Event] = (
+            EventQueue() if event_lanes else asyncio.Queue()
+        )
+        self._max_batch = max_batch
+        self._admission: Optional[AdmissionController] = (
+            AdmissionController(admission, priority=self._shed_priority)
+            if admission is not None
+            else None
+        )
+        self._preemption = preemption
+        self._listeners: List[Callable[[Task], None]] = []
+        # idempotency key -> (task id, created_at), in creation order
+        self._idempotency: Dict[str, Tuple[str, datetime]] = {}
+        self._idempotency_ttl = timedelta(seconds=idempotency_ttl)
+        self._keys_purged_at = datetime.now(timezone.utc)
+        # task id -> [(states awaited, future)]; resolved in _persist
+        self._waiters: Dict[str, List[Tuple[FrozenSet[LifecycleState], asyncio.Future]]] = {}
         self._active_task: Optional[Task] = None
         self._running = False
         self._handlers: Dict[EventType, Callable] = {
@@ -39,6 +153,7 @@ class RARKKernel:
             EventType.TASK_RETRY: self._on_retry,
             EventType.TASK_PAUSE: self._on_pause,
             EventType.TASK_RESUME: self._on_resume,
+            EventType.TASK_SUSPEND: self._on_suspend,
             EventType.INTERRUPT: self._on_interrupt,
         }
 
@@ -46,9 +161,13 @@ class RARKKernel:
         await self._store.open()
         await self._recover()
         self._running = True
+        if self._retention is not None:
+            self._retention.start()
 
     async def stop(self) -> None:
         self._running = False
+        if self._retention is not None:
+            await self._retention.stop()
         await self._store.close()
 
     async def emit(self, event: Event) -> None:
@@ -57,17 +176,104 @@ class RARKKernel:
     def get_task(self, task_id: str) -> Optional[Task]:
         return self._scheduler.get(task_id)
 
+    async def wait_for(
+        self,
+        task_id: str,
+        states: Iterable[LifecycleState] = TERMINAL_STATES,
+        timeout: Optional[float] = None,
+    ) -> Task:
+        """Wait until the task reaches one of ``states`` (default: any terminal state).
+
+        Returns immediately if it already has. The waiter is a bare future
+        resolved by the transition that persists the state, so waiting costs
+        nothing while idle. Raises KeyError for unknown tasks and
+        asyncio.TimeoutError after ``timeout`` seconds.
+        """
+        task = self._scheduler.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        task_id = task.id  # task_id may name a task merged into this one
+        states = frozenset(states)
+        if task.state in states:
+            return task
+        waiter = (states, asyncio.get_running_loop().create_future())
+        self._waiters.setdefault(task_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        finally:
+            waiters = self._waiters.get(task_id)
+            if waiters is not None:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[task_id]
+
+    def add_listener(self, listener: Callable[[Task], None]) -> None:
+        """Call ``listener(task)`` on the kernel loop after every persisted state change.
+
+        Listeners run synchronously inside event handling and must not block;
+        inside a batch they fire before the batch's transaction commits.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Task], None]) -> None:
+        self._listeners.remove(listener)
+
     def list_tasks(self) -> list:
         return list(self._scheduler._tasks.values())
 
+    async def history(
+        self,
+        state: Optional[LifecycleState] = None,
+        name: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Task]:
+        """Query persisted tasks (most recent first) through the store's reader pool.
+
+        Unlike list_tasks(), this sees what is on disk rather than in memory,
+        and it never queues behind kernel writes.
+        """
+        return await self._store.query(
+            state=state, name=name, limit=limit, offset=offset
+        )
+
+    async def changes(self, since: int = 0, limit: int = 500) -> List[Tuple[int, Task]]:
+        """Persisted tasks changed after change sequence ``since`` (see SQLiteStore.changes)."""
+        return await self._store.changes(since=since, limit=limit)
+
+    async def get_result(self, task_id: str) -> Any:
+        """The stored return value of a completed task, or None if it returned nothing."""
+        return await self._store.load_result(self._result_id(task_id))
+
+    async def result_info(self, task_id: str) -> Optional[Tuple[str, int, int]]:
+        """``(content_type, size, chunks)`` of a task's stored result, or None."""
+        return await self._store.result_info(self._result_id(task_id))
+
+    async def result_chunk(self, task_id: str, index: int) -> bytes:
+        """One chunk of a stored result's encoded bytes, for streaming it out."""
+        return await self._store.read_result_chunk(self._result_id(task_id), index)
+
     async def run_loop(self) -> None:
-        """Main event loop: drain the queue, fall back to _tick on idle."""
+        """Main event loop: drain the queue in batches, fall back to _tick on idle.
+
+        Each round takes every event already queued (up to max_batch) with
+        get_nowait(), dispatches them in order, commits their store writes in
+        one transaction and then makes one scheduling decision.
+        """
         while self._running:
             try:
-                event = await asyncio.wait_for(self._queue.get(), timeout=0.1)
-                await self._dispatch(event)
-                self._queue.task_done()
-            except asyncio.TimeoutError:
+                if self._queue.empty():
+                    try:
+                        event = await asyncio.wait_for(self._queue.get(), timeout=0.1)
+                    except asyncio.TimeoutError:
+                        await self._tick()
+                        continue
+                else:
+                    event = self._queue.get_nowait()
+                batch = [event]
+                while len(batch) < self._max_batch and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                await self._dispatch_batch(batch)
                 await self._tick()
             except Exception as e:
                 logger.error("unhandled error in run_loop: %s", e, exc_info=True)
@@ -81,6 +287,155 @@ class RARKKernel:
         if handler:
             await handler(event)
 
+    async def _dispatch_batch(self, batch: List[Event]) -> None:
+        try:
+            async with self._store.batch():
+                for event in batch:
+                    try:
+                        await self._dispatch(event)
+                    except Exception as e:
+                        logger.error(
+                            "unhandled error in run_loop: %s", e, exc_info=True
+                        )
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _persist(self, task: Task) -> None:
+        await self._store.upsert(task)
+        if self._admission is not None:
+            self._admission.observe(task)
+        for states, future in self._waiters.get(task.id, ()):
+            if task.state in states and not future.done():
+                future.set_result(task)
+        for listener in list(self._listeners):
+            try:
+                listener(task)
+            except Exception as e:
+                logger.error("task listener failed: %s", e, exc_info=True)
+
+    async def _store_result(self, task: Task) -> None:
+        if task.result is None:
+            return
+        try:
+            await self._store.put_result(task.id, task.result)
+        except (TypeError, ValueError) as e:
+            logger.warning("result of %s not stored: %s", task.name, e)
+            return
+        task.result = None  # read it back with get_result(); don't pin it in memory
+
+    def _result_id(self, task_id: str) -> str:
+        task = self._scheduler.get(task_id)
+        return task.id if task is not None else task_id  # merged tasks share a result
+
+    def _idempotent_task_id(self, key: str) -> Optional[str]:
+        """Task id bound to ``key``, or None if unbound or expired."""
+        entry = self._idempotency.get(key)
+        if entry is None:
+            return None
+        if datetime.now(timezone.utc) - entry[1] >= self._idempotency_ttl:
+            del self._idempotency[key]
+            return None
+        return entry[0]
+
+    def _bind_idempotency_key(self, key: str, task: Task) -> None:
+        self._idempotency[key] = (task.id, task.created_at)
+        now = datetime.now(timezone.utc)
+        while self._idempotency:  # creation order: expired bindings come first
+            oldest = next(iter(self._idempotency))
+            if now - self._idempotency[oldest][1] < self._idempotency_ttl:
+                break
+            del self._idempotency[oldest]
+
+    def _release_idempotency_key(self, key: str, task_id: str) -> None:
+        if self._idempotency.get(key, (None,))[0] == task_id:
+            del self._idempotency[key]
+
+    async def _find_task(self, task_id: str) -> Optional[Task]:
+        """Look a task up in memory, then in the store, then in the archive."""
+        task = self._scheduler.get(task_id)
+        if task is None:
+            task = await self._store.get(task_id)
+        if task is None:
+            archived = await self._store.load_archived(task_id=task_id)
+            task = archived[-1] if archived else None
+        return task
+
+    async def _purge_idempotency_keys(self) -> None:
+        now = datetime.now(timezone.utc)
+        if now - self._keys_purged_at < self._idempotency_ttl / 10:
+            return
+        self._keys_purged_at = now
+        await self._store.purge_idempotency_keys(now - self._idempotency_ttl)
+
+    def _shed_priority(self, task: Task) -> int:
+        """Priority admission sheds by: the scheduled one, inheritance included."""
+        if self._scheduler.get(task.id) is task:
+            return self._scheduler.effective_priority(task.id)
+        return task.priority  # being admitted, not registered yet
+
+    def _on_reprioritize(self, task: Task) -> None:
+        if self._admission is not None:
+            self._admission.reprioritize(task)
+
+    def _merge_key(self, task: Task) -> Optional[Hashable]:
+        """Key under which equivalent PENDING tasks merge; None never merges."""
+        return None
+
+    def _progress(self, task: Task) -> Optional[float]:
+        """Fraction (0–1) of the task done, or None if unknown."""
+        progress = task.metadata.get("progress")
+        return float(progress) if isinstance(progress, (int, float)) else None
+
+    async def _preempt_active(self, decision: Preemption) -> bool:
+        """Stop whatever executes the active task; SkillRunner overrides this.
+
+        Returns False if it was only asked to stop: a TASK_SUSPEND event
+        follows once it has, and the active task is suspended then.
+        """
+        return True
+
+    async def _suspend_active(self) -> None:
+        task = self._active_task
+        self._scheduler.suspend(task.id)
+        await self._persist(task)
+        logger.info("paused    → %s", task.name)
+        self._active_task = None
+
+    def _defer_interrupt(self, interrupt_task: Task, progress: Optional[float]) -> None:
+        active = self._active_task
+        logger.info(
+            "deferred  → %s until %s finishes (%.0f%% done)",
+            interrupt_task.name,
+            active.name,
+            (progress or 0.0) * 100,
+        )
+        if self._preemption.max_defer is None:
+            return
+
+        def force() -> None:
+            if (
+                interrupt_task.state == LifecycleState.PENDING
+                and self._active_task is not None
+                and self._active_task.id == active.id
+            ):
+                self._queue.put_nowait(
+                    Event(
+                        type=EventType.INTERRUPT,
+                        payload={"task": interrupt_task, "forced": True},
+                    )
+                )
+
+        asyncio.get_running_loop().call_later(self._preemption.max_defer, force)
+
+    def _is_idle(self) -> bool:
+        return self._active_task is None and self._queue.empty()
+
+    def _forget(self, task_ids) -> None:
+        """Drop archived tasks from memory; they remain in the store's archive."""
+        for task_id in task_ids:
+            self._scheduler.remove(task_id)
+
     async def _tick(self) -> None:
         """Promote the next queued task when no task is currently active."""
         if self._active_task is not None:
@@ -90,15 +445,22 @@ class RARKKernel:
             return
         task.transition(LifecycleState.ACTIVE)
         self._active_task = task
-        await self._store.upsert(task)
+        await self._persist(task)
         logger.info("started  → %s (priority=%d)", task.name, task.priority)
 
     async def _recover(self) -> None:
-        """Restore PENDING/PAUSED tasks after a crash."""
+        """Restore PENDING/PAUSED tasks and live idempotency keys after a crash."""
+        cutoff = datetime.now(timezone.utc) - self._idempotency_ttl
+        await self._store.purge_idempotency_keys(cutoff)
+        for key, task_id, created_at in await self._store.load_idempotency_keys(cutoff):
+            self._idempotency[key] = (task_id, created_at)
+
         tasks = await self._store.load_all()
         for task in tasks:
             if task.state in (LifecycleState.PENDING, LifecycleState.PAUSED):
                 self._scheduler.add(task)
+                if self._admission is not None and task.state == LifecycleState.PENDING:
+                    self._admission.track(task)
             elif task.state == LifecycleState.ACTIVE:
                 # Kernel crashed while this task was running.
                 # Recovery strategy depends on crash_policy:
@@ -108,14 +470,14 @@ class RARKKernel:
                 #              must be verified and task manually resubmitted.
                 if self._crash_policy == "resume":
                     task.transition(LifecycleState.PAUSED)
-                    await self._store.upsert(task)
+                    await self._persist(task)
                     self._scheduler.add(task)
                     logger.warning(
                         "recovered → %s (ACTIVE→PAUSED, will resume)", task.name
                     )
                 else:
                     task.transition(LifecycleState.FAILED)
-                    await self._store.upsert(task)
+                    await self._persist(task)
                     self._scheduler.register(task)  # queryable but not scheduled
                     logger.warning(
                         "recovered → %s (ACTIVE→FAILED, manual resubmit required)",
@@ -130,8 +492,16 @@ class RARKKernel:
 
     async def _on_submit(self, event: Event) -> None:
         task: Task = event.payload["task"]
+        key = event.payload.get("idempotency_key")
+        if key is not None:
+            # Committed with the task row (same batch), so a retry after a
+            # crash finds the key exactly when it finds the task.
+            await self._store.add_idempotency_key(key, task.id, task.created_at)
+            await self._purge_idempotency_keys()
+        if task.state in TERMINAL_STATES:
+            return  # cancelled (or shed) before its submission was dispatched
         self._scheduler.add(task)
-        await self._store.upsert(task)
+        await self._persist(task)
         logger.info("submitted → %s (priority=%d)", task.name, task.priority)
 
     async def _on_complete(self, event: Event) -> None:
@@ -139,32 +509,36 @@ class RARKKernel:
         if task is None:
             return
         task.transition(LifecycleState.COMPLETED)
-        await self._store.upsert(task)
+        await self._store_result(task)
+        await self._persist(task)
         logger.info("completed → %s", task.name)
         if self._active_task and self._active_task.id == event.task_id:
             self._active_task = None
         self._scheduler.release_dependents(event.task_id)
+        self._scheduler.finish(event.task_id)
 
     async def _on_fail(self, event: Event) -> None:
         task = self._scheduler.get(event.task_id)
         if task is None:
             return
         task.transition(LifecycleState.FAILED)
-        await self._store.upsert(task)
+        await self._persist(task)
         error = event.payload.get("error", "unknown")
         logger.warning("failed    → %s: %s", task.name, error)
         if self._active_task and self._active_task.id == event.task_id:
             self._active_task = None
+        self._scheduler.finish(event.task_id)
 
     async def _on_cancel(self, event: Event) -> None:
         task = self._scheduler.get(event.task_id)
-        if task is None:
+        if task is None or task.state in TERMINAL_STATES:
             return
         task.transition(LifecycleState.CANCELLED)
-        await self._store.upsert(task)
+        await self._persist(task)
         logger.info("cancelled → %s", task.name)
         if self._active_task and self._active_task.id == event.task_id:
             self._active_task = None
+        self._scheduler.finish(event.task_id)
 
     async def _on_retry(self, event: Event) -> None:
         """Re-queue a failed task for another attempt (ACTIVE → PENDING).
@@ -176,7 +550,7 @@ class RARKKernel:
         if task is None:
             return
         task.transition(LifecycleState.PENDING)
-        await self._store.upsert(task)
+        await self._persist(task)
         if self._active_task and self._active_task.id == event.task_id:
             self._active_task = None
 
@@ -202,12 +576,12 @@ class RARKKernel:
             # Transition to PAUSED but do NOT push back to heap.
             # The task stays paused until resume() is called.
             task.transition(LifecycleState.PAUSED)
-            await self._store.upsert(task)
+            await self._persist(task)
             logger.info("paused    → %s", task.name)
             self._active_task = None
         elif task.state == LifecycleState.PENDING:
             task.transition(LifecycleState.PAUSED)
-            await self._store.upsert(task)
+            await self._persist(task)
             logger.info("paused    → %s (was pending)", task.name)
 
     async def _on_resume(self, event: Event) -> None:
@@ -219,17 +593,35 @@ class RARKKernel:
             self._scheduler.add(task)
             logger.info("resumed   → %s", task.name)
 
+    async def _on_suspend(self, event: Event) -> None:
+        """Re-queue the active task once it has stopped for an interrupt."""
+        if self._active_task is not None and self._active_task.id == event.task_id:
+            await self._suspend_active()
+
     async def _on_interrupt(self, event: Event) -> None:
-        """Pause the active task and inject a high-priority interrupt task."""
-        if self._active_task is not None:
-            self._scheduler.suspend(self._active_task.id)
-            await self._store.upsert(self._active_task)
-            logger.info("paused    → %s", self._active_task.name)
-            self._active_task = None
+        """Pause the active task and inject a high-priority interrupt task.
 
+        With a preemption policy the active task may instead be left to
+        finish (the interrupt task then runs next) or asked to yield at a
+        safe point, in which case it is suspended on the TASK_SUSPEND that
+        follows; events keep being served in the meantime.
+        """
         interrupt_task: Task = event.payload["task"]
+        forced = event.payload.get("forced", False)
+        if forced and interrupt_task.state != LifecycleState.PENDING:
+            return  # the deferred interrupt got to run in time
+        decision = Preemption.SAFE_POINT
+        if self._active_task is not None and self._preemption is not None and not forced:
+            progress = self._progress(self._active_task)
+            decision = self._preemption.decide(self._active_task, progress, interrupt_task)
+            if decision == Preemption.DEFER:
+                self._defer_interrupt(interrupt_task, progress)
+        if self._active_task is not None and decision != Preemption.DEFER:
+            if await self._preempt_active(decision) and self._active_task is not None:
+                await self._suspend_active()
+
         self._scheduler.add(interrupt_task)
-        await self._store.upsert(interrupt_task)
+        await self._persist(interrupt_task)
         logger.info(
             "interrupt → %s (priority=%d)", interrupt_task.name, interrupt_task.priority
         )
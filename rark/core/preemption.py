@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from .task import Task
+
+
+class Preemption(str, Enum):
+    PREEMPT = "preempt"  # stop the active skill now
+    SAFE_POINT = "safe_point"  # ask it to yield; cancel after the grace period
+    DEFER = "defer"  # let it finish; the interrupt task runs next
+
+
+@dataclass
+class PreemptionPolicy:
+    """Decides how an interrupt treats the task it would preempt.
+
+    The default cost model lets a task at or above ``defer_above`` progress
+    (0–1, from ``metadata["progress"]`` or the skill's ``progress``
+    estimate) finish first, for at most ``max_defer`` seconds, and otherwise
+    preempts at the next safe point, giving skills without a grace period of
+    their own ``grace`` seconds. An interrupt with
+    ``metadata["urgency"] == "critical"`` always preempts immediately.
+    Subclass and override decide() for other cost models.
+    """
+
+    defer_above: float = 0.9
+    max_defer: Optional[float] = 5.0  # None: wait for completion however long
+    grace: float = 1.0
+
+    def __post_init__(self):
+        if self.max_defer is not None and self.max_defer <= 0:
+            raise ValueError("max_defer must be positive")
+        if self.grace < 0:
+            raise ValueError("grace must not be negative")
+
+    def decide(self, active: Task, progress: Optional[float], interrupt: Task) -> Preemption:
+        if interrupt.metadata.get("urgency") == "critical":
+            return Preemption.PREEMPT
+        if progress is not None and progress >= self.defer_above:
+            return Preemption.DEFER
+        return Preemption.SAFE_POINT
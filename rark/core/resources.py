@@ -0,0 +1,78 @@
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger("rark")
+
+
+async def _call(fn: Callable[..., Any], *args: Any) -> Any:
+    """Call a hook that may be sync or async."""
+    result = fn(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class ResourcePool:
+    """Warm instances of one skill's resource (driver, model, port), reused across tasks.
+
+    ``factory()`` creates an instance and ``close(instance)`` releases it;
+    either may be a plain function or a coroutine function. Instances are
+    created by warm() (SkillRunner.start() warms every pool in parallel) or,
+    for pools registered later, on first acquire().
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        close: Optional[Callable[[Any], Any]] = None,
+        size: int = 1,
+    ):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self._factory = factory
+        self._close = close
+        self._size = size
+        self._created = 0
+        self._idle: asyncio.Queue = asyncio.Queue()
+
+    @property
+    def idle(self) -> int:
+        return self._idle.qsize()
+
+    async def warm(self) -> None:
+        """Create instances until the pool is full."""
+        await asyncio.gather(*(self._add() for _ in range(self._size - self._created)))
+
+    async def acquire(self) -> Any:
+        if self._idle.empty() and self._created < self._size:
+            await self._add()
+        return await self._idle.get()
+
+    def release(self, resource: Any) -> None:
+        self._idle.put_nowait(resource)
+
+    async def close(self) -> None:
+        """Close the idle instances; ones still in use are left to their holder."""
+        resources: List[Any] = []
+        while not self._idle.empty():
+            resources.append(self._idle.get_nowait())
+        self._created -= len(resources)
+        if self._close is None:
+            return
+        results = await asyncio.gather(
+            *(_call(self._close, r) for r in resources), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("resource shutdown failed: %s", result)
+
+    async def _add(self) -> None:
+        self._created += 1
+        try:
+            resource = await _call(self._factory)
+        except BaseException:
+            self._created -= 1
+            raise
+        self._idle.put_nowait(resource)
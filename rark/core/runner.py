@@ -1,44 +1,452 @@
 import asyncio
-from typing import Callable, Coroutine, Dict, Optional
+import functools
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Callable, Coroutine, Dict, Hashable, Optional, Tuple
 
+from .artifacts import ArtifactStore
 from .events import Event, EventType
+from .cache import ResultCache
 from .kernel import RARKKernel
-from .task import Task
+from .preemption import Preemption
+from .resources import ResourcePool, _call
+from .task import Preempted, Task
+from .transitions import TERMINAL_STATES, LifecycleState
+
+logger = logging.getLogger("rark")
+
+
+@dataclass
+class SkillSpec:
+    """A registered skill and its scheduling options."""
+
+    fn: Callable[[Task], Coroutine]
+    # Submissions of this skill whose merge_key(task) equals that of a still
+    # PENDING one are folded into it instead of being queued.
+    merge_key: Optional[Callable[[Task], Hashable]] = None
+    merge_priority: bool = True  # a merged submission may raise the priority
+    preempt_grace: Optional[float] = None  # None: the runner's preempt_grace
+    # Estimated fraction (0–1) of the task done, for the preemption policy.
+    progress: Optional[Callable[[Task], float]] = None
+    # Warm resources; each run receives one as its second argument.
+    pool: Optional[ResourcePool] = None
+    # Setup run ahead of time (planning, perception) for the next task.
+    prepare: Optional[Callable[[Task], Any]] = None
+    # Results of successful runs by cache_key(task); a fresh hit completes
+    # a submission without scheduling it.
+    cache_key: Optional[Callable[[Task], Hashable]] = None
+    cache: Optional[ResultCache] = None
+    # Async-generator skill yielding its stages; see SkillRunner.skill().
+    staged: bool = field(init=False)
+
+    def __post_init__(self):
+        self.staged = inspect.isasyncgenfunction(self.fn)
+
+
+def _with_resource(fn: Callable[..., Any], task: Task, resource: Any) -> Any:
+    return fn(task, resource)
+
+
+def _skill_key(fn: Callable[[Task], Hashable], task: Task) -> Optional[Hashable]:
+    """Apply a user key function; failures and unhashable keys mean no key."""
+    try:
+        key = fn(task)
+        hash(key)
+    except Exception as e:
+        logger.warning("key function failed for %s: %s", task.name, e)
+        return None
+    return key
+
+
+def _consume_error(future: asyncio.Future) -> None:
+    # A discarded preparation's error is never awaited; a used one is
+    # re-raised into the skill.
+    if not future.cancelled():
+        future.exception()
 
 
 class SkillRunner(RARKKernel):
-    def __init__(self, db_path: str = "rark.db", crash_policy: str = "resume"):
-        super().__init__(db_path, crash_policy)
-        self._skills: Dict[str, Callable[[Task], Coroutine]] = {}
+    def __init__(
+        self,
+        db_path: str = "rark.db",
+        crash_policy: str = "resume",
+        interrupt_window: float = 0.0,
+        preempt_grace: float = 0.0,
+        **kernel_options,
+    ):
+        """
+        Parameters
+        ----------
+        interrupt_window : float
+            Seconds within which a repeat interrupt with the same dedup key
+            (default: the task name) is absorbed into the equivalent interrupt
+            task if that one is still PENDING or ACTIVE. Each absorbed repeat
+            extends the window. 0 (default) disables coalescing.
+        preempt_grace : float
+            Seconds a skill gets to stop by itself when an interrupt or
+            pause() preempts it: ``task.preempt_requested`` turns true and the
+            skill may finish its step, checkpoint and stop at
+            ``task.safe_point()``; it is cancelled once the grace period runs
+            out. Per-skill override: ``skill(name, preempt_grace=...)``.
+            0 (default) cancels immediately. cancel() never waits.
+        **kernel_options
+            Forwarded to RARKKernel.
+        """
+        super().__init__(db_path, crash_policy, **kernel_options)
+        self._skills: Dict[str, SkillSpec] = {}
         self._running_skill_task: Optional[asyncio.Task] = None
+        self._running_skill_of: Optional[Task] = None
+        self._preempt_grace = preempt_grace
+        # While the running skill has been asked to yield: (event queued if
+        # it stops without an outcome, timer cancelling it when the grace
+        # period runs out, monotonic time of the request).
+        self._yielding: Optional[Tuple[Event, asyncio.TimerHandle, float]] = None
+        # Outcome the running skill queued that has not been dispatched yet,
+        # and one applied ahead of its place in the queue (its queued copy
+        # is then skipped).
+        self._queued_outcome: Optional[Event] = None
+        self._applied_outcome: Optional[Event] = None
+        self._prepares = False  # any skill has a prepare phase
+        # (task, its in-flight or finished speculative preparation)
+        self._speculation: Optional[Tuple[Task, asyncio.Task]] = None
+        self._interrupt_window = interrupt_window
+        # dedup key -> (interrupt task id, monotonic time of the last repeat),
+        # oldest first; entries are dropped once their window has passed
+        self._recent_interrupts: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._artifacts = ArtifactStore()
 
-    def skill(self, name: str):
-        """Decorator to register a skill function."""
+    def skill(
+        self,
+        name: str,
+        merge_key: Optional[Callable[[Task], Hashable]] = None,
+        merge_priority: bool = True,
+        preempt_grace: Optional[float] = None,
+        progress: Optional[Callable[[Task], float]] = None,
+        on_startup: Optional[Callable[[], Any]] = None,
+        on_shutdown: Optional[Callable[[Any], Any]] = None,
+        pool_size: int = 1,
+        prepare: Optional[Callable[[Task], Any]] = None,
+        cache_key: Optional[Callable[[Task], Hashable]] = None,
+        cache_ttl: Optional[float] = None,
+        cache_size: int = 128,
+    ):
+        """Decorator to register a skill function.
+
+        With ``merge_key``, a submission whose key equals that of a PENDING
+        task of the same skill is merged into it (see submit())::
+
+            @runner.skill("navigate_to", merge_key=lambda t: t.metadata["target"])
+            async def navigate_to(task): ...
+
+        An async-generator skill is run stage by stage: it yields each stage
+        as an awaitable (or a callable returning one) and receives the
+        stage's result back. After every stage the runner sets
+        ``metadata["stage"]`` to the number of completed stages and
+        checkpoints, and when the task is resumed, retried or recovered the
+        completed stages are skipped (their results come back as None)::
+
+            @runner.skill("pour_water")
+            async def pour_water(task):
+                yield move_to_cup()
+                yield pour(task.metadata["ml"])
+
+        Code between yields runs again on every resume, so physical work
+        belongs inside the stages. With a grace period, the end of each stage
+        is a safe point.
+
+        ``progress(task)`` estimates the fraction done (0–1) for the kernel's
+        PreemptionPolicy, in place of ``metadata["progress"]``.
+
+        ``on_startup()`` creates a resource the skill keeps warm between
+        tasks (``pool_size`` instances, all created in parallel during
+        start()); each run is called with one as its second argument, and
+        ``on_shutdown(resource)`` releases them in stop()::
+
+            @runner.skill("grasp", on_startup=open_gripper, on_shutdown=close_gripper)
+            async def grasp(task, gripper): ...
+
+        ``prepare(task)`` is a setup phase (path planning, perception) whose
+        result the skill reads as ``task.prepared``. While another task runs,
+        the runner speculatively prepares the task the scheduler would pick
+        next. If the queue order changes first, that preparation is
+        discarded, and a task that starts unprepared is prepared inline.
+
+        For query skills, ``cache_key(task)`` caches the return value of each
+        successful run for ``cache_ttl`` seconds (None:
+        until evicted), keeping the ``cache_size`` most recently used keys.
+        A submission with a fresh cached result completes at once without
+        being scheduled (``metadata["cached"] = True``) and its result is
+        read with get_result(); see cache_stats().
+        """
 
         def decorator(fn: Callable[[Task], Coroutine]):
-            self.register(name, fn)
+            self.register(
+                name,
+                fn,
+                merge_key=merge_key,
+                merge_priority=merge_priority,
+                preempt_grace=preempt_grace,
+                progress=progress,
+                on_startup=on_startup,
+                on_shutdown=on_shutdown,
+                pool_size=pool_size,
+                prepare=prepare,
+                cache_key=cache_key,
+                cache_ttl=cache_ttl,
+                cache_size=cache_size,
+            )
             return fn
 
         return decorator
 
-    def register(self, name: str, fn: Callable[[Task], Coroutine]) -> None:
-        self._skills[name] = fn
+    def register(
+        self,
+        name: str,
+        fn: Callable[[Task], Coroutine],
+        merge_key: Optional[Callable[[Task], Hashable]] = None,
+        merge_priority: bool = True,
+        preempt_grace: Optional[float] = None,
+        progress: Optional[Callable[[Task], float]] = None,
+        on_startup: Optional[Callable[[], Any]] = None,
+        on_shutdown: Optional[Callable[[Any], Any]] = None,
+        pool_size: int = 1,
+        prepare: Optional[Callable[[Task], Any]] = None,
+        cache_key: Optional[Callable[[Task], Hashable]] = None,
+        cache_ttl: Optional[float] = None,
+        cache_size: int = 128,
+    ) -> None:
+        pool = None
+        if on_startup is not None:
+            pool = ResourcePool(on_startup, on_shutdown, size=pool_size)
+        self._skills[name] = SkillSpec(
+            fn,
+            merge_key=merge_key,
+            merge_priority=merge_priority,
+            preempt_grace=preempt_grace,
+            progress=progress,
+            pool=pool,
+            prepare=prepare,
+            cache_key=cache_key,
+            cache=(
+                ResultCache(ttl=cache_ttl, max_size=cache_size)
+                if cache_key is not None
+                else None
+            ),
+        )
+        if prepare is not None:
+            self._prepares = True
 
-    async def submit(self, task: Task) -> None:
+    async def start(self) -> None:
+        """Warm every skill's resources in parallel, then start the kernel."""
+        await self._warm_resources()
+        try:
+            await super().start()
+        except BaseException:
+            await self._close_resources()
+            raise
+
+    async def stop(self) -> None:
+        self._discard_speculation()
+        try:
+            await super().stop()
+        finally:
+            self._artifacts.close()
+            await self._close_resources()
+
+    async def submit(
+        self,
+        task: Task,
+        client: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Task:
+        """Queue ``task``; returns the task in effect.
+
+        A repeat ``idempotency_key`` within the kernel's ``idempotency_ttl``
+        returns the task first submitted under it, without admission checks
+        or touching the scheduler. Raises AdmissionError if the admission
+        policy refuses the task; ``client`` selects the rate-limit bucket.
+        When the pending limit is reached, admitting ``task`` may cancel a
+        lower-priority pending task (marked ``metadata["shed"] = True``).
+
+        If the skill has a ``merge_key`` and an equivalent task is still
+        PENDING, ``task`` is merged into it instead: its metadata is folded in
+        (``metadata["merged"]`` counts merges), the priority raised to
+        ``task``'s if higher (unless ``merge_priority=False``), and the
+        existing task returned. ``task.id`` then resolves to it in get_task()
+        and wait_for(). Merges bypass admission control.
+
+        A skill registered with ``cache_key`` that has a fresh result for
+        ``task`` completes it immediately with that result.
+        """
+        if idempotency_key is not None:
+            while (original_id := self._idempotent_task_id(idempotency_key)) is not None:
+                original = await self._find_task(original_id)
+                if original is not None:
+                    logger.info("duplicate → %s (key %r)", original.name, idempotency_key)
+                    return original
+                logger.warning(
+                    "idempotency key %r lost its task %s", idempotency_key, original_id
+                )
+                self._release_idempotency_key(idempotency_key, original_id)
+        # No awaits from here until the key is bound and the task registered,
+        # so concurrent submits with the same key cannot both get through.
+        spec = self._skills.get(task.name)
+        if spec is not None and spec.cache is not None:
+            key = _skill_key(spec.cache_key, task)
+            if key is not None:
+                hit, result = spec.cache.lookup(key)
+                if hit:
+                    return await self._complete_cached(task, result, idempotency_key)
+        existing = self._scheduler.find_equivalent(task)
+        if existing is not None:
+            return await self._merge(task, existing, idempotency_key)
+        victim = None
+        if self._admission is not None:
+            victim = self._admission.admit(task, client, self._queue.qsize())
+        if idempotency_key is not None:
+            self._bind_idempotency_key(idempotency_key, task)
+        if task.blocked_by:  # consumer of its prerequisites' artifacts
+            self._artifacts.link(task.id, task.blocked_by)
         self._scheduler.register(
             task
         )  # immediately queryable before run_loop processes event
-        await self.emit(Event(type=EventType.TASK_SUBMIT, payload={"task": task}))
+        if victim is not None:
+            victim.metadata["shed"] = True
+            logger.warning(
+                "shed      → %s (priority=%d) for %s (priority=%d)",
+                victim.name,
+                victim.priority,
+                task.name,
+                task.priority,
+            )
+            await self.emit(Event(type=EventType.TASK_CANCEL, task_id=victim.id))
+        payload = {"task": task}
+        if idempotency_key is not None:
+            payload["idempotency_key"] = idempotency_key
+        await self.emit(Event(type=EventType.TASK_SUBMIT, payload=payload))
+        return task
+
+    async def _merge(
+        self, task: Task, existing: Task, idempotency_key: Optional[str]
+    ) -> Task:
+        raise_priority = self._skills[task.name].merge_priority
+        previous = existing.priority
+        existing.metadata.update(task.metadata)
+        existing.metadata["merged"] = existing.metadata.get("merged", 0) + 1
+        self._scheduler.merge(task, existing, raise_priority=raise_priority)
+        if self._speculation is not None and self._speculation[0] is existing:
+            self._discard_speculation()  # prepared from the metadata before the merge
+        if idempotency_key is not None:
+            self._bind_idempotency_key(idempotency_key, existing)
+        logger.info(
+            "merged    → %s into %s (priority %d → %d)",
+            task.name,
+            existing.id,
+            previous,
+            existing.priority,
+        )
+        if idempotency_key is not None:
+            await self._store.add_idempotency_key(
+                idempotency_key, existing.id, existing.created_at
+            )
+        await self._persist(existing)
+        return existing
 
-    async def interrupt(self, task: Task) -> None:
+    async def _complete_cached(
+        self, task: Task, result: Any, idempotency_key: Optional[str]
+    ) -> Task:
+        task.transition(LifecycleState.ACTIVE)
+        task.transition(LifecycleState.COMPLETED)
+        task.metadata["cached"] = True
+        task.result = result
+        self._scheduler.register(task)
+        if idempotency_key is not None:
+            self._bind_idempotency_key(idempotency_key, task)
+        logger.info("cached    → %s", task.name)
+        if idempotency_key is not None:
+            await self._store.add_idempotency_key(
+                idempotency_key, task.id, task.created_at
+            )
+        await self._store_result(task)
+        await self._persist(task)
+        self._scheduler.finish(task.id)
+        return task
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss/eviction counts and size of each skill's result cache."""
+        return {
+            name: spec.cache.stats()
+            for name, spec in self._skills.items()
+            if spec.cache is not None
+        }
+
+    def _merge_key(self, task: Task) -> Optional[Hashable]:
+        spec = self._skills.get(task.name)
+        if spec is None or spec.merge_key is None:
+            return None
+        key = _skill_key(spec.merge_key, task)
+        return (task.name, key) if key is not None else None
+
+    async def interrupt(self, task: Task, dedup_key: Optional[str] = None) -> Task:
+        """Preempt the active task with ``task``; returns the interrupt task in effect.
+
+        With coalescing enabled, a repeat within ``interrupt_window`` of an
+        equivalent PENDING/ACTIVE interrupt is merged into that task's
+        metadata (``metadata["coalesced"]`` counts repeats) and the existing
+        task is returned; no event is emitted, nothing is preempted or written.
+        """
+        if self._interrupt_window > 0:
+            key = dedup_key if dedup_key is not None else task.name
+            now = time.monotonic()
+            recent = self._recent_interrupts
+            while recent and now - next(iter(recent.values()))[1] > self._interrupt_window:
+                recent.popitem(last=False)
+            existing = self._coalesce_interrupt(key, task, now)
+            if existing is not None:
+                return existing
+            recent[key] = (task.id, now)
+            recent.move_to_end(key)
         self._scheduler.register(task)
         await self.emit(Event(type=EventType.INTERRUPT, payload={"task": task}))
+        return task
+
+    def _coalesce_interrupt(self, key: str, task: Task, now: float) -> Optional[Task]:
+        entry = self._recent_interrupts.get(key)  # expired entries already dropped
+        if entry is None:
+            return None
+        existing_id, _ = entry
+        existing = self._scheduler.get(existing_id)
+        if existing is None or existing.state not in (
+            LifecycleState.PENDING,
+            LifecycleState.ACTIVE,
+        ):
+            return None
+        existing.metadata.update(task.metadata)
+        existing.metadata["coalesced"] = existing.metadata.get("coalesced", 0) + 1
+        self._recent_interrupts[key] = (existing_id, now)
+        self._recent_interrupts.move_to_end(key)
+        logger.debug("coalesced → %s into %s", task.name, existing_id)
+        return existing
+
+    async def cancel(self, task_id: str) -> None:
+        """Cancel a running or pending task."""
+        await self.emit(Event(type=EventType.TASK_CANCEL, task_id=task_id))
 
     async def pause(self, task_id: str) -> None:
-        """Pause a running or pending task."""
+        """Pause a running or pending task.
+
+        A running skill gets its grace period to stop at a safe point first;
+        if it finishes instead, its outcome stands and the pause is dropped.
+        """
+        pause = Event(type=EventType.TASK_PAUSE, task_id=task_id)
         if self._active_task and self._active_task.id == task_id:
+            if self._yield_running_skill(self._grace_for(self._running_skill_of), pause):
+                return
             await self._cancel_running_skill()
-        await self.emit(Event(type=EventType.TASK_PAUSE, task_id=task_id))
+        await self.emit(pause)
 
     async def resume(self, task_id: str) -> None:
         """Resume a paused task."""
@@ -53,6 +461,8 @@ class SkillRunner(RARKKernel):
         await super()._tick()
         if self._active_task is not None and self._active_task is not prev_active:
             await self._launch_skill(self._active_task)
+        if self._prepares:
+            self._speculate()
 
     # ------------------------------------------------------------------
     # Skill lifecycle
@@ -62,10 +472,26 @@ class SkillRunner(RARKKernel):
         """Persist task metadata to storage (called by task.checkpoint())."""
         await self._store.upsert(task)
 
+    def _publish(self, task: Task, name: str, data: Any) -> None:
+        """Publish an artifact for the task's dependents (called by task.publish())."""
+        artifact = self._artifacts.publish(task.id, name, data)
+        logger.debug("published → %s.%s (%d bytes)", task.name, name, artifact.nbytes)
+
+    async def _persist(self, task: Task) -> None:
+        await super()._persist(task)
+        if task.state in TERMINAL_STATES:
+            for view in task.artifacts.values():
+                try:
+                    view.release()
+                except BufferError:  # the skill kept a derived buffer
+                    pass
+            task.artifacts = {}
+            self._artifacts.finish(task.id)
+
     async def _launch_skill(self, task: Task) -> None:
-        fn = self._skills.get(task.name)
-        if fn is None:
-            await self.emit(
+        spec = self._skills.get(task.name)
+        if spec is None:
+            await self._emit_outcome(
                 Event(
                     type=EventType.TASK_FAIL,
                     task_id=task.id,
@@ -75,25 +501,37 @@ class SkillRunner(RARKKernel):
             return
         # Inject checkpoint callback so skills can persist mid-execution
         task._checkpoint_fn = self._checkpoint
+        task._publish_fn = self._publish
+        task._preempt = asyncio.Event()
+        if not task.artifacts:
+            task.artifacts = self._artifacts.views(task.id)
+        speculation = None
+        if self._speculation is not None and self._speculation[0] is task:
+            speculation = self._speculation[1]
+            self._speculation = None
+        fn = functools.partial(self._call_skill, spec, speculation=speculation)
         skill_task = asyncio.create_task(self._run_skill(task, fn))
         self._running_skill_task = skill_task
+        self._running_skill_of = task
         skill_task.add_done_callback(self._on_skill_done)
 
-    async def _run_skill(self, task: Task, fn: Callable[[Task], Coroutine]) -> None:
+    async def _run_skill(self, task: Task, fn: Callable[[Task], Coroutine]) -> bool:
+        """Run the skill and queue its outcome; False if it yielded without one."""
         try:
             timeout = task.metadata.get("timeout")
             if timeout is not None:
-                await asyncio.wait_for(fn(task), timeout=float(timeout))
+                task.result = await asyncio.wait_for(fn(task), timeout=float(timeout))
             else:
-                await fn(task)
-            await self.emit(Event(type=EventType.TASK_COMPLETE, task_id=task.id))
+                task.result = await fn(task)
+            outcome = Event(type=EventType.TASK_COMPLETE, task_id=task.id)
+        except Preempted:
+            logger.info("yielded   → %s at a safe point", task.name)
+            return False
         except asyncio.TimeoutError:
-            await self.emit(
-                Event(
-                    type=EventType.TASK_FAIL,
-                    task_id=task.id,
-                    payload={"error": f"timeout after {task.metadata.get('timeout')}s"},
-                )
+            outcome = Event(
+                type=EventType.TASK_FAIL,
+                task_id=task.id,
+                payload={"error": f"timeout after {task.metadata.get('timeout')}s"},
             )
         except asyncio.CancelledError:
             raise
@@ -102,37 +540,270 @@ class SkillRunner(RARKKernel):
             max_retries = task.metadata.get("max_retries", 0)
             if retry_count < max_retries:
                 task.metadata["retry_count"] = retry_count + 1
-                await self.emit(Event(type=EventType.TASK_RETRY, task_id=task.id))
+                outcome = Event(type=EventType.TASK_RETRY, task_id=task.id)
             else:
-                await self.emit(
-                    Event(
-                        type=EventType.TASK_FAIL,
-                        task_id=task.id,
-                        payload={"error": str(e)},
-                    )
+                outcome = Event(
+                    type=EventType.TASK_FAIL,
+                    task_id=task.id,
+                    payload={"error": str(e)},
                 )
+        await self._emit_outcome(outcome)
+        return True
+
+    async def _emit_outcome(self, outcome: Event) -> None:
+        self._queued_outcome = outcome
+        await self.emit(outcome)
+
+    async def _call_skill(
+        self,
+        spec: SkillSpec,
+        task: Task,
+        speculation: Optional[asyncio.Task] = None,
+    ) -> Any:
+        cache_key = None
+        if spec.cache is not None:
+            cache_key = _skill_key(spec.cache_key, task)
+        if spec.prepare is not None:
+            if speculation is not None:
+                task.prepared = await speculation
+            else:
+                task.prepared = await _call(spec.prepare, task)
+        if spec.pool is None:
+            skill = spec.fn
+        else:
+            resource = await spec.pool.acquire()
+            skill = functools.partial(_with_resource, spec.fn, resource=resource)
+        try:
+            if spec.staged:
+                result = await self._run_stages(skill, task)
+            else:
+                result = await skill(task)
+        finally:
+            if spec.pool is not None:
+                spec.pool.release(resource)
+            task.prepared = None  # a resumed or retried run prepares afresh
+        if cache_key is not None:
+            spec.cache.put(cache_key, result)
+        return result
+
+    def _speculate(self) -> None:
+        """Prepare the task that would run next while the active one executes."""
+        target = None
+        if self._active_task is not None:
+            candidate = self._scheduler.peek_next()
+            spec = self._skills.get(candidate.name) if candidate is not None else None
+            if spec is not None and spec.prepare is not None:
+                target = candidate
+        if self._speculation is not None:
+            if self._speculation[0] is target:
+                return
+            self._discard_speculation()
+        if target is None:
+            return
+        future = asyncio.create_task(_call(self._skills[target.name].prepare, target))
+        future.add_done_callback(_consume_error)
+        self._speculation = (target, future)
+        logger.debug("preparing → %s", target.name)
+
+    def _discard_speculation(self) -> None:
+        if self._speculation is not None:
+            task, future = self._speculation
+            self._speculation = None
+            future.cancel()
+            logger.debug("discarded → preparation of %s", task.name)
+
+    async def _warm_resources(self) -> None:
+        pools = [spec.pool for spec in self._skills.values() if spec.pool is not None]
+        if not pools:
+            return
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(pool.warm() for pool in pools), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self._close_resources()
+            raise errors[0]
+        logger.info(
+            "warmed    → %d skill resource pools in %.3fs",
+            len(pools),
+            time.monotonic() - started,
+        )
+
+    async def _close_resources(self) -> None:
+        pools = [spec.pool for spec in self._skills.values() if spec.pool is not None]
+        await asyncio.gather(*(pool.close() for pool in pools))
+
+    async def _run_stages(
+        self, skill: Callable[[Task], AsyncGenerator[Any, Any]], task: Task
+    ) -> Any:
+        """Drive a staged skill, skipping the stages a previous run completed.
+
+        A bare ``yield`` is a safe point, not a stage. Returns the last
+        stage's result.
+        """
+        completed = task.metadata.get("stage", 0)
+        stages = skill(task)
+        index, result = 0, None
+        try:
+            while True:
+                try:
+                    stage = await stages.asend(result)
+                except StopAsyncIteration:
+                    return result
+                if stage is None:
+                    result = None
+                    await task.safe_point()
+                    continue
+                if index < completed:
+                    if inspect.iscoroutine(stage):
+                        stage.close()  # never started; avoid the "never awaited" warning
+                    result = None
+                else:
+                    result = stage() if callable(stage) else stage
+                    if not inspect.isawaitable(result):
+                        raise TypeError(
+                            f"stage {index} of {task.name!r} is not awaitable: {result!r}"
+                        )
+                    result = await result
+                    task.metadata["stage"] = index + 1
+                    await task.checkpoint()
+                    logger.debug("stage     → %s #%d done", task.name, index + 1)
+                    if task.preempt_requested:
+                        raise Preempted()
+                index += 1
+        finally:
+            await stages.aclose()
 
     def _on_skill_done(self, fut: asyncio.Future) -> None:
+        if self._running_skill_task is not fut:
+            return
+        task = self._running_skill_of
         self._running_skill_task = None
+        self._running_skill_of = None
+        if self._yielding is None:
+            return
+        stop, timer, started = self._yielding
+        self._yielding = None
+        timer.cancel()
+        if fut.cancelled() or fut.exception() is not None or not fut.result():
+            logger.info(
+                "preempted → %s after %.3fs", task.name, time.monotonic() - started
+            )
+            self._queue.put_nowait(stop)
+
+    def _yield_running_skill(self, grace: float, stop: Event) -> bool:
+        """Ask the running skill to stop at a safe point within ``grace`` seconds.
+
+        Returns immediately. ``stop`` is queued once the skill has stopped
+        without an outcome, at a safe point or cancelled when the grace
+        period runs out; an outcome it reaches first is applied instead.
+        Returns False if there is no running skill to wait for.
+        """
+        skill_task = self._running_skill_task
+        task = self._running_skill_of
+        if grace <= 0 or skill_task is None or skill_task.done() or task._preempt is None:
+            return False
+        if self._yielding is not None:  # already winding down; a pause wins
+            if stop.type == EventType.TASK_PAUSE:
+                self._yielding = (stop,) + self._yielding[1:]
+            return True
+        task._preempt.set()
+        timer = asyncio.get_running_loop().call_later(
+            grace, self._grace_expired, skill_task, task, grace
+        )
+        self._yielding = (stop, timer, time.monotonic())
+        return True
+
+    def _grace_expired(self, skill_task: asyncio.Task, task: Task, grace: float) -> None:
+        if not skill_task.done():
+            logger.warning(
+                "grace     → %s did not yield within %.2fs; cancelling", task.name, grace
+            )
+            skill_task.cancel()
+
+    def _grace_for(self, task: Optional[Task]) -> float:
+        spec = self._skills.get(task.name) if task is not None else None
+        if spec is not None and spec.preempt_grace is not None:
+            return spec.preempt_grace
+        return self._preempt_grace
 
     async def _cancel_running_skill(self) -> None:
-        if self._running_skill_task and not self._running_skill_task.done():
-            self._running_skill_task.cancel()
-            try:
-                await self._running_skill_task
-            except (asyncio.CancelledError, Exception):
-                pass
+        """Cancel the running skill now; the caller settles its task."""
+        if self._yielding is not None:
+            self._yielding[1].cancel()
+            self._yielding = None
+        skill_task = self._running_skill_task
+        if skill_task is None or skill_task.done():
+            return
+        skill_task.cancel()
+        try:
+            await skill_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        if self._running_skill_task is skill_task:
             self._running_skill_task = None
+            self._running_skill_of = None
 
     # ------------------------------------------------------------------
     # Event handler overrides
     # ------------------------------------------------------------------
 
+    async def _dispatch(self, event: Event) -> None:
+        if event is self._applied_outcome:
+            self._applied_outcome = None
+            return
+        if event is self._queued_outcome:
+            self._queued_outcome = None
+        await super()._dispatch(event)
+
+    async def _apply_queued_outcome(self, task_id: str) -> None:
+        """Apply the finished skill's queued outcome for ``task_id`` right away.
+
+        Interrupts, cancels and pauses are served ahead of outcomes (see
+        EVENT_LANES); a skill that finished just before one of them must not
+        be paused or cancelled, and rerun or lose its result.
+        """
+        outcome = self._queued_outcome
+        if outcome is None or outcome.task_id != task_id:
+            return
+        self._queued_outcome = None
+        self._applied_outcome = outcome
+        await super()._dispatch(outcome)
+
     async def _on_interrupt(self, event: Event) -> None:
-        await self._cancel_running_skill()
+        if self._active_task is not None:
+            await self._apply_queued_outcome(self._active_task.id)
         await super()._on_interrupt(event)
 
+    async def _on_pause(self, event: Event) -> None:
+        await self._apply_queued_outcome(event.task_id)
+        await super()._on_pause(event)
+
+    def _progress(self, task: Task) -> Optional[float]:
+        spec = self._skills.get(task.name)
+        if spec is None or spec.progress is None:
+            return super()._progress(task)
+        try:
+            return float(spec.progress(task))
+        except Exception as e:
+            logger.warning("progress estimate failed for %s: %s", task.name, e)
+            return None
+
+    async def _preempt_active(self, decision: Preemption) -> bool:
+        grace = 0.0
+        if decision == Preemption.SAFE_POINT:
+            grace = self._grace_for(self._running_skill_of)
+            if grace == 0 and self._preemption is not None:
+                grace = self._preemption.grace
+        suspend = Event(type=EventType.TASK_SUSPEND, task_id=self._active_task.id)
+        if self._yield_running_skill(grace, suspend):
+            return False
+        await self._cancel_running_skill()
+        return True
+
     async def _on_cancel(self, event: Event) -> None:
+        await self._apply_queued_outcome(event.task_id)
         if self._active_task and self._active_task.id == event.task_id:
             await self._cancel_running_skill()
         await super()._on_cancel(event)
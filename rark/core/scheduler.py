@@ -1,15 +1,199 @@
+import bisect
 import heapq
-from typing import Dict, List, Optional, Tuple
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Hashable, Iterable, List, Optional, Set, Tuple
 
 from .task import Task
-from .transitions import LifecycleState
+from .transitions import TERMINAL_STATES, LifecycleState
 
+logger = logging.getLogger("rark")
+
+# Queue entries: (-priority, seq, task_id). Shared by both backends.
+_Entry = Tuple[int, int, str]
+
+# Widest priority range served by buckets; beyond this the heap is cheaper.
+MAX_BUCKET_LEVELS = 1024
+
+
+@dataclass
+class AgingPolicy:
+    """Raise a waiting task's effective priority the longer it waits.
+
+    Every ``interval`` seconds in the queue adds ``step`` to the task's
+    priority, capped at ``max_boost`` when set. The stored ``Task.priority``
+    never changes; aging only affects the order in which tasks are picked.
+    """
+
+    interval: float
+    step: int = 1
+    max_boost: Optional[int] = None
+
+    def boost(self, waited: float) -> int:
+        boost = int(waited // self.interval) * self.step
+        if self.max_boost is not None:
+            boost = min(boost, self.max_boost)
+        return boost
+
+
+class _HeapQueue:
+    """Binary heap over (-priority, seq): O(log n) push/pop, any int priority."""
 
-class Scheduler:
     def __init__(self):
-        # max-heap via negated priority; entries: (-priority, task_id)
-        self._heap: List[Tuple[int, str]] = []
+        self._heap: List[_Entry] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, entry: _Entry) -> None:
+        heapq.heappush(self._heap, entry)
+
+    def pop(self) -> Optional[_Entry]:
+        return heapq.heappop(self._heap) if self._heap else None
+
+    def peek_priority(self) -> Optional[int]:
+        return -self._heap[0][0] if self._heap else None
+
+    def restore(self, entries: List[_Entry]) -> None:
+        """Put back entries popped (in order) but not taken."""
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+
+
+class _BucketQueue:
+    """One FIFO per priority in [lo, hi] plus a bitmap of non-empty levels.
+
+    Push appends to a deque and sets a bit; pop reads the highest set bit
+    (``int.bit_length``) and pops that deque, so both are O(1) with no tuple
+    comparisons. Priorities outside the range go to an overflow heap, which
+    is consulted first for priorities above ``hi`` and last for those below
+    ``lo``.
+    """
+
+    def __init__(self, lo: int, hi: int):
+        self._lo = lo
+        self._hi = hi
+        self._fifos: List[Deque[_Entry]] = [deque() for _ in range(hi - lo + 1)]
+        self._bitmap = 0  # bit i set <=> _fifos[i] non-empty
+        self._overflow = _HeapQueue()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size + len(self._overflow)
+
+    def push(self, entry: _Entry) -> None:
+        index = -entry[0] - self._lo
+        if not 0 <= index < len(self._fifos):
+            self._overflow.push(entry)
+            return
+        self._fifos[index].append(entry)
+        self._bitmap |= 1 << index
+        self._size += 1
+
+    def pop(self) -> Optional[_Entry]:
+        top = self._overflow.peek_priority()
+        if top is not None and (top > self._hi or not self._bitmap):
+            return self._overflow.pop()
+        if not self._bitmap:
+            return None
+        index = self._bitmap.bit_length() - 1
+        fifo = self._fifos[index]
+        entry = fifo.popleft()
+        if not fifo:
+            self._bitmap &= ~(1 << index)
+        self._size -= 1
+        return entry
+
+    def restore(self, entries: List[_Entry]) -> None:
+        """Put back entries popped (in order) but not taken, at the front."""
+        for entry in reversed(entries):
+            index = -entry[0] - self._lo
+            if not 0 <= index < len(self._fifos):
+                self._overflow.push(entry)
+                continue
+            self._fifos[index].appendleft(entry)
+            self._bitmap |= 1 << index
+            self._size += 1
+
+
+class Scheduler:
+    def __init__(
+        self,
+        aging: Optional[AgingPolicy] = None,
+        clock: Callable[[], float] = time.monotonic,
+        queue: str = "heap",
+        priority_range: Tuple[int, int] = (0, 10),
+        priority_inheritance: bool = False,
+        merge_key: Optional[Callable[[Task], Optional[Hashable]]] = None,
+        on_reprioritize: Optional[Callable[[Task], None]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        aging : AgingPolicy, optional
+            Opt-in starvation bound. Without it, ordering is strictly by
+            priority, FIFO within a priority.
+        clock : callable
+            Monotonic time source for aging; injectable for tests/benchmarks.
+        queue : str
+            Ready-queue backend when aging is off: ``"heap"`` (default, any
+            priority) or ``"bucket"`` (O(1) push/pop for priorities within
+            ``priority_range``; others spill to a heap). Ranges wider than
+            MAX_BUCKET_LEVELS fall back to the heap.
+        priority_range : (int, int)
+            Inclusive priority bounds served by the bucket backend.
+        priority_inheritance : bool
+            Schedule each task at the highest priority among itself and all
+            tasks transitively blocked on it, so a low-priority prerequisite
+            of an urgent task is not stuck behind unrelated medium work.
+            Maintained incrementally as tasks are added and finish.
+        merge_key : callable, optional
+            ``merge_key(task)`` returns a hashable key, or None for tasks that
+            never merge. PENDING tasks are indexed by key as they are
+            registered, so find_equivalent() is a dict lookup.
+        on_reprioritize : callable, optional
+            Called with a task whose effective priority may have changed
+            (raised by a merge, inherited or given back).
+        """
+        if queue not in ("heap", "bucket"):
+            raise ValueError(f"Unknown queue backend: {queue!r}")
+        self._aging = aging
+        self._clock = clock
+        # Submission sequence: FIFO tie-breaker within a priority level.
+        self._seq = itertools.count()
+        lo, hi = priority_range
+        if queue == "bucket" and hi - lo + 1 > MAX_BUCKET_LEVELS:
+            logger.warning(
+                "priority_range %s too wide for buckets; using heap", priority_range
+            )
+            queue = "heap"
+        self._queue = _BucketQueue(lo, hi) if queue == "bucket" else _HeapQueue()
+        # With aging: one FIFO per priority level, entries (seq, enqueued_at,
+        # task_id). The head of each level is its longest-waiting task, so
+        # only heads need comparing and nothing is re-heapified as time passes.
+        self._buckets: Dict[int, Deque[Tuple[int, float, str]]] = {}
+        self._levels: List[int] = []  # sorted priorities with a bucket
         self._tasks: Dict[str, Task] = {}
+        # task_id -> seq of its one live queue entry; any other entry for the
+        # task is stale. Lets a task be re-queued at a new priority in O(1).
+        self._queued: Dict[str, int] = {}
+        # Reverse dependency edges: dep_id -> ids of tasks blocked on it.
+        self._dependents: Dict[str, Set[str]] = {}
+        self._inheritance = priority_inheritance
+        self._inherited: Dict[str, int] = {}  # only tasks raised above their own
+        self._merge_key = merge_key
+        self._on_reprioritize = on_reprioritize
+        # merge key -> id of the PENDING task holding it, and the reverse.
+        # Entries are dropped when the task is picked or finishes; a task that
+        # left PENDING some other way (paused) is dropped on lookup.
+        self._merge_index: Dict[Hashable, str] = {}
+        self._merge_keys: Dict[str, Hashable] = {}
+        # merged-away task id -> id of the task it was folded into
+        self._aliases: Dict[str, str] = {}
+        self._aliased_by: Dict[str, List[str]] = {}
 
     def register(self, task: Task) -> None:
         """Track a task without adding it to the scheduling heap.
@@ -19,54 +203,282 @@ class Scheduler:
         processed by run_loop().
         """
         self._tasks[task.id] = task
+        self._link(task)
+        self._index(task)
 
     def add(self, task: Task) -> None:
         self._tasks[task.id] = task
-        heapq.heappush(self._heap, (-task.priority, task.id))
+        self._link(task)
+        self._index(task)
+        self._push(task)
+
+    def find_equivalent(self, task: Task) -> Optional[Task]:
+        """Return the PENDING task sharing ``task``'s merge key, if any."""
+        if self._merge_key is None:
+            return None
+        key = self._merge_key(task)
+        if key is None:
+            return None
+        existing_id = self._merge_index.get(key)
+        if existing_id is None or existing_id == task.id:
+            return None
+        existing = self._tasks.get(existing_id)
+        if existing is None or existing.state != LifecycleState.PENDING:
+            self._unindex(existing_id)
+            return None
+        return existing
+
+    def merge(self, task: Task, into: Task, raise_priority: bool = True) -> None:
+        """Fold ``task`` into the equivalent PENDING task ``into``.
+
+        ``task`` is never queued; get() resolves its id to ``into`` until
+        ``into`` is removed. With ``raise_priority``, ``into`` takes the
+        higher of the two priorities and is re-queued at it.
+        """
+        self._aliases[task.id] = into.id
+        self._aliased_by.setdefault(into.id, []).append(task.id)
+        if raise_priority and task.priority > into.priority:
+            into.priority = task.priority
+            self._reprioritize(into.id, max(task.priority, self.effective_priority(into.id)))
+            if self._inheritance and into.blocked_by:
+                self._raise(into.blocked_by, self.effective_priority(into.id))
+
+    def effective_priority(self, task_id: str) -> int:
+        """Priority the task is scheduled at (its own, or an inherited one)."""
+        return self._inherited.get(task_id, self._tasks[task_id].priority)
 
     def pick_next(self) -> Optional[Task]:
         """Pop and return the highest-priority PENDING or PAUSED task.
 
         Tasks with unresolved dependencies (blocked_by non-empty) are skipped
-        and put back on the heap to be re-evaluated later.
+        and put back on the heap to be re-evaluated later. Equal priorities
+        are served in the order they were queued.
         """
-        skipped: List[Tuple[int, str]] = []
+        if self._aging is not None:
+            return self._pick_aged()
+
+        skipped: List[_Entry] = []
         result: Optional[Task] = None
 
-        while self._heap:
-            entry = heapq.heappop(self._heap)
-            _, task_id = entry
-            task = self._tasks.get(task_id)
-            if task is None or task.state not in (
-                LifecycleState.PENDING,
-                LifecycleState.PAUSED,
-            ):
+        while (entry := self._queue.pop()) is not None:
+            _, seq, task_id = entry
+            task = self._schedulable(task_id, seq)
+            if task is None:
                 continue
             if task.blocked_by:
                 skipped.append(entry)  # still has unresolved deps; defer
                 continue
+            del self._queued[task_id]
+            self._unindex(task_id)
             result = task
             break
 
-        for entry in skipped:
-            heapq.heappush(self._heap, entry)
+        self._queue.restore(skipped)
+        return result
+
+    def peek_next(self) -> Optional[Task]:
+        """Return the task pick_next() would pick now, without taking it."""
+        if self._aging is not None:
+            return self._pick_aged(take=False)
 
+        popped: List[_Entry] = []
+        result: Optional[Task] = None
+        while (entry := self._queue.pop()) is not None:
+            task = self._schedulable(entry[2], entry[1])
+            if task is None:
+                continue  # stale; pick_next would drop it too
+            popped.append(entry)
+            if not task.blocked_by:
+                result = task
+                break
+        self._queue.restore(popped)
         return result
 
     def release_dependents(self, completed_id: str) -> None:
         """Remove completed_id from blocked_by of all waiting tasks."""
-        for task in self._tasks.values():
-            task.blocked_by.discard(completed_id)
+        for task_id in self._dependents.pop(completed_id, ()):
+            task = self._tasks.get(task_id)
+            if task is not None:
+                task.blocked_by.discard(completed_id)
+
+    def finish(self, task_id: str) -> None:
+        """Drop a terminal task from the dependency graph.
+
+        Its prerequisites no longer inherit its priority, so they (and their
+        own prerequisites) are re-evaluated; nothing else is touched.
+        """
+        task = self._tasks.get(task_id)
+        self._queued.pop(task_id, None)
+        self._inherited.pop(task_id, None)
+        self._unindex(task_id)
+        if task is None:
+            return
+        for dep in task.blocked_by:
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(task_id)
+        if self._inheritance:
+            self._recompute(task.blocked_by)
 
     def suspend(self, task_id: str) -> None:
         """Transition task to PAUSED and re-queue it."""
         task = self._tasks[task_id]
         task.transition(LifecycleState.PAUSED)
-        heapq.heappush(self._heap, (-task.priority, task.id))
+        self._push(task)
 
     def get(self, task_id: str) -> Optional[Task]:
-        return self._tasks.get(task_id)
+        """Look up a task by id, or by the id of a task merged into it."""
+        task = self._tasks.get(task_id)
+        if task is None and task_id in self._aliases:
+            task = self._tasks.get(self._aliases[task_id])
+        return task
 
     def remove(self, task_id: str) -> None:
-        """Remove from tracking; stale heap entries are discarded by pick_next."""
+        """Remove from tracking; stale queue entries are discarded by pick_next."""
+        self.finish(task_id)
         self._tasks.pop(task_id, None)
+        for alias in self._aliased_by.pop(task_id, ()):
+            self._aliases.pop(alias, None)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _push(self, task: Task) -> None:
+        seq = next(self._seq)
+        self._queued[task.id] = seq
+        priority = self.effective_priority(task.id)
+        if self._aging is None:
+            self._queue.push((-priority, seq, task.id))
+            return
+        bucket = self._buckets.get(priority)
+        if bucket is None:
+            bucket = self._buckets[priority] = deque()
+            bisect.insort(self._levels, priority)
+        bucket.append((seq, self._clock(), task.id))
+
+    def _index(self, task: Task) -> None:
+        if self._merge_key is None or task.state != LifecycleState.PENDING:
+            return
+        key = self._merge_key(task)
+        if key is None:
+            return
+        holder = self._tasks.get(self._merge_index.get(key, ""))
+        if holder is not None and holder.state == LifecycleState.PENDING:
+            return  # the first pending task keeps the key
+        self._merge_index[key] = task.id
+        self._merge_keys[task.id] = key
+
+    def _unindex(self, task_id: str) -> None:
+        key = self._merge_keys.pop(task_id, None)
+        if key is not None and self._merge_index.get(key) == task_id:
+            del self._merge_index[key]
+
+    def _schedulable(self, task_id: str, seq: int) -> Optional[Task]:
+        if self._queued.get(task_id) != seq:
+            return None  # superseded by a later push, or already taken
+        task = self._tasks.get(task_id)
+        if task is None or task.state not in (
+            LifecycleState.PENDING,
+            LifecycleState.PAUSED,
+        ):
+            return None
+        return task
+
+    def _link(self, task: Task) -> None:
+        """Index task's dependency edges and push its priority down them."""
+        for dep in task.blocked_by:
+            self._dependents.setdefault(dep, set()).add(task.id)
+        if not self._inheritance:
+            return
+        if task.id in self._dependents:  # dependents were submitted first
+            self._recompute([task.id])
+        if task.blocked_by:
+            self._raise(task.blocked_by, self.effective_priority(task.id))
+
+    def _reprioritize(self, task_id: str, inherited: int) -> None:
+        task = self._tasks[task_id]
+        if inherited > task.priority:
+            self._inherited[task_id] = inherited
+        else:
+            self._inherited.pop(task_id, None)
+        if task_id in self._queued:
+            self._push(task)  # the old entry goes stale
+        if self._on_reprioritize is not None:
+            self._on_reprioritize(task)
+
+    def _raise(self, dep_ids: Iterable[str], priority: int) -> None:
+        """Propagate priority up the prerequisite chain until it stops rising."""
+        stack = [(dep_id, priority) for dep_id in dep_ids]
+        while stack:
+            task_id, priority = stack.pop()
+            task = self._tasks.get(task_id)
+            if task is None or task.state in TERMINAL_STATES:
+                continue
+            if self.effective_priority(task_id) >= priority:
+                continue
+            self._reprioritize(task_id, priority)
+            stack.extend((dep, priority) for dep in task.blocked_by)
+
+    def _recompute(self, task_ids: Iterable[str]) -> None:
+        """Recompute inherited priorities from live dependents, then propagate."""
+        stack = list(task_ids)
+        while stack:
+            task_id = stack.pop()
+            task = self._tasks.get(task_id)
+            if task is None or task.state in TERMINAL_STATES:
+                continue
+            inherited = task.priority
+            for dependent_id in self._dependents.get(task_id, ()):
+                dependent = self._tasks.get(dependent_id)
+                if dependent is not None and dependent.state not in TERMINAL_STATES:
+                    inherited = max(inherited, self.effective_priority(dependent_id))
+            if inherited == self.effective_priority(task_id):
+                continue
+            self._reprioritize(task_id, inherited)
+            stack.extend(task.blocked_by)
+
+    def _pick_aged(self, take: bool = True) -> Optional[Task]:
+        """Pick the task with the highest aged priority, oldest first on ties.
+
+        Cost is O(levels + blocked heads) per pick, independent of how many
+        tasks are queued behind each level's oldest eligible entry.
+        """
+        now = self._clock()
+        max_boost = self._aging.max_boost
+        best: Optional[Tuple[int, int]] = None  # (effective priority, -seq)
+        best_pos: Optional[Tuple[int, int]] = None  # (level, index in bucket)
+
+        for level in reversed(list(self._levels)):
+            if best is not None and max_boost is not None:
+                if level + max_boost < best[0]:
+                    break  # no lower level can catch up
+            bucket = self._buckets[level]
+            while bucket and self._schedulable(bucket[0][2], bucket[0][0]) is None:
+                bucket.popleft()  # stale: cancelled, removed or already run
+            for index, (seq, enqueued_at, task_id) in enumerate(bucket):
+                task = self._schedulable(task_id, seq)
+                if task is None or task.blocked_by:
+                    continue
+                key = (level + self._aging.boost(now - enqueued_at), -seq)
+                if best is None or key > best:
+                    best, best_pos = key, (level, index)
+                break  # later entries in this bucket waited less
+            if not bucket:
+                del self._buckets[level]
+                self._levels.remove(level)
+
+        if best_pos is None:
+            return None
+        level, index = best_pos
+        bucket = self._buckets[level]
+        _, _, task_id = bucket[index]
+        if not take:
+            return self._tasks[task_id]
+        del bucket[index]
+        if not bucket:
+            del self._buckets[level]
+            self._levels.remove(level)
+        del self._queued[task_id]
+        self._unindex(task_id)
+        return self._tasks[task_id]
@@ -1,11 +1,17 @@
+import asyncio
+import copy
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
 from typing import Any, Callable, Coroutine, Dict, Optional, Set
 
 from .transitions import LifecycleState, apply_transition
 
 
+class Preempted(Exception):
+    """Raised by Task.safe_point() to stop a skill that is being preempted."""
+
+
 @dataclass
 class Task:
     name: str
@@ -23,11 +29,64 @@ class Task:
     _checkpoint_fn: Optional[Callable[["Task"], Coroutine]] = field(
         default=None, repr=False, compare=False
     )
+    # Return value of the skill's successful run (or the cached one) until the
+    # kernel stores it with the COMPLETED row; kept only if it cannot be stored.
+    result: Any = field(default=None, repr=False, compare=False)
+    # Result of the skill's prepare phase for the current run; not persisted.
+    prepared: Any = field(default=None, repr=False, compare=False)
+    # Set by SkillRunner when it asks the running skill to yield.
+    _preempt: Optional[asyncio.Event] = field(default=None, repr=False, compare=False)
+    # Read-only views of the artifacts published by the tasks this one was
+    # blocked by, by name; set by SkillRunner at launch, released when the
+    # task finishes. Not persisted.
+    artifacts: Dict[str, memoryview] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _publish_fn: Optional[Callable[["Task", str, Any], None]] = field(
+        default=None, repr=False, compare=False
+    )
 
     def transition(self, target: LifecycleState) -> None:
         self.state = apply_transition(self.state, target)
         self.updated_at = datetime.now(timezone.utc)
 
+    def snapshot(self) -> "Task":
+        """Detached copy for readers on another thread; cannot checkpoint."""
+        return replace(
+            self,
+            metadata=copy.deepcopy(self.metadata),
+            blocked_by=set(self.blocked_by),
+            _checkpoint_fn=None,
+            _preempt=None,
+            artifacts={},
+            _publish_fn=None,
+        )
+
+    @property
+    def preempt_requested(self) -> bool:
+        """True once the runner has asked the running skill to stop.
+
+        The skill then has the runner's grace period to reach a safe point
+        (see safe_point()) before it is cancelled outright.
+        """
+        return self._preempt is not None and self._preempt.is_set()
+
+    async def until_preempted(self) -> None:
+        """Wait until preemption is requested (forever outside a runner)."""
+        if self._preempt is None:
+            self._preempt = asyncio.Event()
+        await self._preempt.wait()
+
+    async def safe_point(self) -> None:
+        """Stop here if preemption was requested: checkpoint, raise Preempted.
+
+        Returns immediately otherwise. The runner treats Preempted as the
+        skill yielding, not as a failure.
+        """
+        if self.preempt_requested:
+            await self.checkpoint()
+            raise Preempted()
+
     async def checkpoint(self) -> None:
         """Persist current metadata to storage mid-execution.
 
@@ -36,3 +95,16 @@ class Task:
         """
         if self._checkpoint_fn is not None:
             await self._checkpoint_fn(self)
+
+    def publish(self, name: str, data: Any) -> None:
+        """Hand ``data`` to the tasks blocked by this one without going through storage.
+
+        ``data`` is any C-contiguous buffer (bytes, NumPy array,
+        array.array); it is copied once into shared memory owned by the
+        runner, and dependents launched later find a zero-copy view of it in
+        ``task.artifacts[name]``. Artifacts are not persisted and do not
+        survive a restart.
+        """
+        if self._publish_fn is None:
+            raise RuntimeError("publish() needs a task run by a SkillRunner")
+        self._publish_fn(self, name, data)
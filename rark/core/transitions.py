@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, Set
+from typing import Dict, FrozenSet, Set
 
 
 class LifecycleState(str, Enum):
@@ -33,6 +33,11 @@ VALID_TRANSITIONS: Dict[LifecycleState, Set[LifecycleState]] = {
     LifecycleState.CANCELLED: set(),
 }
 
+# States with no outgoing transitions; rows in these states never change again.
+TERMINAL_STATES: FrozenSet[LifecycleState] = frozenset(
+    state for state, targets in VALID_TRANSITIONS.items() if not targets
+)
+
 
 def apply_transition(current: LifecycleState, target: LifecycleState) -> LifecycleState:
     if target not in VALID_TRANSITIONS[current]:
@@ -189,19 +189,22 @@ async def submit_plan(
 async def wait_for_completion(
     client: httpx.AsyncClient, task_ids: list[str], timeout: float = 30.0
 ) -> None:
-    terminal = {"COMPLETED", "FAILED", "CANCELLED"}
-    deadline = asyncio.get_event_loop().time() + timeout
-    while asyncio.get_event_loop().time() < deadline:
-        states = []
-        for tid in task_ids:
-            r = await client.get(f"{BASE_URL}/tasks/{tid}")
-            r.raise_for_status()
-            states.append(r.json()["state"])
-        logger.info("[http]    states: %s", dict(zip([t[:8] for t in task_ids], states)))
-        if all(s in terminal for s in states):
-            return
-        await asyncio.sleep(0.5)
-    raise TimeoutError("tasks did not finish within timeout")
+    """Long-poll GET /tasks/{id}/wait for every task; returns when all are terminal."""
+    terminal = {"completed", "failed", "cancelled"}
+
+    async def wait_one(tid: str) -> str:
+        r = await client.get(
+            f"{BASE_URL}/tasks/{tid}/wait",
+            params={"timeout": timeout},
+            timeout=timeout + 5,
+        )
+        r.raise_for_status()
+        return r.json()["state"]
+
+    states = await asyncio.gather(*(wait_one(tid) for tid in task_ids))
+    logger.info("[http]    states: %s", dict(zip([t[:8] for t in task_ids], states)))
+    if not all(s in terminal for s in states):
+        raise TimeoutError("tasks did not finish within timeout")
 
 
 async def run_demo(use_claude: bool) -> None:
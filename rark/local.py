@@ -0,0 +1,348 @@
+"""Local command channel: length-prefixed msgpack over a Unix domain socket.
+
+For on-robot clients (e.g. a perception node firing interrupts) that cannot
+afford an HTTP/JSON round trip. Every frame is a 4-byte big-endian length
+followed by one msgpack map.
+
+Requests carry an ``id`` and an ``op``; the reply echoes the ``id``::
+
+    {"id": 1, "op": "submit", "name": "pour_water", "priority": 5}
+    {"id": 1, "ok": true, "task": {"id": "...", "state": "pending", ...}}
+    {"id": 2, "ok": false, "error": "task not found"}
+
+Ops: ``submit``, ``interrupt``, ``cancel``, ``pause``, ``resume``, ``get``
+and ``subscribe``. After ``subscribe`` the server also pushes
+``{"task": {...}}`` frames (no ``id``) for every persisted state change.
+A subscriber that stops reading is disconnected once the pushes queued for
+it exceed ``max_push_buffer`` bytes; it should reconnect and resync.
+
+The server must run on the kernel's event loop::
+
+    runner = SkillRunner(db_path="robot.db")
+    await runner.start()
+    asyncio.create_task(runner.run_loop())
+    server = await serve_unix(runner, "/run/rark.sock")
+
+    async with await LocalClient.connect("/run/rark.sock") as client:
+        task = await client.interrupt("avoid_obstacle", priority=10)
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import struct
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import msgpack
+
+from .core.admission import AdmissionError
+from .core.runner import SkillRunner
+from .core.task import Task
+from .persistence.blobs import inline_blobs
+
+logger = logging.getLogger("rark")
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME = 16 * 1024 * 1024
+
+
+class LocalError(Exception):
+    """A request was rejected by the server (``ok: false``).
+
+    ``retry_after`` is set (seconds) when a submission was refused by
+    admission control.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _task_dict(task: Task) -> Dict[str, Any]:
+    return {
+        "id": task.id,
+        "name": task.name,
+        "state": task.state.value,
+        "priority": task.priority,
+        "metadata": inline_blobs(task.metadata),
+        "blocked_by": sorted(task.blocked_by),
+    }
+
+
+def _pack(message: Dict[str, Any]) -> bytes:
+    body = msgpack.packb(message, use_bin_type=True)
+    return _HEADER.pack(len(body)) + body
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if length > MAX_FRAME:
+        raise ValueError(f"frame of {length} bytes exceeds MAX_FRAME")
+    return msgpack.unpackb(await reader.readexactly(length), raw=False)
+
+
+# ── Server ─────────────────────────────────────────────────────────────────
+
+
+class _Connection:
+    def __init__(
+        self,
+        runner: SkillRunner,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        max_push_buffer: int,
+    ):
+        self._runner = runner
+        self._reader = reader
+        self._writer = writer
+        self._max_push_buffer = max_push_buffer
+        self._subscribed = False
+        self._ops: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+            "submit": self._submit,
+            "interrupt": self._interrupt,
+            "cancel": self._control(runner.cancel),
+            "pause": self._control(runner.pause),
+            "resume": self._control(runner.resume),
+            "get": self._get,
+            "subscribe": self._subscribe,
+        }
+
+    async def serve(self) -> None:
+        try:
+            while True:
+                request = await _read_frame(self._reader)
+                reply = await self._handle(request)
+                self._writer.write(_pack(reply))
+                await self._writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.warning("local channel closed: %s", e)
+        finally:
+            if self._subscribed:
+                self._runner.remove_listener(self._push)
+            self._writer.close()
+
+    async def _handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        reply: Dict[str, Any] = {"id": request.get("id")}
+        op = self._ops.get(request.get("op"))
+        if op is None:
+            reply.update(ok=False, error=f"unknown op {request.get('op')!r}")
+            return reply
+        try:
+            reply.update(ok=True, **await op(request))
+        except LocalError as e:
+            reply.update(ok=False, error=str(e))
+        except AdmissionError as e:
+            reply.update(ok=False, error=e.reason, retry_after=e.retry_after)
+        except (KeyError, TypeError, ValueError) as e:
+            reply.update(ok=False, error=f"bad request: {e}")
+        return reply
+
+    async def _submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        task = Task(
+            name=request["name"],
+            priority=int(request.get("priority", 5)),
+            metadata=request.get("metadata") or {},
+            blocked_by=set(request.get("blocked_by") or ()),
+        )
+        task = await self._runner.submit(
+            task,
+            client=request.get("client"),
+            idempotency_key=request.get("idempotency_key"),
+        )
+        return {"task": _task_dict(task)}
+
+    async def _interrupt(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        task = Task(
+            name=request["name"],
+            priority=int(request.get("priority", 10)),
+            metadata=request.get("metadata") or {},
+        )
+        task = await self._runner.interrupt(task, dedup_key=request.get("dedup_key"))
+        return {"task": _task_dict(task)}
+
+    def _control(
+        self, command: Callable[[str], Awaitable[None]]
+    ) -> Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]:
+        async def op(request: Dict[str, Any]) -> Dict[str, Any]:
+            task_id = request["task_id"]
+            if self._runner.get_task(task_id) is None:
+                raise LocalError("task not found")
+            await command(task_id)
+            return {"task_id": task_id}
+
+        return op
+
+    async def _get(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        task = self._runner.get_task(request["task_id"])
+        return {"task": _task_dict(task) if task is not None else None}
+
+    async def _subscribe(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._subscribed:
+            self._runner.add_listener(self._push)
+            self._subscribed = True
+        return {}
+
+    def _push(self, task: Task) -> None:
+        if self._writer.is_closing():
+            return
+        if self._writer.transport.get_write_buffer_size() > self._max_push_buffer:
+            # Listeners cannot wait for drain(); rather than buffer without
+            # bound, drop a subscriber that has stopped reading.
+            logger.warning("local channel subscriber fell behind; disconnecting")
+            self._runner.remove_listener(self._push)
+            self._subscribed = False
+            self._writer.transport.abort()
+            return
+        self._writer.write(_pack({"task": _task_dict(task)}))
+
+
+async def serve_unix(
+    runner: SkillRunner, path: str, max_push_buffer: int = 1 << 20
+) -> asyncio.AbstractServer:
+    """Serve the local command channel on ``path``; call on the kernel's loop.
+
+    A stale socket file left by a previous process is replaced. Close the
+    returned server (``server.close(); await server.wait_closed()``) to stop.
+    A subscribed connection is closed when more than ``max_push_buffer``
+    bytes of pushed updates are waiting to be written to it.
+    """
+    if os.path.exists(path):
+        os.unlink(path)
+
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await _Connection(runner, reader, writer, max_push_buffer).serve()
+
+    server = await asyncio.start_unix_server(on_connect, path=path)
+    logger.info("local channel listening on %s", path)
+    return server
+
+
+# ── Client ─────────────────────────────────────────────────────────────────
+
+
+class LocalClient:
+    """Async client for the local command channel.
+
+    Requests may be issued concurrently; replies are matched by ``id``.
+    Tasks come back as plain dicts (see the module docstring).
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._updates: asyncio.Queue = asyncio.Queue()
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, path: str) -> "LocalClient":
+        reader, writer = await asyncio.open_unix_connection(path)
+        return cls(reader, writer)
+
+    async def close(self) -> None:
+        self._writer.close()
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self) -> "LocalClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def request(self, op: str, **args: Any) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(_pack({"id": request_id, "op": op, **args}))
+        await self._writer.drain()
+        reply = await future
+        if not reply.get("ok"):
+            raise LocalError(
+                reply.get("error", "request failed"), reply.get("retry_after")
+            )
+        return reply
+
+    async def submit(
+        self,
+        name: str,
+        priority: int = 5,
+        metadata: Optional[Dict[str, Any]] = None,
+        blocked_by: Optional[list] = None,
+        client: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        reply = await self.request(
+            "submit",
+            name=name,
+            priority=priority,
+            metadata=metadata or {},
+            blocked_by=blocked_by or [],
+            client=client,
+            idempotency_key=idempotency_key,
+        )
+        return reply["task"]
+
+    async def interrupt(
+        self,
+        name: str,
+        priority: int = 10,
+        metadata: Optional[Dict[str, Any]] = None,
+        dedup_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        reply = await self.request(
+            "interrupt",
+            name=name,
+            priority=priority,
+            metadata=metadata or {},
+            dedup_key=dedup_key,
+        )
+        return reply["task"]
+
+    async def cancel(self, task_id: str) -> None:
+        await self.request("cancel", task_id=task_id)
+
+    async def pause(self, task_id: str) -> None:
+        await self.request("pause", task_id=task_id)
+
+    async def resume(self, task_id: str) -> None:
+        await self.request("resume", task_id=task_id)
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        reply = await self.request("get", task_id=task_id)
+        return reply["task"]
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a task dict for every persisted state change, until closed."""
+        await self.request("subscribe")
+        while True:
+            task = await self._updates.get()
+            if task is None:
+                return
+            yield task
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                message = await _read_frame(self._reader)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+                else:
+                    self._updates.put_nowait(message["task"])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("local channel closed"))
+            self._pending.clear()
+            self._updates.put_nowait(None)
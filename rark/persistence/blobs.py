@@ -0,0 +1,177 @@
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Union
+
+
+class BlobStore:
+    """Content-addressed files for large metadata values, one file per SHA-256.
+
+    A blob is written once however many rows reference it; writing an
+    existing digest only refreshes its mtime, which collect() uses to spare
+    blobs referenced by writes that have not committed yet. Reads map the
+    file and hand out a read-only memoryview, so nothing is copied until
+    the caller decodes it.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def write(self, blobs: Dict[str, Union[bytes, memoryview]]) -> None:
+        """Store ``{digest: data}``; blocking, run it off the event loop."""
+        for digest, data in blobs.items():
+            path = self.path(digest)
+            try:
+                os.utime(path)
+                continue
+            except FileNotFoundError:
+                pass
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def open(self, digest: str) -> memoryview:
+        """Read-only view of a blob's bytes backed by a memory mapping.
+
+        The mapping stays alive as long as the view does. Raises
+        FileNotFoundError for unknown digests.
+        """
+        with open(self.path(digest), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b"")
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def digests(self) -> Iterator[str]:
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    if not name.endswith(".tmp"):
+                        yield name
+
+    def collect(self, referenced: Iterable[str], min_age: float = 60.0) -> int:
+        """Delete blobs not in ``referenced`` and untouched for ``min_age`` seconds.
+
+        Returns the number deleted. Blocking, run it off the event loop.
+        """
+        keep: Set[str] = set(referenced)
+        cutoff = time.time() - min_age
+        removed = 0
+        for digest in list(self.digests()):
+            if digest in keep:
+                continue
+            path = self.path(digest)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+class Blob:
+    """Immutable large metadata value, stored once per content hash.
+
+    Tasks loaded from a store with a blob directory hold a Blob in place of
+    each value that was moved out of the row, and nothing is read until
+    view() or value() is called. Writing an unchanged Blob back stores only
+    its reference: it is not re-encoded, re-hashed or re-written. Wrap a
+    large value as ``Blob(value)`` to get the same for values a skill sets;
+    to change it, assign a new Blob.
+    """
+
+    __slots__ = ("_data", "_store", "_digest", "_size", "__weakref__")
+
+    def __init__(self, value: Any):
+        self._data: Optional[bytes] = json.dumps(value).encode()
+        self._store: Optional[BlobStore] = None
+        self._digest: Optional[str] = None
+        self._size = len(self._data)
+
+    @classmethod
+    def _from_json(cls, data: bytes) -> "Blob":
+        blob = cls.__new__(cls)
+        blob._data, blob._store, blob._digest, blob._size = data, None, None, len(data)
+        return blob
+
+    @classmethod
+    def _stored(cls, store: BlobStore, digest: str, size: int) -> "Blob":
+        blob = cls.__new__(cls)
+        blob._data, blob._store, blob._digest, blob._size = None, store, digest, size
+        return blob
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = BlobStore.digest(self._data)
+        return self._digest
+
+    @property
+    def size(self) -> int:
+        """Length of the value's JSON encoding in bytes."""
+        return self._size
+
+    def view(self) -> memoryview:
+        """Read-only view of the value's JSON bytes, zero-copy for stored blobs.
+
+        Raises FileNotFoundError if the blob file has been deleted.
+        """
+        if self._data is None:
+            return self._store.open(self._digest)
+        return memoryview(self._data).toreadonly()
+
+    def value(self) -> Any:
+        """Decode the value; every call returns a new copy."""
+        with self.view() as view:
+            return json.loads(str(view, "utf-8"))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Blob):
+            return NotImplemented
+        return self.digest == other.digest
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __copy__(self) -> "Blob":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "Blob":
+        return self
+
+    def __repr__(self) -> str:
+        return f"Blob(sha256={self.digest[:12]}…, size={self._size})"
+
+
+def inline_blobs(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of ``metadata`` with Blob values decoded, for wire formats."""
+    if not any(isinstance(value, Blob) for value in metadata.values()):
+        return metadata
+    return {
+        key: value.value() if isinstance(value, Blob) else value
+        for key, value in metadata.items()
+    }
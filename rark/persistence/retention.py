@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, FrozenSet, List, Optional
+
+from ..core.transitions import TERMINAL_STATES, LifecycleState
+from .sqlite_store import SQLiteStore
+
+logger = logging.getLogger("rark")
+
+
+@dataclass
+class RetentionPolicy:
+    """Which terminal rows leave the hot ``tasks`` table, and how often.
+
+    A row is archived when its state is in ``states`` and it is older than
+    ``max_age`` seconds or outside the ``max_count`` most recent rows. With
+    neither bound set, every row in ``states`` is archived on the next sweep.
+    """
+
+    max_age: Optional[float] = None
+    max_count: Optional[int] = None
+    states: FrozenSet[LifecycleState] = field(default=TERMINAL_STATES)
+    interval: float = 60.0  # seconds between sweeps
+    chunk_size: int = 500  # rows per archive transaction
+    archive_dir: Optional[str] = None  # default: "<db_path>-archive"
+    archive_format: str = "sqlite"  # "sqlite" | "ndjson"
+    checkpoint_interval: float = 300.0  # min seconds between idle WAL checkpoints
+
+    def __post_init__(self):
+        non_terminal = set(self.states) - TERMINAL_STATES
+        if non_terminal:
+            raise ValueError(f"Only terminal states can be archived: {non_terminal}")
+
+
+class RetentionEngine:
+    """Background task that archives old rows and checkpoints the WAL at idle.
+
+    Archiving runs in ``chunk_size`` transactions with a yield to the event
+    loop between chunks, so kernel writes interleave with a large sweep
+    instead of queueing behind it. WAL checkpoints only run when ``is_idle()``
+    reports that the kernel has no active task and no pending events.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteStore,
+        policy: RetentionPolicy,
+        is_idle: Callable[[], bool] = lambda: True,
+        on_archived: Optional[Callable[[List[str]], None]] = None,
+    ):
+        self._store = store
+        self._policy = policy
+        self._is_idle = is_idle
+        self._on_archived = on_archived
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._loop_task is None:
+            return
+        self._loop_task.cancel()
+        try:
+            await self._loop_task
+        except asyncio.CancelledError:
+            pass
+        self._loop_task = None
+
+    async def sweep(self) -> int:
+        """Archive every row the policy selects; returns the number moved."""
+        policy = self._policy
+        older_than = None
+        if policy.max_age is not None:
+            older_than = datetime.now(timezone.utc) - timedelta(seconds=policy.max_age)
+
+        moved = 0
+        while True:
+            ids = await self._store.select_archivable(
+                policy.states,
+                older_than=older_than,
+                keep_latest=policy.max_count,
+                limit=policy.chunk_size,
+            )
+            if not ids:
+                break
+            moved += await self._store.archive(ids)
+            if self._on_archived is not None:
+                self._on_archived(ids)
+            if len(ids) < policy.chunk_size:
+                break
+            await asyncio.sleep(0)  # let the kernel loop in between chunks
+
+        if moved:
+            logger.info("archived  → %d task(s)", moved)
+            await self._store.collect_blobs()
+        return moved
+
+    async def _run(self) -> None:
+        policy = self._policy
+        poll = min(policy.interval, policy.checkpoint_interval, 1.0)
+        next_sweep = time.monotonic()
+        next_checkpoint = time.monotonic() + policy.checkpoint_interval
+        dirty = False
+        while True:
+            now = time.monotonic()
+            try:
+                if now >= next_sweep:
+                    dirty = await self.sweep() > 0 or dirty
+                    next_sweep = now + policy.interval
+                if now >= next_checkpoint and self._is_idle():
+                    # TRUNCATE after a sweep shrinks the WAL the archive grew;
+                    # otherwise a PASSIVE checkpoint never waits on readers.
+                    await self._store.checkpoint("TRUNCATE" if dirty else "PASSIVE")
+                    dirty = False
+                    next_checkpoint = now + policy.checkpoint_interval
+            except Exception as e:
+                logger.error("retention pass failed: %s", e, exc_info=True)
+            await asyncio.sleep(poll)
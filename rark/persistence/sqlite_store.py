@@ -1,87 +1,1116 @@
+import asyncio
+import gzip
 import json
+import logging
+import os
+import weakref
+import zlib
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import quote
 
 import aiosqlite
 
 from ..core.task import Task
 from ..core.transitions import LifecycleState
+from .blobs import Blob, BlobStore
+
+logger = logging.getLogger("rark")
+
+_COLUMNS = "id, name, priority, state, created_at, updated_at, metadata, blocked_by"
 
 _CREATE_TABLE = """
-CREATE TABLE IF NOT EXISTS tasks (
+CREATE TABLE IF NOT EXISTS {schema}tasks (
     id          TEXT PRIMARY KEY,
     name        TEXT NOT NULL,
     priority    INTEGER NOT NULL,
     state       TEXT NOT NULL,
     created_at  TEXT NOT NULL,
     updated_at  TEXT NOT NULL,
-    metadata    TEXT NOT NULL DEFAULT '{}',
-    blocked_by  TEXT NOT NULL DEFAULT '[]'
+    metadata    TEXT NOT NULL DEFAULT '{{}}',
+    blocked_by  TEXT NOT NULL DEFAULT '[]',
+    seq         INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Serves the retention sweep: "terminal rows older than X" is a range scan.
+_CREATE_STATE_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_tasks_state_updated ON tasks (state, updated_at)
+"""
+
+# Serves the change feed: "rows changed since seq N" is a range scan.
+_CREATE_SEQ_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_tasks_seq ON tasks (seq)
+"""
+
+# Submit idempotency keys; created_at is indexed for the TTL purge.
+_CREATE_IDEMPOTENCY_TABLE = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key         TEXT PRIMARY KEY,
+    task_id     TEXT NOT NULL,
+    created_at  TEXT NOT NULL
+)
+"""
+
+_CREATE_IDEMPOTENCY_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_idempotency_created ON idempotency_keys (created_at)
+"""
+
+_INSERT_KEY = """
+INSERT OR REPLACE INTO idempotency_keys (key, task_id, created_at) VALUES (?, ?, ?)
+"""
+
+# Skill return values, kept out of the tasks rows so upserts and task
+# listings stay small. Payloads are split into RESULT_CHUNK-sized rows so a
+# large result can be streamed without loading it whole.
+_CREATE_RESULTS_TABLE = """
+CREATE TABLE IF NOT EXISTS results (
+    task_id       TEXT PRIMARY KEY,
+    content_type  TEXT NOT NULL,
+    size          INTEGER NOT NULL,
+    chunks        INTEGER NOT NULL,
+    created_at    TEXT NOT NULL
+)
+"""
+
+_CREATE_RESULT_CHUNKS_TABLE = """
+CREATE TABLE IF NOT EXISTS result_chunks (
+    task_id  TEXT NOT NULL,
+    idx      INTEGER NOT NULL,
+    data     BLOB NOT NULL,
+    PRIMARY KEY (task_id, idx)
+)
+"""
+
+_INSERT_RESULT = """
+INSERT OR REPLACE INTO results (task_id, content_type, size, chunks, created_at)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+_INSERT_RESULT_CHUNK = """
+INSERT OR REPLACE INTO result_chunks (task_id, idx, data) VALUES (?, ?, ?)
+"""
+
+RESULT_CHUNK = 64 * 1024
+
+# Compression dictionaries for metadata, one per skill name (see
+# SQLiteStore(metadata_codec="zlib-dict")); referenced by id from the rows.
+_CREATE_ZDICT_TABLE = """
+CREATE TABLE IF NOT EXISTS metadata_dicts (
+    id     INTEGER PRIMARY KEY,
+    name   TEXT NOT NULL,
+    zdict  BLOB NOT NULL
 )
 """
 
+_INSERT_ZDICT = "INSERT OR REPLACE INTO metadata_dicts (id, name, zdict) VALUES (?, ?, ?)"
+
+# A metadata value stored as TEXT is JSON. One stored as a BLOB starts with
+# a two-byte marker: the serialization, then the codec; "zlib-dict" rows
+# follow it with the 4-byte id of their dictionary.
+_JSON, _MSGPACK = b"J", b"M"
+_RAW, _ZLIB, _ZDICT = b"-", b"z", b"d"
+METADATA_FORMATS = ("json", "msgpack")
+METADATA_CODECS = ("zlib", "zlib-dict")
+_ZDICT_SIZE = 32 * 1024  # zlib only uses the last 32 KiB of a dictionary
+
+_UPSERT = """
+INSERT INTO tasks (id, name, priority, state, created_at, updated_at, metadata, blocked_by, seq)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    priority   = excluded.priority,
+    state      = excluded.state,
+    updated_at = excluded.updated_at,
+    metadata   = excluded.metadata,
+    blocked_by = excluded.blocked_by,
+    seq        = excluded.seq
+"""
+
+# Store-wide counters. "seq" is the change sequence's high-water mark,
+# written in the same transaction as the rows: MAX(seq) over the hot table
+# goes back down once retention archives the newest rows.
+_CREATE_META_TABLE = """
+CREATE TABLE IF NOT EXISTS store_meta (
+    key    TEXT PRIMARY KEY,
+    value  INTEGER NOT NULL
+)
+"""
+
+_SET_SEQ = """
+INSERT INTO store_meta (key, value) VALUES ('seq', ?)
+ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+"""
+
+ARCHIVE_FORMATS = ("sqlite", "ndjson")
+
+# Writer priorities: kernel transitions always go before housekeeping.
+WRITE_KERNEL = 0
+WRITE_BACKGROUND = 1
+
+
+class _PriorityLock:
+    """Writer lock granting queued kernel writes before background writes.
+
+    Ownership is handed directly to the next waiter on release, so a stream
+    of kernel writes can never be overtaken by a background writer that
+    happens to be scheduled first.
+    """
+
+    def __init__(self):
+        self._locked = False
+        self._waiters: List[Deque[asyncio.Future]] = [deque(), deque()]
+
+    async def acquire(self, priority: int) -> None:
+        if not self._locked and not any(self._waiters):
+            self._locked = True
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # granted just as we were cancelled
+            else:
+                self._waiters[priority].remove(fut)
+            raise
+
+    def release(self) -> None:
+        for waiters in self._waiters:
+            while waiters:
+                fut = waiters.popleft()
+                if not fut.done():
+                    fut.set_result(None)
+                    return
+        self._locked = False
+
 
 class SQLiteStore:
-    def __init__(self, db_path: str = "rark.db"):
+    def __init__(
+        self,
+        db_path: str = "rark.db",
+        archive_dir: Optional[str] = None,
+        archive_format: str = "sqlite",
+        archive_partition: str = "%Y-%m",
+        readers: int = 2,
+        blob_dir: Optional[str] = None,
+        blob_threshold: Optional[int] = None,
+        metadata_format: str = "json",
+        metadata_codec: Optional[str] = None,
+        compress_threshold: int = 1024,
+    ):
+        """
+        Parameters
+        ----------
+        db_path : str
+            SQLite database path, ":memory:" for tests.
+        archive_dir : str, optional
+            Directory holding archived rows. Defaults to ``<db_path>-archive``
+            next to the database (no default for ":memory:").
+        archive_format : str
+            ``"sqlite"`` (one database per partition) or ``"ndjson"``
+            (one gzip-compressed NDJSON file per partition).
+        archive_partition : str
+            ``strftime`` pattern applied to a row's ``updated_at`` to pick its
+            partition; the default gives one archive per month.
+        readers : int
+            Size of the read-only connection pool used by queries. Reads never
+            wait on the writer connection, so history queries do not delay
+            kernel commits (WAL lets readers and the writer run concurrently).
+            An in-memory store is private to its connection and always reads
+            through the writer.
+        blob_dir : str, optional
+            Directory of the content-addressed blob store. Defaults to
+            ``<db_path>-blobs`` (required for ":memory:" when blobs are on).
+        blob_threshold : int, optional
+            Top-level metadata values whose JSON encoding is at least this
+            many bytes are stored once in the blob store and replaced in the
+            row by a ``{"$blob": sha256, "size": n}`` reference; so are
+            Blob values of any size. Loads hand back lazy Blob handles, and
+            a handle written back unchanged costs only its reference.
+            Archival inlines the values into the archived row and
+            collect_blobs() then deletes blobs no hot row references.
+            Default None: metadata is stored inline.
+        metadata_format : str
+            Serialization of the metadata column: ``"json"`` (TEXT) or
+            ``"msgpack"`` (BLOB, needs the ``local`` extra).
+        metadata_codec : str, optional
+            Compress metadata of ``compress_threshold`` bytes or more:
+            ``"zlib"``, or ``"zlib-dict"``, which seeds a zlib dictionary
+            per skill name from the first large payload of that skill (kept
+            in the ``metadata_dicts`` table) so the repetitive checkpoints of
+            one skill compress well. Every row carries a format marker, so
+            rows written with other settings keep loading. Default None.
+        compress_threshold : int
+            Serialized size in bytes from which ``metadata_codec`` applies.
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive_format: {archive_format!r}")
         self.db_path = db_path
+        if archive_dir is None and db_path != ":memory:":
+            archive_dir = f"{db_path}-archive"
+        self.archive_dir = archive_dir
+        self.archive_format = archive_format
+        self.archive_partition = archive_partition
+        self._blobs: Optional[BlobStore] = None
+        self._blob_threshold = blob_threshold
+        if blob_threshold is not None:
+            if blob_threshold < 1:
+                raise ValueError("blob_threshold must be positive")
+            if blob_dir is None:
+                if db_path == ":memory:":
+                    raise ValueError("blob_dir is required for an in-memory store")
+                blob_dir = f"{db_path}-blobs"
+            self._blobs = BlobStore(blob_dir)
+        if metadata_format not in METADATA_FORMATS:
+            raise ValueError(f"Unknown metadata_format: {metadata_format!r}")
+        if metadata_codec is not None and metadata_codec not in METADATA_CODECS:
+            raise ValueError(f"Unknown metadata_codec: {metadata_codec!r}")
+        if metadata_format == "msgpack":
+            _msgpack()
+        self._metadata_format = metadata_format
+        self._metadata_codec = metadata_codec
+        self._compress_threshold = compress_threshold
+        # dictionary id -> dictionary; skill name -> id of its dictionary
+        self._zdicts: Dict[int, bytes] = {}
+        self._zdict_ids: Dict[str, int] = {}
+        # id -> metadata_dicts row not committed yet; every write inserts the
+        # ones its rows use ahead of them, until one of those writes commits
+        self._unstored_zdicts: Dict[int, tuple] = {}
+        self._reader_count = 0 if db_path == ":memory:" else readers
+        # Writer connection: its own aiosqlite thread, used only under _write_lock.
         self._db: Optional[aiosqlite.Connection] = None
+        self._write_lock = _PriorityLock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._batch_depth = 0
+        self._deferred: Dict[str, tuple] = {}
+        self._deferred_keys: List[tuple] = []
+        self._deferred_blobs: Dict[str, Blob] = {}
+        # digest -> live handle; its blob is on disk and collect_blobs()
+        # keeps it while the handle is referenced anywhere
+        self._handles: "weakref.WeakValueDictionary[str, Blob]" = (
+            weakref.WeakValueDictionary()
+        )
+        # task_id -> (results row, chunks) deferred by batch(); readable
+        # until the batch's transaction has committed
+        self._deferred_results: Dict[str, Tuple[tuple, List[bytes]]] = {}
+        # Change sequence, stored in the row's seq column. Numbers are taken
+        # under the writer lock so they commit in increasing order.
+        self._seq = 0
 
     async def open(self) -> None:
         self._db = await aiosqlite.connect(self.db_path)
         await self._db.execute("PRAGMA journal_mode=WAL")
-        await self._db.execute(_CREATE_TABLE)
+        await self._db.execute(_CREATE_TABLE.format(schema=""))
+        async with self._db.execute("PRAGMA table_info(tasks)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "seq" not in columns:  # database created before the change feed
+            await self._db.execute(
+                "ALTER TABLE tasks ADD COLUMN seq INTEGER NOT NULL DEFAULT 0"
+            )
+        await self._db.execute(_CREATE_STATE_INDEX)
+        await self._db.execute(_CREATE_SEQ_INDEX)
+        await self._db.execute(_CREATE_IDEMPOTENCY_TABLE)
+        await self._db.execute(_CREATE_IDEMPOTENCY_INDEX)
+        await self._db.execute(_CREATE_RESULTS_TABLE)
+        await self._db.execute(_CREATE_RESULT_CHUNKS_TABLE)
+        await self._db.execute(_CREATE_ZDICT_TABLE)
+        await self._db.execute(_CREATE_META_TABLE)
         await self._db.commit()
+        async with self._db.execute(
+            "SELECT id, name, zdict FROM metadata_dicts ORDER BY id"
+        ) as cursor:
+            for zdict_id, name, zdict in await cursor.fetchall():
+                self._zdicts[zdict_id] = zdict
+                self._zdict_ids[name] = zdict_id
+        async with self._db.execute(
+            "SELECT MAX(COALESCE((SELECT MAX(seq) FROM tasks), 0),"
+            " COALESCE((SELECT value FROM store_meta WHERE key = 'seq'), 0))"
+        ) as cursor:
+            (self._seq,) = await cursor.fetchone()
+
+        self._idle_readers = asyncio.Queue()
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        for _ in range(self._reader_count):
+            reader = await aiosqlite.connect(uri, uri=True)
+            await reader.execute("PRAGMA query_only=1")
+            self._readers.append(reader)
+            self._idle_readers.put_nowait(reader)
 
     async def close(self) -> None:
+        for reader in self._readers:
+            await reader.close()
+        self._readers.clear()
+        self._idle_readers = None
         if self._db:
             await self._db.close()
             self._db = None
 
+    @asynccontextmanager
+    async def _writer(
+        self, priority: int = WRITE_KERNEL
+    ) -> AsyncIterator[aiosqlite.Connection]:
+        await self._write_lock.acquire(priority)
+        try:
+            yield self._db
+        finally:
+            self._write_lock.release()
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        if not self._readers:
+            yield self._db
+            return
+        reader = await self._idle_readers.get()
+        try:
+            yield reader
+        finally:
+            self._idle_readers.put_nowait(reader)
+
     async def upsert(self, task: Task) -> None:
-        await self._db.execute(
-            """
-            INSERT INTO tasks (id, name, priority, state, created_at, updated_at, metadata, blocked_by)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET
-                state      = excluded.state,
-                updated_at = excluded.updated_at,
-                metadata   = excluded.metadata,
-                blocked_by = excluded.blocked_by
-            """,
-            (
-                task.id,
-                task.name,
-                task.priority,
-                task.state.value,
-                task.created_at.isoformat(),
-                task.updated_at.isoformat(),
-                json.dumps(task.metadata),
-                json.dumps(sorted(task.blocked_by)),
-            ),
+        blobs: Dict[str, Blob] = {}
+        row = (
+            task.id,
+            task.name,
+            task.priority,
+            task.state.value,
+            task.created_at.isoformat(),
+            task.updated_at.isoformat(),
+            self._encode_metadata(task, blobs),
+            json.dumps(sorted(task.blocked_by)),
         )
-        await self._db.commit()
+        if self._batch_depth:
+            self._deferred[task.id] = row  # snapshot now; last write per task wins
+            self._deferred_blobs.update(blobs)
+            return
+        # Queue for the writer before any await: the FIFO lock then commits
+        # writes of the same task in the order their snapshots were taken.
+        async with self._writer() as db:
+            await self._write_blobs(blobs)  # before the row referencing them
+            zdicts = self._zdicts_for([row])
+            self._seq += 1
+            await db.executemany(_INSERT_ZDICT, zdicts)
+            await db.execute(_UPSERT, row + (self._seq,))
+            await db.execute(_SET_SEQ, (self._seq,))
+            await db.commit()
+            self._zdicts_committed(zdicts)
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[None]:
+        """Defer upserts made inside the block and commit them in one transaction.
+
+        Rows are serialized when upsert() is called, so the committed state is
+        the same as with one commit per upsert. The writer lock is only taken
+        for the final flush; code inside the block may itself await writes.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and (
+                self._deferred or self._deferred_keys or self._deferred_results
+            ):
+                rows = list(self._deferred.values())
+                keys = self._deferred_keys
+                results = dict(self._deferred_results)
+                blobs = self._deferred_blobs
+                self._deferred.clear()
+                self._deferred_keys = []
+                self._deferred_blobs = {}
+                async with self._writer() as db:
+                    await self._write_blobs(blobs)
+                    zdicts = self._zdicts_for(rows)
+                    await db.executemany(_INSERT_ZDICT, zdicts)
+                    rows = [row + (self._seq + i,) for i, row in enumerate(rows, 1)]
+                    self._seq += len(rows)
+                    await db.executemany(_UPSERT, rows)
+                    if rows:
+                        await db.execute(_SET_SEQ, (self._seq,))
+                    await db.executemany(_INSERT_KEY, keys)
+                    await db.executemany(
+                        _INSERT_RESULT, [header for header, _ in results.values()]
+                    )
+                    await db.executemany(
+                        _INSERT_RESULT_CHUNK,
+                        [
+                            (task_id, i, chunk)
+                            for task_id, (_, chunks) in results.items()
+                            for i, chunk in enumerate(chunks)
+                        ],
+                    )
+                    await db.commit()
+                    self._zdicts_committed(zdicts)
+                for task_id, entry in results.items():
+                    if self._deferred_results.get(task_id) is entry:
+                        del self._deferred_results[task_id]
+
+    async def get(self, task_id: str) -> Optional[Task]:
+        """Return the persisted task with this id from the hot table, if any."""
+        async with self._reader() as db:
+            async with db.execute(
+                f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (task_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        return self._row_to_task(row) if row is not None else None
+
+    # ------------------------------------------------------------------
+    # Idempotency keys
+    # ------------------------------------------------------------------
+
+    async def add_idempotency_key(
+        self, key: str, task_id: str, created_at: datetime
+    ) -> None:
+        """Record ``key`` → ``task_id``, replacing an expired binding.
+
+        Inside batch() the row is committed in the batch's transaction, so a
+        key is never persisted without its task (or the other way round).
+        """
+        row = (key, task_id, created_at.isoformat())
+        if self._batch_depth:
+            self._deferred_keys.append(row)
+            return
+        async with self._writer() as db:
+            await db.execute(_INSERT_KEY, row)
+            await db.commit()
+
+    async def load_idempotency_keys(
+        self, since: datetime
+    ) -> List[Tuple[str, str, datetime]]:
+        """Return ``(key, task_id, created_at)`` created at or after ``since``, oldest first."""
+        async with self._reader() as db:
+            async with db.execute(
+                "SELECT key, task_id, created_at FROM idempotency_keys "
+                "WHERE created_at >= ? ORDER BY created_at",
+                (since.isoformat(),),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [(key, task_id, datetime.fromisoformat(ts)) for key, task_id, ts in rows]
+
+    async def purge_idempotency_keys(self, before: datetime) -> int:
+        """Delete keys created before ``before``; returns the number removed."""
+        async with self._writer(WRITE_BACKGROUND) as db:
+            cursor = await db.execute(
+                "DELETE FROM idempotency_keys WHERE created_at < ?",
+                (before.isoformat(),),
+            )
+            await db.commit()
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Skill results
+    # ------------------------------------------------------------------
+
+    async def put_result(self, task_id: str, value: Any) -> None:
+        """Store a skill's return value; bytes and str as-is, anything else as JSON.
+
+        Raises TypeError for values JSON cannot encode. Inside batch() the
+        result commits with the batch, i.e. with the task's COMPLETED row,
+        and the read methods below already see it.
+        """
+        content_type, data = _encode_result(value)
+        chunks = [
+            data[offset : offset + RESULT_CHUNK]
+            for offset in range(0, len(data), RESULT_CHUNK)
+        ]
+        header = (
+            task_id,
+            content_type,
+            len(data),
+            len(chunks),
+            datetime.now(timezone.utc).isoformat(),
+        )
+        if self._batch_depth:
+            self._deferred_results[task_id] = (header, chunks)
+            return
+        async with self._writer() as db:
+            await db.execute(_INSERT_RESULT, header)
+            await db.executemany(
+                _INSERT_RESULT_CHUNK,
+                [(task_id, i, chunk) for i, chunk in enumerate(chunks)],
+            )
+            await db.commit()
+
+    async def result_info(self, task_id: str) -> Optional[Tuple[str, int, int]]:
+        """Return ``(content_type, size in bytes, chunk count)`` of a stored result."""
+        if task_id in self._deferred_results:
+            return self._deferred_results[task_id][0][1:4]
+        async with self._reader() as db:
+            async with db.execute(
+                "SELECT content_type, size, chunks FROM results WHERE task_id = ?",
+                (task_id,),
+            ) as cursor:
+                row = await cursor.fetchone()
+        return tuple(row) if row is not None else None
+
+    async def read_result_chunk(self, task_id: str, index: int) -> bytes:
+        """Return one RESULT_CHUNK-sized piece of a stored result's encoded bytes."""
+        if task_id in self._deferred_results:
+            return self._deferred_results[task_id][1][index]
+        async with self._reader() as db:
+            async with db.execute(
+                "SELECT data FROM result_chunks WHERE task_id = ? AND idx = ?",
+                (task_id, index),
+            ) as cursor:
+                row = await cursor.fetchone()
+        if row is None:
+            raise KeyError(f"result chunk {index} of {task_id}")
+        return row[0]
+
+    async def load_result(self, task_id: str) -> Any:
+        """Return the decoded result of a task, or None if none is stored."""
+        if task_id in self._deferred_results:
+            (_, content_type, *_), chunks = self._deferred_results[task_id]
+            return _decode_result(content_type, b"".join(chunks))
+        info = await self.result_info(task_id)
+        if info is None:
+            return None
+        async with self._reader() as db:
+            async with db.execute(
+                "SELECT data FROM result_chunks WHERE task_id = ? AND idx < ? ORDER BY idx",
+                (task_id, info[2]),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return _decode_result(info[0], b"".join(row[0] for row in rows))
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    async def collect_blobs(self, min_age: float = 60.0) -> int:
+        """Delete blobs that no hot row references; returns the number deleted.
+
+        Archived rows carry their values inline, so once tasks are archived
+        their blobs become garbage. Blobs of live Blob handles are kept, and
+        so are blobs written or re-referenced within ``min_age`` seconds,
+        covering rows not yet committed.
+        """
+        if self._blobs is None:
+            return 0
+        referenced = set(self._handles.keys())
+        referenced.update(self._deferred_blobs)
+        async with self._reader() as db:
+            async with db.execute(
+                "SELECT metadata FROM tasks "
+                "WHERE typeof(metadata) = 'blob' OR metadata LIKE '%\"$blob\"%'"
+            ) as cursor:
+                async for (metadata,) in cursor:
+                    for value in _decode_metadata(metadata, self._zdicts).values():
+                        digest = _blob_digest(value)
+                        if digest is not None:
+                            referenced.add(digest)
+        removed = await asyncio.to_thread(self._blobs.collect, referenced, min_age)
+        if removed:
+            logger.info("collected → %d blob(s)", removed)
+        return removed
+
+    async def _write_blobs(self, blobs: Dict[str, Blob]) -> None:
+        """Write blobs that no live handle covers; call under the writer lock."""
+        missing = {d: blob for d, blob in blobs.items() if d not in self._handles}
+        if not missing:
+            return
+        await asyncio.to_thread(
+            self._blobs.write, {d: blob.view() for d, blob in missing.items()}
+        )
+        for digest, blob in missing.items():
+            self._handles.setdefault(digest, blob)
+
+    def _row_to_task(self, row: tuple) -> Task:
+        task = _row_to_task(row, self._zdicts)
+        if self._blobs is not None:
+            for key, value in task.metadata.items():
+                digest = _blob_digest(value)
+                if digest is None:
+                    continue
+                blob = self._handles.get(digest)
+                if blob is None:
+                    blob = Blob._stored(self._blobs, digest, value["size"])
+                    self._handles[digest] = blob
+                task.metadata[key] = blob
+        return task
+
+    # ------------------------------------------------------------------
+    # Metadata encoding
+    # ------------------------------------------------------------------
+
+    def _encode_metadata(self, task: Task, blobs: Dict[str, Blob]) -> Union[str, bytes]:
+        metadata, text = task.metadata, None
+        if self._blob_threshold is not None:
+            metadata, text = _pack_metadata(metadata, self._blob_threshold, blobs)
+        codec = self._metadata_codec
+        if self._metadata_format == "json":
+            if text is None:
+                text = json.dumps(metadata, default=_inline_blob)
+            if codec is None or len(text) < self._compress_threshold:
+                return text
+            kind, data = _JSON, text.encode()
+        else:
+            kind, data = _MSGPACK, _msgpack().packb(
+                metadata, use_bin_type=True, default=_inline_blob
+            )
+            if codec is None or len(data) < self._compress_threshold:
+                return kind + _RAW + data
+        if codec == "zlib":
+            return kind + _ZLIB + zlib.compress(data)
+        zdict_id = self._zdict_ids.get(task.name)
+        if zdict_id is None:
+            zdict_id = max(self._zdicts, default=0) + 1
+            self._zdicts[zdict_id] = data[:_ZDICT_SIZE]
+            self._zdict_ids[task.name] = zdict_id
+            self._unstored_zdicts[zdict_id] = (zdict_id, task.name, data[:_ZDICT_SIZE])
+        compressor = zlib.compressobj(zdict=self._zdicts[zdict_id])
+        return (
+            kind
+            + _ZDICT
+            + zdict_id.to_bytes(4, "big")
+            + compressor.compress(data)
+            + compressor.flush()
+        )
+
+    def _zdicts_for(self, rows: List[tuple]) -> List[tuple]:
+        """Uncommitted dictionaries the metadata of ``rows`` is compressed with."""
+        if not self._unstored_zdicts:
+            return []
+        ids = {
+            int.from_bytes(row[6][2:6], "big")
+            for row in rows
+            if isinstance(row[6], bytes) and row[6][1:2] == _ZDICT
+        }
+        return [self._unstored_zdicts[i] for i in sorted(ids) if i in self._unstored_zdicts]
+
+    def _zdicts_committed(self, zdicts: List[tuple]) -> None:
+        for zdict in zdicts:
+            self._unstored_zdicts.pop(zdict[0], None)
+
+    def _archive_metadata(self, rows: List[tuple]) -> Dict[str, Union[str, bytes]]:
+        """Replacement metadata for rows whose value depends on this store.
+
+        Archives are self-contained: blob references are inlined and
+        dictionary-compressed rows recompressed with plain zlib; NDJSON
+        archives take JSON text.
+        """
+        rewritten: Dict[str, Union[str, bytes]] = {}
+        for row in rows:
+            raw = row[6]
+            if isinstance(raw, str):
+                if self._blobs is None or '"$blob"' not in raw:
+                    continue
+            elif (
+                self._blobs is None
+                and raw[1:2] != _ZDICT
+                and self.archive_format == "sqlite"
+            ):
+                continue
+            metadata = _decode_metadata(raw, self._zdicts)
+            if self._blobs is not None:
+                _unpack_metadata(metadata, self._blobs)
+            text = json.dumps(metadata)
+            if isinstance(raw, bytes) and self.archive_format == "sqlite":
+                rewritten[row[0]] = _JSON + _ZLIB + zlib.compress(text.encode())
+            else:
+                rewritten[row[0]] = text
+        return rewritten
 
     async def load_all(self) -> List[Task]:
-        async with self._db.execute(
-            "SELECT id, name, priority, state, created_at, updated_at, metadata, blocked_by FROM tasks"
-        ) as cursor:
-            rows = await cursor.fetchall()
+        async with self._reader() as db:
+            async with db.execute(f"SELECT {_COLUMNS} FROM tasks") as cursor:
+                rows = await cursor.fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    async def query(
+        self,
+        state: Optional[LifecycleState] = None,
+        name: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Task]:
+        """Return persisted tasks, most recently updated first, via the reader pool."""
+        clauses, params = _filters(None, name, state)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        async with self._reader() as db:
+            async with db.execute(
+                f"SELECT {_COLUMNS} FROM tasks{where} "
+                "ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    async def changes(self, since: int = 0, limit: int = 500) -> List[Tuple[int, Task]]:
+        """Return ``(seq, task)`` for rows changed after ``since``, oldest change first.
 
-        tasks = []
+        Each row appears once, at its latest change. Sequence numbers are
+        assigned in commit order, so a reader that resumes from the last seq
+        it saw never misses a committed change. Rows moved to the archive
+        drop out of the feed.
+        """
+        async with self._reader() as db:
+            async with db.execute(
+                f"SELECT seq, {_COLUMNS} FROM tasks WHERE seq > ? ORDER BY seq LIMIT ?",
+                (since, limit),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [(row[0], self._row_to_task(row[1:])) for row in rows]
+
+    async def checkpoint(self, mode: str = "PASSIVE") -> None:
+        """Run a WAL checkpoint (PASSIVE, FULL, RESTART or TRUNCATE)."""
+        async with self._writer(WRITE_BACKGROUND) as db:
+            async with db.execute(f"PRAGMA wal_checkpoint({mode})") as cursor:
+                await cursor.fetchall()
+
+    # ------------------------------------------------------------------
+    # Archival
+    # ------------------------------------------------------------------
+
+    async def select_archivable(
+        self,
+        states: Iterable[LifecycleState],
+        older_than: Optional[datetime] = None,
+        keep_latest: Optional[int] = None,
+        limit: int = 500,
+    ) -> List[str]:
+        """Return up to ``limit`` ids of rows that may be moved to the archive.
+
+        A row qualifies when its state is in ``states`` and it was last
+        updated before ``older_than`` or falls outside the ``keep_latest``
+        most recently updated rows of those states. With neither bound set,
+        every row in ``states`` qualifies.
+        """
+        states = [s.value for s in states]
+        marks = ",".join("?" * len(states))
+        cutoffs: List[str] = []
+        if older_than is not None:
+            cutoffs.append(older_than.isoformat())
+        async with self._reader() as db:
+            if keep_latest == 0:
+                cutoffs.append("~")  # sorts after every ISO timestamp
+            elif keep_latest is not None:
+                async with db.execute(
+                    f"SELECT updated_at FROM tasks WHERE state IN ({marks}) "
+                    "ORDER BY updated_at DESC LIMIT 1 OFFSET ?",
+                    (*states, keep_latest - 1),
+                ) as cursor:
+                    row = await cursor.fetchone()
+                if row is not None:
+                    cutoffs.append(row[0])
+            if older_than is None and keep_latest is None:
+                cutoffs.append("~")
+            if not cutoffs:
+                return []
+            async with db.execute(
+                f"SELECT id FROM tasks WHERE state IN ({marks}) AND updated_at < ? "
+                "ORDER BY updated_at LIMIT ?",
+                (*states, max(cutoffs), limit),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [row[0] for row in rows]
+
+    async def archive(self, task_ids: List[str]) -> int:
+        """Move rows into their time-partitioned archive, one transaction per partition.
+
+        Archive writes replace existing rows, so a crash between the archive
+        write and the delete only leaves a duplicate that the next pass
+        overwrites. Stored results are deleted with the hot rows, not
+        archived. Returns the number of rows moved.
+        """
+        if not task_ids:
+            return 0
+        if self.archive_dir is None:
+            raise RuntimeError("archive_dir is required to archive an in-memory store")
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        marks = ",".join("?" * len(task_ids))
+        async with self._reader() as db:
+            async with db.execute(
+                f"SELECT {_COLUMNS} FROM tasks WHERE id IN ({marks})", task_ids
+            ) as cursor:
+                rows = await cursor.fetchall()
+
+        # id -> metadata to archive instead of the hot row's
+        rewritten: Dict[str, Union[str, bytes]] = {}
+        if self._blobs is not None or any(isinstance(row[6], bytes) for row in rows):
+            rewritten = await asyncio.to_thread(self._archive_metadata, rows)
+            rows = [
+                (*row[:6], rewritten[row[0]], *row[7:]) if row[0] in rewritten else row
+                for row in rows
+            ]
+
+        partitions: Dict[str, List[tuple]] = defaultdict(list)
         for row in rows:
-            id_, name, priority, state, created_at, updated_at, metadata, blocked_by = (
-                row
-            )
-            tasks.append(
-                Task(
-                    id=id_,
-                    name=name,
-                    priority=priority,
-                    state=LifecycleState(state),
-                    created_at=datetime.fromisoformat(created_at),
-                    updated_at=datetime.fromisoformat(updated_at),
-                    metadata=json.loads(metadata),
-                    blocked_by=set(json.loads(blocked_by)),
+            updated_at = datetime.fromisoformat(row[5])
+            partitions[updated_at.strftime(self.archive_partition)].append(row)
+
+        moved = 0
+        for partition, part_rows in sorted(partitions.items()):
+            ids = [row[0] for row in part_rows]
+            if self.archive_format == "sqlite":
+                await self._archive_sqlite(
+                    partition, ids, [(rewritten[i], i) for i in ids if i in rewritten]
                 )
-            )
+            else:
+                path = self._archive_path(partition)
+                await asyncio.to_thread(_append_ndjson, path, part_rows)
+                await self._delete(ids)
+            moved += len(ids)
+        return moved
+
+    async def load_archived(
+        self,
+        task_id: Optional[str] = None,
+        name: Optional[str] = None,
+        state: Optional[LifecycleState] = None,
+    ) -> List[Task]:
+        """Return archived tasks matching the given filters, oldest partition first."""
+        if self.archive_dir is None or not os.path.isdir(self.archive_dir):
+            return []
+        suffix = _ARCHIVE_SUFFIX[self.archive_format]
+        paths = sorted(
+            os.path.join(self.archive_dir, f)
+            for f in os.listdir(self.archive_dir)
+            if f.startswith("tasks-") and f.endswith(suffix)
+        )
+
+        tasks: List[Task] = []
+        for path in paths:
+            if self.archive_format == "sqlite":
+                rows = await _query_archive_db(path, task_id, name, state)
+            else:
+                rows = await asyncio.to_thread(
+                    _scan_ndjson, path, task_id, name, state
+                )
+            tasks.extend(_row_to_task(row) for row in rows)
         return tasks
+
+    def _archive_path(self, partition: str) -> str:
+        suffix = _ARCHIVE_SUFFIX[self.archive_format]
+        return os.path.join(self.archive_dir, f"tasks-{partition}{suffix}")
+
+    async def _archive_sqlite(
+        self, partition: str, ids: List[str], rewritten: List[tuple]
+    ) -> None:
+        marks = ",".join("?" * len(ids))
+        async with self._writer(WRITE_BACKGROUND) as db:
+            await db.execute(
+                "ATTACH DATABASE ? AS archive", (self._archive_path(partition),)
+            )
+            try:
+                await db.execute(_CREATE_TABLE.format(schema="archive."))
+                await db.execute(
+                    f"INSERT OR REPLACE INTO archive.tasks ({_COLUMNS}) "
+                    f"SELECT {_COLUMNS} FROM main.tasks WHERE id IN ({marks})",
+                    ids,
+                )
+                await db.executemany(
+                    "UPDATE archive.tasks SET metadata = ? WHERE id = ?", rewritten
+                )
+                await db.execute(f"DELETE FROM main.tasks WHERE id IN ({marks})", ids)
+                await _delete_results(db, ids, "main.")
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+            finally:
+                await db.execute("DETACH DATABASE archive")
+
+    async def _delete(self, ids: List[str]) -> None:
+        marks = ",".join("?" * len(ids))
+        async with self._writer(WRITE_BACKGROUND) as db:
+            await db.execute(f"DELETE FROM tasks WHERE id IN ({marks})", ids)
+            await _delete_results(db, ids)
+            await db.commit()
+
+
+# ----------------------------------------------------------------------
+# Row helpers
+# ----------------------------------------------------------------------
+
+_ARCHIVE_SUFFIX = {"sqlite": ".db", "ndjson": ".ndjson.gz"}
+_ROW_KEYS = [c.strip() for c in _COLUMNS.split(",")]
+
+
+async def _delete_results(
+    db: aiosqlite.Connection, ids: List[str], schema: str = ""
+) -> None:
+    """Drop the stored results of tasks leaving the hot table (same transaction)."""
+    marks = ",".join("?" * len(ids))
+    await db.execute(f"DELETE FROM {schema}result_chunks WHERE task_id IN ({marks})", ids)
+    await db.execute(f"DELETE FROM {schema}results WHERE task_id IN ({marks})", ids)
+
+
+def _encode_result(value: Any) -> Tuple[str, bytes]:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "application/octet-stream", bytes(value)
+    if isinstance(value, str):
+        return "text/plain; charset=utf-8", value.encode()
+    return "application/json", json.dumps(value).encode()
+
+
+def _decode_result(content_type: str, data: bytes) -> Any:
+    if content_type == "application/octet-stream":
+        return data
+    if content_type.startswith("text/plain"):
+        return data.decode()
+    return json.loads(data)
+
+
+def _pack_metadata(
+    metadata: Dict[str, Any], threshold: int, blobs: Dict[str, Blob]
+) -> Tuple[Dict[str, Any], str]:
+    """Metadata with large values replaced by blob references, and its JSON.
+
+    Values whose JSON is ``threshold`` bytes or more, and Blob values of any
+    size, are collected into ``blobs``. Each value is encoded once and Blob
+    values not at all.
+    """
+    packed: Dict[str, Any] = {}
+    parts: List[str] = []
+    for key, value in metadata.items():
+        if not isinstance(value, Blob):
+            text = json.dumps(value, default=_inline_blob)
+            if len(text) < threshold:  # ASCII: characters are bytes
+                packed[key] = value
+                parts.append(text)
+                continue
+            value = Blob._from_json(text.encode())
+        blobs[value.digest] = value
+        packed[key] = {"$blob": value.digest, "size": value.size}
+        parts.append(json.dumps(packed[key]))
+    if not all(isinstance(key, str) for key in packed):
+        return packed, json.dumps(packed)
+    fields = (f"{json.dumps(key)}: {text}" for key, text in zip(packed, parts))
+    return packed, "{" + ", ".join(fields) + "}"
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError(
+            'metadata_format="msgpack" needs msgpack: pip install "rark[local]"'
+        ) from e
+    return msgpack
+
+
+def _decode_metadata(
+    raw: Union[str, bytes], zdicts: Optional[Dict[int, bytes]] = None
+) -> Dict[str, Any]:
+    if isinstance(raw, str):
+        return json.loads(raw)
+    kind, codec, data = raw[:1], raw[1:2], raw[2:]
+    if codec == _ZLIB:
+        data = zlib.decompress(data)
+    elif codec == _ZDICT:
+        zdict_id = int.from_bytes(data[:4], "big")
+        if not zdicts or zdict_id not in zdicts:
+            raise ValueError(f"metadata needs unknown compression dictionary {zdict_id}")
+        decompressor = zlib.decompressobj(zdict=zdicts[zdict_id])
+        data = decompressor.decompress(data[4:]) + decompressor.flush()
+    if kind == _MSGPACK:
+        return _msgpack().unpackb(data, raw=False)
+    return json.loads(data)
+
+
+def _blob_digest(value: Any) -> Optional[str]:
+    if isinstance(value, dict) and len(value) == 2 and "$blob" in value:
+        return value["$blob"]
+    return None
+
+
+def _inline_blob(value: Any) -> Any:
+    if isinstance(value, Blob):
+        return value.value()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _unpack_metadata(metadata: Dict[str, Any], blobs: BlobStore) -> Dict[str, Any]:
+    """Replace blob references in ``metadata`` by their values in place; returns it."""
+    for key, value in metadata.items():
+        digest = _blob_digest(value)
+        if digest is None:
+            continue
+        try:
+            view = blobs.open(digest)
+        except FileNotFoundError:
+            logger.warning("metadata %r references missing blob %s", key, digest)
+            continue
+        with view:
+            metadata[key] = json.loads(str(view, "utf-8"))
+    return metadata
+
+
+def _row_to_task(row: tuple, zdicts: Optional[Dict[int, bytes]] = None) -> Task:
+    id_, name, priority, state, created_at, updated_at, metadata, blocked_by = row
+    return Task(
+        id=id_,
+        name=name,
+        priority=priority,
+        state=LifecycleState(state),
+        created_at=datetime.fromisoformat(created_at),
+        updated_at=datetime.fromisoformat(updated_at),
+        metadata=_decode_metadata(metadata, zdicts),
+        blocked_by=set(json.loads(blocked_by)),
+    )
+
+
+def _filters(
+    task_id: Optional[str],
+    name: Optional[str],
+    state: Optional[LifecycleState],
+) -> tuple:
+    clauses, params = [], []
+    if task_id is not None:
+        clauses.append("id = ?")
+        params.append(task_id)
+    if name is not None:
+        clauses.append("name = ?")
+        params.append(name)
+    if state is not None:
+        clauses.append("state = ?")
+        params.append(state.value)
+    return clauses, params
+
+
+def _append_ndjson(path: str, rows: List[tuple]) -> None:
+    # Each call appends one gzip member; readers see the concatenation.
+    lines = "".join(json.dumps(dict(zip(_ROW_KEYS, row))) + "\n" for row in rows)
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _scan_ndjson(
+    path: str,
+    task_id: Optional[str],
+    name: Optional[str],
+    state: Optional[LifecycleState],
+) -> List[tuple]:
+    # Later lines win so that a row archived twice after a crash appears once.
+    found: Dict[str, tuple] = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            if task_id is not None and rec["id"] != task_id:
+                continue
+            if name is not None and rec["name"] != name:
+                continue
+            if state is not None and rec["state"] != state.value:
+                continue
+            found[rec["id"]] = tuple(rec[k] for k in _ROW_KEYS)
+    return list(found.values())
+
+
+async def _query_archive_db(
+    path: str,
+    task_id: Optional[str],
+    name: Optional[str],
+    state: Optional[LifecycleState],
+) -> List[tuple]:
+    clauses, params = _filters(task_id, name, state)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    async with aiosqlite.connect(f"file:{quote(path)}?mode=ro", uri=True) as db:
+        async with db.execute(f"SELECT {_COLUMNS} FROM tasks{where}", params) as cursor:
+            return list(await cursor.fetchall())
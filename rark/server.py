@@ -1,13 +1,21 @@
 import asyncio
+import hashlib
+import json
+import math
 from contextlib import asynccontextmanager
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from .core.events import Event, EventType
+from .core.admission import AdmissionError
+from .core.bridge import KernelBridge, KernelThread
 from .core.runner import SkillRunner
 from .core.task import Task
+from .core.transitions import TERMINAL_STATES, LifecycleState
+from .persistence.blobs import inline_blobs
 
 
 # ── Request / Response models ──────────────────────────────────────────────
@@ -17,12 +25,14 @@ class SubmitRequest(BaseModel):
     name: str
     priority: int = 5
     metadata: Dict[str, Any] = {}
+    idempotency_key: Optional[str] = None  # retries with the same key get the original
 
 
 class InterruptRequest(BaseModel):
     name: str
     priority: int = 10
     metadata: Dict[str, Any] = {}
+    dedup_key: Optional[str] = None  # coalescing key; defaults to name
 
 
 class TaskOut(BaseModel):
@@ -33,10 +43,26 @@ class TaskOut(BaseModel):
     metadata: Dict[str, Any]
 
 
+class ChangesOut(BaseModel):
+    seq: int  # pass back as `since` to fetch the next page of changes
+    tasks: List[TaskOut]
+
+
+def _etag_response(request: Request, payload: Any) -> Response:
+    """JSON response tagged with a content hash; 304 if the client already has it."""
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 # ── App factory ────────────────────────────────────────────────────────────
 
 
-def create_app(runner: SkillRunner) -> FastAPI:
+def create_app(runner: SkillRunner, threaded: bool = False) -> FastAPI:
     """
     Create a FastAPI application wrapping a SkillRunner.
 
@@ -50,10 +76,22 @@ def create_app(runner: SkillRunner) -> FastAPI:
 
         app = create_app(runner)
         uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    With ``threaded=True`` the lifespan runs the kernel on its own thread and
+    event loop (see KernelThread), so a flood of HTTP requests cannot delay
+    scheduling or preemption. Routes reach the runner through a KernelBridge
+    either way.
     """
+    kernel = KernelThread(runner) if threaded else None
+    bridge = kernel.bridge if kernel is not None else KernelBridge(runner)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
+        if kernel is not None:
+            await asyncio.to_thread(kernel.start)
+            yield
+            await asyncio.to_thread(kernel.stop)
+            return
         await runner.start()
         loop_task = asyncio.create_task(runner.run_loop())
         yield
@@ -77,44 +115,125 @@ def create_app(runner: SkillRunner) -> FastAPI:
             name=task.name,
             state=task.state.value,
             priority=task.priority,
-            metadata=task.metadata,
+            metadata=inline_blobs(task.metadata),
         )
 
     # ── Routes ────────────────────────────────────────────────────────────
 
-    @app.get("/health", summary="Kernel health + active task")
+    @app.get("/health", summary="Kernel health + active task + result cache stats")
     async def health():
-        active = runner._active_task
+        active = await bridge.active_task()
         return {
             "status": "ok",
             "active_task": _out(active).model_dump() if active else None,
+            "cache": await bridge.cache_stats(),
         }
 
     @app.get("/tasks", response_model=List[TaskOut], summary="List all tasks")
-    async def list_tasks():
-        return [_out(t) for t in runner.list_tasks()]
+    async def list_tasks(request: Request):
+        return _etag_response(request, [_out(t) for t in await bridge.list_tasks()])
+
+    @app.get(
+        "/tasks/changes",
+        response_model=ChangesOut,
+        summary="Persisted tasks changed since a change sequence number",
+    )
+    async def task_changes(
+        since: int = Query(0, ge=0),
+        limit: int = Query(500, ge=1, le=5000),
+    ):
+        changes = await bridge.changes(since=since, limit=limit)
+        return ChangesOut(
+            seq=changes[-1][0] if changes else since,
+            tasks=[_out(t) for _, t in changes],
+        )
+
+    @app.get(
+        "/history",
+        response_model=List[TaskOut],
+        summary="Query persisted tasks, most recent first",
+    )
+    async def history(
+        state: Optional[LifecycleState] = None,
+        name: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=1000),
+        offset: int = Query(0, ge=0),
+    ):
+        tasks = await bridge.history(state=state, name=name, limit=limit, offset=offset)
+        return [_out(t) for t in tasks]
 
     @app.post(
         "/tasks", response_model=TaskOut, status_code=201, summary="Submit a task"
     )
-    async def submit_task(req: SubmitRequest):
+    async def submit_task(req: SubmitRequest, request: Request):
         task = Task(name=req.name, priority=req.priority, metadata=req.metadata)
-        await runner.submit(task)
+        # Rate-limit bucket: explicit client id, else the peer address.
+        client = request.headers.get("x-client-id") or (
+            request.client.host if request.client else None
+        )
+        try:
+            task = await bridge.submit(
+                task, client=client, idempotency_key=req.idempotency_key
+            )
+        except AdmissionError as e:
+            raise HTTPException(
+                status_code=429,
+                detail=e.reason,
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
         return _out(task)
 
     @app.get("/tasks/{task_id}", response_model=TaskOut, summary="Get task by ID")
-    async def get_task(task_id: str):
-        task = runner.get_task(task_id)
+    async def get_task(task_id: str, request: Request):
+        task = await bridge.get_task(task_id)
         if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
+        return _etag_response(request, _out(task))
+
+    @app.get("/tasks/{task_id}/result", summary="Stream a completed task's result")
+    async def get_result(task_id: str):
+        # The body is the skill's return value as stored: raw bytes, UTF-8
+        # text or JSON, sent chunk by chunk straight from the store.
+        info = await bridge.result_info(task_id)
+        if info is None:
+            raise HTTPException(status_code=404, detail="Result not found")
+        content_type, size, chunks = info
+        return StreamingResponse(
+            bridge.result_chunks(task_id, chunks),
+            media_type=content_type,
+            headers={"Content-Length": str(size)},
+        )
+
+    @app.get(
+        "/tasks/{task_id}/wait",
+        response_model=TaskOut,
+        summary="Long-poll until a task reaches a state",
+    )
+    async def wait_task(
+        task_id: str,
+        state: Optional[List[LifecycleState]] = Query(None),
+        timeout: float = Query(30.0, ge=0, le=300),
+    ):
+        # Returns as soon as the task is in one of `state` (default: any
+        # terminal state); after `timeout` returns its current state instead.
+        try:
+            task = await bridge.wait_for(
+                task_id, states=state or TERMINAL_STATES, timeout=timeout
+            )
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Task not found")
+        except asyncio.TimeoutError:
+            task = await bridge.get_task(task_id)
+            if task is None:
+                raise HTTPException(status_code=404, detail="Task not found")
         return _out(task)
 
     @app.delete("/tasks/{task_id}", summary="Cancel a task")
     async def cancel_task(task_id: str):
-        task = runner.get_task(task_id)
+        task = await bridge.get_task(task_id)
         if task is None:
             raise HTTPException(status_code=404, detail="Task not found")
-        await runner.emit(Event(type=EventType.TASK_CANCEL, task_id=task_id))
+        await bridge.cancel(task_id)
         return {"cancelled": task_id}
 
     @app.post(
@@ -125,7 +244,7 @@ def create_app(runner: SkillRunner) -> FastAPI:
     )
     async def interrupt(req: InterruptRequest):
         task = Task(name=req.name, priority=req.priority, metadata=req.metadata)
-        await runner.interrupt(task)
+        task = await bridge.interrupt(task, dedup_key=req.dedup_key)
         return _out(task)
 
     return app
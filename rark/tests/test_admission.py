@@ -0,0 +1,160 @@
+import pytest
+
+from rark.core.admission import AdmissionController, AdmissionError, AdmissionPolicy
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_per_client():
+    """每个客户端独立限速；拒绝时给出补充一个令牌所需的秒数。"""
+    clock = _Clock()
+    ctl = AdmissionController(AdmissionPolicy(rate=2.0, burst=2), clock=clock)
+    ctl.admit(Task(name="a", priority=1), "planner", 0)
+    ctl.admit(Task(name="a", priority=1), "planner", 0)
+    with pytest.raises(AdmissionError) as exc:
+        ctl.admit(Task(name="a", priority=1), "planner", 0)
+    assert exc.value.retry_after == pytest.approx(0.5)
+
+    ctl.admit(Task(name="b", priority=1), "dashboard", 0)  # 其他客户端不受影响
+    clock.now = 0.5
+    ctl.admit(Task(name="a", priority=1), "planner", 0)
+
+
+def test_pending_limit_sheds_lowest_priority_first():
+    ctl = AdmissionController(AdmissionPolicy(max_pending=2))
+    low = Task(name="low", priority=1)
+    mid = Task(name="mid", priority=5)
+    ctl.admit(low, None, 0)
+    ctl.admit(mid, None, 0)
+
+    with pytest.raises(AdmissionError, match="too many pending"):
+        ctl.admit(Task(name="also_low", priority=1), None, 0)  # 不高于最低者，拒绝
+    assert ctl.admit(Task(name="high", priority=9), None, 0) is low
+    assert ctl.pending == 2
+
+    mid.transition(LifecycleState.ACTIVE)
+    ctl.observe(mid)  # 开始执行后不再计入
+    assert ctl.pending == 1
+
+
+def test_refusal_does_not_spend_tokens():
+    """因待执行数超限被拒的提交不消耗限速令牌。"""
+    policy = AdmissionPolicy(max_pending=1, rate=1.0, burst=2, shed=False)
+    ctl = AdmissionController(policy, clock=_Clock())
+    first = Task(name="first", priority=1)
+    ctl.admit(first, "c", 0)
+    for _ in range(3):
+        with pytest.raises(AdmissionError, match="too many pending"):
+            ctl.admit(Task(name="next", priority=9), "c", 0)
+    first.transition(LifecycleState.ACTIVE)
+    ctl.observe(first)
+    ctl.admit(Task(name="next", priority=9), "c", 0)  # 仍有第二个令牌
+
+    with pytest.raises(AdmissionError, match="queue full"):
+        AdmissionController(AdmissionPolicy(max_queue_depth=4)).admit(
+            Task(name="x", priority=1), None, 4
+        )
+
+
+async def test_runner_sheds_victim_and_always_admits_interrupts(temp_db):
+    runner = SkillRunner(db_path=temp_db, admission=AdmissionPolicy(max_pending=1))
+    await runner.start()
+    low = Task(name="low", priority=1)
+    await runner.submit(low)
+    high = Task(name="high", priority=5)
+    await runner.submit(high)  # 淘汰 low：其 TASK_CANCEL 先于 TASK_SUBMIT 处理
+
+    with pytest.raises(AdmissionError):
+        await runner.submit(Task(name="low2", priority=1))
+    for i in range(3):
+        await runner.interrupt(Task(name=f"stop{i}", priority=10))
+
+    while not runner._queue.empty():
+        await runner._dispatch(runner._queue.get_nowait())
+
+    assert low.state == LifecycleState.CANCELLED
+    assert low.metadata["shed"] is True
+    assert high.state == LifecycleState.PENDING
+    persisted = {t.id: t.state for t in await runner._store.load_all()}
+    assert persisted[low.id] == LifecycleState.CANCELLED
+
+    await runner.stop()
+
+
+async def test_recovered_pending_tasks_count_and_can_be_shed(temp_db):
+    """崩溃恢复的 PENDING 任务计入 max_pending，且可被更高优先级的提交淘汰。"""
+    first = SkillRunner(db_path=temp_db)
+    await first.start()
+    leftover = Task(name="leftover", priority=1)
+    await first.submit(leftover)
+    await first._dispatch(first._queue.get_nowait())
+    await first._store.close()  # 模拟崩溃：不经过 stop()
+
+    runner = SkillRunner(db_path=temp_db, admission=AdmissionPolicy(max_pending=1))
+    await runner.start()
+    assert runner._admission.pending == 1
+    with pytest.raises(AdmissionError, match="too many pending"):
+        await runner.submit(Task(name="also_low", priority=1))
+    await runner.submit(Task(name="high", priority=5))
+    await runner._dispatch(runner._queue.get_nowait())
+    recovered = runner.get_task(leftover.id)
+    assert recovered.state == LifecycleState.CANCELLED
+    assert recovered.metadata["shed"] is True
+    await runner.stop()
+
+
+def test_reprioritized_task_is_ranked_at_its_new_priority():
+    """优先级变化后经 reprioritize 重新排序：降低后成为淘汰对象，升高后不再被淘汰。"""
+    priority = {}
+    ctl = AdmissionController(
+        AdmissionPolicy(max_pending=2), priority=lambda t: priority.get(t.id, t.priority)
+    )
+    a, b = Task(name="a", priority=3), Task(name="b", priority=5)
+    ctl.admit(a, None, 0)
+    ctl.admit(b, None, 0)
+
+    priority[b.id] = 1  # 例如继承来的优先级被收回
+    ctl.reprioritize(b)
+    new = Task(name="new", priority=4)
+    assert ctl.admit(new, None, 0) is b
+
+    priority[a.id] = 9  # 未通知也会在取最低者时重新排序
+    assert ctl.admit(Task(name="high", priority=6), None, 0) is new
+
+
+async def test_merge_raised_task_is_not_shed_at_old_priority(temp_db):
+    """合并提升了优先级的待执行任务按新优先级参与淘汰，而不是按准入时的旧优先级。"""
+    runner = SkillRunner(db_path=temp_db, admission=AdmissionPolicy(max_pending=2))
+    await runner.start()
+
+    @runner.skill("scan_room", merge_key=lambda t: t.metadata["room"])
+    async def scan_room(t: Task) -> None:
+        pass
+
+    scan = await runner.submit(Task(name="scan_room", priority=1, metadata={"room": "a"}))
+    mid = await runner.submit(Task(name="tidy", priority=3))
+    merged = await runner.submit(
+        Task(name="scan_room", priority=9, metadata={"room": "a"})
+    )
+    assert merged is scan and scan.priority == 9
+
+    await runner.submit(Task(name="wave", priority=5))  # 淘汰 mid，而不是 scan
+    while not runner._queue.empty():
+        await runner._dispatch(runner._queue.get_nowait())
+    assert mid.state == LifecycleState.CANCELLED and mid.metadata["shed"] is True
+    assert scan.state == LifecycleState.PENDING
+    await runner.stop()
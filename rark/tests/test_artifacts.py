@@ -0,0 +1,95 @@
+import asyncio
+from array import array
+from multiprocessing import shared_memory
+
+import pytest
+
+from rark.core.artifacts import ArtifactStore
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+async def _drain(runner: SkillRunner) -> None:
+    """Process one event from the queue."""
+    event = await runner._queue.get()
+    await runner._dispatch(event)
+
+
+def _exists(name: str) -> bool:
+    try:
+        shared_memory.SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def test_artifacts_live_until_producer_and_consumers_finish():
+    store = ArtifactStore()
+    store.link("grasp", ["detect"])
+    store.link("place", ["detect"])
+    boxes = array("f", [0.1, 0.2, 0.3, 0.4])
+    artifact = store.publish("detect", "boxes", boxes)
+    store.publish("detect", "mask", b"\x00\x01" * 8)
+
+    views = store.views("grasp")
+    assert views["boxes"].format == "f" and views["boxes"].readonly
+    assert views["boxes"].tolist() == pytest.approx(boxes.tolist())
+    assert bytes(views["mask"]) == b"\x00\x01" * 8
+    for view in views.values():
+        view.release()
+
+    store.finish("detect")
+    store.finish("grasp")
+    assert _exists(artifact.segment.name)  # place 仍需要
+    store.finish("place")
+    assert not _exists(artifact.segment.name)
+    assert len(store) == 0
+
+    lonely = store.publish("scan", "cloud", b"x")  # 无依赖者：生产者结束即释放
+    store.finish("scan")
+    assert not _exists(lonely.segment.name)
+    with pytest.raises(ValueError):
+        store.publish("scan", "strided", memoryview(b"abcd")[::2])
+    store.close()
+
+
+async def test_dependent_skill_receives_published_views(temp_db):
+    """detect_object 发布的输出以零拷贝视图交给依赖它的 grasp_object，两者结束后释放。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    seen = {}
+
+    @runner.skill("detect_object")
+    async def detect_object(t: Task) -> None:
+        t.publish("pose", array("d", [0.5, -0.2, 0.9]))
+
+    @runner.skill("grasp_object")
+    async def grasp_object(t: Task) -> None:
+        seen["pose"] = t.artifacts["pose"].tolist()
+
+    detect = await runner.submit(Task(name="detect_object", priority=5))
+    grasp = await runner.submit(
+        Task(name="grasp_object", priority=5, blocked_by={detect.id})
+    )
+    for _ in range(2):
+        await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # detect_object 完成
+    segment = runner._artifacts.get(detect.id, "pose").segment.name
+    assert _exists(segment)
+
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # grasp_object 完成
+    assert grasp.state == LifecycleState.COMPLETED
+    assert seen["pose"] == [0.5, -0.2, 0.9]
+    assert grasp.artifacts == {}
+    assert not _exists(segment)
+    await runner.stop()
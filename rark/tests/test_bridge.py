@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+import pytest
+
+from rark.core.bridge import KernelThread
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+async def _wait_state(kernel: KernelThread, task_id: str, state: LifecycleState) -> Task:
+    for _ in range(200):
+        task = await kernel.bridge.get_task(task_id)
+        if task is not None and task.state == state:
+            return task
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{task_id} never reached {state.value}")
+
+
+async def test_kernel_thread_runs_skills_off_caller_loop(temp_db):
+    """技能在内核线程上执行，调用方只拿到快照。"""
+    runner = SkillRunner(db_path=temp_db)
+    threads = []
+
+    @runner.skill("wave")
+    async def wave(task: Task) -> None:
+        threads.append(threading.current_thread().name)
+        task.metadata["waved"] = True
+
+    kernel = KernelThread(runner)
+    await asyncio.to_thread(kernel.start)
+    try:
+        submitted = await kernel.bridge.submit(Task(name="wave", priority=5))
+        done = await _wait_state(kernel, submitted.id, LifecycleState.COMPLETED)
+
+        assert threads == ["rark-kernel"]
+        assert done.metadata["waved"] is True
+        live = runner.get_task(submitted.id)
+        assert done is not live  # 快照与内核线程上的对象分离
+        done.metadata["waved"] = False
+        assert live.metadata["waved"] is True
+    finally:
+        await asyncio.to_thread(kernel.stop)
+
+
+async def test_kernel_thread_interrupt_and_cancel(temp_db):
+    runner = SkillRunner(db_path=temp_db)
+
+    @runner.skill("slow")
+    async def slow(task: Task) -> None:
+        await asyncio.sleep(100)
+
+    @runner.skill("stop")
+    async def stop(task: Task) -> None:
+        pass
+
+    kernel = KernelThread(runner)
+    await asyncio.to_thread(kernel.start)
+    try:
+        slow_task = await kernel.bridge.submit(Task(name="slow", priority=5))
+        await _wait_state(kernel, slow_task.id, LifecycleState.ACTIVE)
+
+        intr = await kernel.bridge.interrupt(Task(name="stop", priority=10))
+        await _wait_state(kernel, intr.id, LifecycleState.COMPLETED)
+        await _wait_state(kernel, slow_task.id, LifecycleState.ACTIVE)  # 恢复执行
+
+        await kernel.bridge.cancel(slow_task.id)
+        await _wait_state(kernel, slow_task.id, LifecycleState.CANCELLED)
+        for _ in range(200):  # 内存中的状态先于批量事务提交可见
+            history = await kernel.bridge.history(state=LifecycleState.CANCELLED)
+            if history:
+                break
+            await asyncio.sleep(0.01)
+        assert [t.id for t in history] == [slow_task.id]
+    finally:
+        await asyncio.to_thread(kernel.stop)
+
+
+def test_kernel_thread_start_surfaces_errors(temp_db):
+    """runner.start() 失败时，异常在调用 start() 的线程上抛出。"""
+
+    class BrokenRunner(SkillRunner):
+        async def start(self) -> None:
+            raise RuntimeError("store unavailable")
+
+    kernel = KernelThread(BrokenRunner(db_path=temp_db))
+    with pytest.raises(RuntimeError, match="store unavailable"):
+        kernel.start()
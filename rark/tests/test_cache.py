@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from rark.core.cache import ResultCache
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+async def _drain(runner: SkillRunner) -> None:
+    """Process one event from the queue."""
+    event = await runner._queue.get()
+    await runner._dispatch(event)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_and_lru_eviction():
+    """条目按 TTL 过期；超过容量时淘汰最久未使用的键；命中/未命中计数。"""
+    clock = _Clock()
+    cache = ResultCache(ttl=10.0, max_size=2, clock=clock)
+    cache.put("a", None)  # None 也是有效结果
+    cache.put("b", 2)
+    assert cache.lookup("a") == (True, None)  # a 变为最近使用
+    cache.put("c", 3)  # 淘汰 b
+    assert "b" not in cache
+    assert cache.get("c") == 3
+
+    clock.now = 10.0
+    assert cache.lookup("a") == (False, None)
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 1, "size": 1}
+
+
+async def test_cached_query_completes_without_scheduling(temp_db):
+    """缓存命中的提交立即完成，不占用执行槽；不同键或过期后重新执行。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    runs: list[str] = []
+
+    @runner.skill("locate_object", cache_key=lambda t: t.metadata["object"], cache_ttl=60)
+    async def locate_object(t: Task) -> dict:
+        runs.append(t.metadata["object"])
+        return {"x": 1.0, "y": 2.0}
+
+    first = await runner.submit(
+        Task(name="locate_object", priority=5, metadata={"object": "cup"})
+    )
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # TASK_COMPLETE
+    assert await runner.get_result(first.id) == {"x": 1.0, "y": 2.0}
+    assert first.result is None  # 已存储，不再留在内存中
+
+    again = await runner.submit(
+        Task(name="locate_object", priority=5, metadata={"object": "cup"})
+    )
+    assert again.state == LifecycleState.COMPLETED
+    assert again.metadata["cached"]
+    assert await runner.get_result(again.id) == {"x": 1.0, "y": 2.0}
+    assert runner._queue.empty()
+    assert (await runner.wait_for(again.id)) is again
+    assert (await runner._store.get(again.id)).state == LifecycleState.COMPLETED
+
+    other = await runner.submit(
+        Task(name="locate_object", priority=5, metadata={"object": "bowl"})
+    )
+    assert other.state == LifecycleState.PENDING
+    assert runs == ["cup"]
+    assert runner.cache_stats() == {
+        "locate_object": {"hits": 1, "misses": 2, "evictions": 0, "size": 1}
+    }
+    await _drain(runner)
+    await runner.stop()
@@ -1,6 +1,8 @@
+import asyncio
+
 import pytest
 
-from rark.core.events import Event, EventType
+from rark.core.events import Event, EventQueue, EventType
 from rark.core.kernel import RARKKernel
 from rark.core.task import Task
 from rark.core.transitions import LifecycleState
@@ -291,3 +293,73 @@ async def test_crash_recovery_policy_fail(temp_db):
     assert k2._active_task is None
 
     await k2.stop()
+
+
+# ── 事件分道 ──────────────────────────────────────────────────────────────
+
+
+async def test_safety_events_jump_submit_backlog():
+    """INTERRUPT / TASK_CANCEL 排在积压的 TASK_SUBMIT 之前，同道内保持 FIFO。"""
+    queue = EventQueue()
+    for i in range(5):
+        queue.put_nowait(Event(type=EventType.TASK_SUBMIT, task_id=f"s{i}"))
+    queue.put_nowait(Event(type=EventType.TASK_COMPLETE, task_id="done"))
+    queue.put_nowait(Event(type=EventType.INTERRUPT, task_id="intr"))
+    queue.put_nowait(Event(type=EventType.TASK_CANCEL, task_id="cancel"))
+
+    order = [queue.get_nowait().task_id for _ in range(queue.qsize())]
+    assert order == ["intr", "cancel", "done", "s0", "s1", "s2", "s3", "s4"]
+    assert queue.empty()
+
+
+async def test_event_lanes_bound_starvation():
+    queue = EventQueue(starvation_limit=3)
+    queue.put_nowait(Event(type=EventType.TASK_SUBMIT, task_id="submit"))
+    for i in range(10):
+        queue.put_nowait(Event(type=EventType.INTERRUPT, task_id=f"i{i}"))
+
+    order = [queue.get_nowait().task_id for _ in range(5)]
+    assert order == ["i0", "i1", "i2", "submit", "i3"]
+
+
+async def test_run_loop_drains_events_in_one_batch(temp_db):
+    """run_loop 一轮取出全部积压事件，写入合并为一次提交，之后再做调度。"""
+    kernel = RARKKernel(db_path=temp_db, crash_policy="fail")
+    await kernel.start()
+    tasks = [Task(name=f"t{i}", priority=i) for i in range(5)]
+    for task in tasks:
+        await kernel.emit(Event(type=EventType.TASK_SUBMIT, payload={"task": task}))
+
+    commits = 0
+    commit = kernel._store._db.commit
+
+    async def counting_commit():
+        nonlocal commits
+        commits += 1
+        await commit()
+
+    kernel._store._db.commit = counting_commit
+    ticks = 0
+    tick = kernel._tick
+
+    async def counting_tick():
+        nonlocal ticks
+        ticks += 1
+        await tick()
+
+    kernel._tick = counting_tick
+
+    loop_task = asyncio.create_task(kernel.run_loop())
+    await kernel._queue.join()
+    kernel._running = False
+    await loop_task
+
+    # 5 个 SUBMIT 合并为一次提交，随后 _tick 把最高优先级任务置为 ACTIVE
+    assert commits == 2
+    assert ticks >= 1
+    assert kernel._active_task is tasks[-1]
+    persisted = {t.id: t.state for t in await kernel._store.load_all()}
+    assert persisted[tasks[-1].id] == LifecycleState.ACTIVE
+    assert len(persisted) == len(tasks)
+
+    await kernel.stop()
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("msgpack")
+
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+from rark.local import LocalClient, LocalError, _pack, serve_unix
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+async def channel(temp_db, tmp_path):
+    runner = SkillRunner(db_path=temp_db)
+
+    @runner.skill("instant")
+    async def instant(task: Task) -> None:
+        pass
+
+    @runner.skill("slow")
+    async def slow(task: Task) -> None:
+        await asyncio.sleep(100)
+
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+    path = str(tmp_path / "rark.sock")
+    server = await serve_unix(runner, path)
+    client = await LocalClient.connect(path)
+    yield runner, client
+
+    await client.close()
+    server.close()
+    await server.wait_closed()
+    await runner._queue.join()
+    await runner._cancel_running_skill()
+    await runner.stop()
+    loop_task.cancel()
+
+
+async def test_submit_and_get(channel):
+    runner, client = channel
+    task = await client.submit("instant", priority=4, metadata={"cup": "left"})
+    assert task["state"] == "pending"
+    assert task["metadata"] == {"cup": "left"}
+
+    got = await client.get(task["id"])
+    assert got["id"] == task["id"]
+    assert await client.get("missing") is None
+
+
+async def test_subscribe_streams_state_changes(channel):
+    """订阅后按顺序收到 pending → active → completed。"""
+    runner, client = channel
+    updates = client.subscribe()
+    first = asyncio.ensure_future(updates.__anext__())
+    await asyncio.sleep(0.01)  # 等待 subscribe 请求生效
+
+    task = await client.submit("instant")
+    states = [(await first)["state"]]
+    async for update in updates:
+        if update["id"] == task["id"]:
+            states.append(update["state"])
+        if states[-1] == "completed":
+            break
+    assert states == ["pending", "active", "completed"]
+
+
+async def test_interrupt_pause_resume_cancel(channel):
+    runner, client = channel
+    slow = await client.submit("slow", priority=5)
+    await asyncio.sleep(0.15)
+    assert (await client.get(slow["id"]))["state"] == "active"
+
+    intr = await client.interrupt("instant", priority=10)
+    assert intr["name"] == "instant"
+    await asyncio.sleep(0.15)  # 中断任务完成后 slow 恢复执行
+    assert (await client.get(intr["id"]))["state"] == "completed"
+    assert (await client.get(slow["id"]))["state"] == "active"
+
+    await client.pause(slow["id"])
+    await asyncio.sleep(0.05)
+    assert (await client.get(slow["id"]))["state"] == "paused"
+    await client.resume(slow["id"])
+    await client.cancel(slow["id"])
+    await asyncio.sleep(0.05)
+    assert (await client.get(slow["id"]))["state"] == "cancelled"
+
+    with pytest.raises(LocalError, match="not found"):
+        await client.cancel("missing")
+    with pytest.raises(LocalError, match="unknown op"):
+        await client.request("reboot")
+
+
+async def test_subscriber_that_stops_reading_is_disconnected(temp_db, tmp_path):
+    """订阅者不再读取、推送积压超过上限时，取消订阅并关闭连接，而不是无限缓存。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+    path = str(tmp_path / "rark.sock")
+    server = await serve_unix(runner, path, max_push_buffer=64 * 1024)
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(_pack({"id": 1, "op": "subscribe"}))
+    await writer.drain()
+    for _ in range(100):
+        if runner._listeners:
+            break
+        await asyncio.sleep(0.01)
+
+    for _ in range(20):  # 每次推送约 100 KB，远超 socket 缓冲
+        task = Task(name="unregistered", priority=5, metadata={"map": "x" * 100_000})
+        await runner.submit(task)
+    for _ in range(200):
+        if not runner._listeners:
+            break
+        await asyncio.sleep(0.01)
+    assert runner._listeners == []
+    while await asyncio.wait_for(reader.read(1 << 16), timeout=5):
+        pass  # 已进入 socket 的帧读完后即 EOF
+
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    await runner.stop()
+    loop_task.cancel()
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from rark.core.preemption import Preemption, PreemptionPolicy
+from rark.core.runner import SkillRunner
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+async def _drain(runner: SkillRunner) -> None:
+    """Process one event from the queue."""
+    event = await runner._queue.get()
+    await runner._dispatch(event)
+
+
+def test_default_policy_decisions():
+    policy = PreemptionPolicy(defer_above=0.9)
+    active = Task(name="pour_water", priority=5)
+    normal = Task(name="avoid_obstacle", priority=10)
+    critical = Task(name="e_stop", priority=10, metadata={"urgency": "critical"})
+
+    assert policy.decide(active, 0.95, normal) == Preemption.DEFER
+    assert policy.decide(active, 0.5, normal) == Preemption.SAFE_POINT
+    assert policy.decide(active, None, normal) == Preemption.SAFE_POINT
+    assert policy.decide(active, 0.99, critical) == Preemption.PREEMPT
+    with pytest.raises(ValueError):
+        PreemptionPolicy(max_defer=0)
+
+
+async def test_nearly_done_task_finishes_before_interrupt(temp_db):
+    """进度超过阈值的任务先完成，中断随后执行；当前任务不被暂停。"""
+    runner = SkillRunner(db_path=temp_db, preemption=PreemptionPolicy(defer_above=0.9))
+    await runner.start()
+    finish = asyncio.Event()
+    order: list[str] = []
+
+    @runner.skill("pour_water", progress=lambda t: t.metadata["poured"] / 100)
+    async def pour_water(t: Task) -> None:
+        await finish.wait()
+        order.append("pour_water")
+
+    @runner.skill("avoid_obstacle")
+    async def avoid_obstacle(t: Task) -> None:
+        order.append("avoid_obstacle")
+
+    pour = await runner.submit(Task(name="pour_water", priority=5, metadata={"poured": 98}))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+
+    await runner.interrupt(Task(name="avoid_obstacle", priority=10))
+    await _drain(runner)
+    assert pour.state == LifecycleState.ACTIVE
+    assert runner._active_task is pour
+
+    finish.set()
+    await _drain(runner)  # pour_water 完成
+    await runner._tick()  # 中断任务紧接着执行
+    await asyncio.sleep(0)
+    await _drain(runner)
+    assert order == ["pour_water", "avoid_obstacle"]
+    assert pour.state == LifecycleState.COMPLETED
+    await runner.stop()
+
+
+async def test_deferral_is_bounded_and_critical_preempts(temp_db):
+    """延迟执行的中断超过 max_defer 后强制抢占；critical 中断总是立即抢占。"""
+    policy = PreemptionPolicy(defer_above=0.9, max_defer=0.05)
+    runner = SkillRunner(db_path=temp_db, preemption=policy, preempt_grace=0.3)
+    await runner.start()
+
+    @runner.skill("pour_water")
+    async def pour_water(t: Task) -> None:
+        await asyncio.sleep(100)  # 永远停在 99%，也不检查安全点
+
+    @runner.skill("avoid_obstacle")
+    async def avoid_obstacle(t: Task) -> None:
+        pass
+
+    pour = await runner.submit(Task(name="pour_water", priority=5, metadata={"progress": 0.99}))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+
+    await runner.interrupt(Task(name="avoid_obstacle", priority=10))
+    await _drain(runner)
+    assert pour.state == LifecycleState.ACTIVE
+    await _drain(runner)  # max_defer 到期后的强制中断
+    await _drain(runner)  # 宽限期后强制取消，TASK_SUSPEND
+    assert pour.state == LifecycleState.PAUSED
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # avoid_obstacle 完成
+    await runner.resume(pour.id)
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+    assert runner._active_task is pour
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    critical = Task(name="avoid_obstacle", priority=10, metadata={"urgency": "critical"})
+    await runner.interrupt(critical)
+    await _drain(runner)
+    assert loop.time() - started < 0.3  # 不等待宽限期
+    assert pour.state == LifecycleState.PAUSED
+    await runner.stop()
+
+
+async def test_critical_interrupt_during_grace_window_preempts_at_once(temp_db):
+    """宽限期内到达的 critical 中断立即取消 skill，不等待前一个中断的宽限期结束。"""
+    runner = SkillRunner(db_path=temp_db, preemption=PreemptionPolicy(), preempt_grace=1.0)
+    await runner.start()
+    cancelled = []
+
+    @runner.skill("wipe_table")
+    async def wipe_table(t: Task) -> None:
+        try:
+            await asyncio.sleep(100)  # 不检查安全点
+        except asyncio.CancelledError:
+            cancelled.append(t.id)
+            raise
+
+    @runner.skill("avoid_obstacle")
+    async def avoid_obstacle(t: Task) -> None:
+        pass
+
+    wipe = await runner.submit(Task(name="wipe_table", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await runner.interrupt(Task(name="avoid_obstacle", priority=10))
+    await _drain(runner)  # 请求在安全点让出，立即返回
+    assert wipe.state == LifecycleState.ACTIVE and wipe.preempt_requested
+
+    critical = Task(name="avoid_obstacle", priority=10, metadata={"urgency": "critical"})
+    await runner.interrupt(critical)
+    await _drain(runner)
+    assert loop.time() - started < 0.5  # 不等待 1s 宽限期
+    assert wipe.state == LifecycleState.PAUSED
+    assert cancelled == [wipe.id]
+    await asyncio.sleep(0.01)
+    assert runner._queue.empty()  # 先前的让出请求不再产生 TASK_SUSPEND
+    await runner.stop()
@@ -0,0 +1,202 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from rark.core.events import Event, EventType
+from rark.core.kernel import RARKKernel
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+from rark.persistence.retention import RetentionEngine, RetentionPolicy
+from rark.persistence.sqlite_store import SQLiteStore
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+def _finished(name: str, age: float, state=LifecycleState.COMPLETED) -> Task:
+    task = Task(name=name, priority=5)
+    task.transition(LifecycleState.ACTIVE)
+    task.transition(state)
+    task.updated_at = datetime.now(timezone.utc) - timedelta(seconds=age)
+    return task
+
+
+async def test_age_policy_moves_old_terminal_rows(temp_db):
+    """超过 max_age 的终态行被移入归档，新行与非终态行留在热表。"""
+    store = SQLiteStore(temp_db)
+    await store.open()
+
+    old = _finished("old", age=3600)
+    fresh = _finished("fresh", age=1)
+    pending = Task(name="pending", priority=5)
+    pending.updated_at = old.updated_at
+    for t in (old, fresh, pending):
+        await store.upsert(t)
+
+    engine = RetentionEngine(store, RetentionPolicy(max_age=60))
+    assert await engine.sweep() == 1
+
+    hot = {t.name for t in await store.load_all()}
+    assert hot == {"fresh", "pending"}
+    archived = await store.load_archived()
+    assert [t.name for t in archived] == ["old"]
+    assert archived[0].state == LifecycleState.COMPLETED
+    assert os.listdir(store.archive_dir) == [
+        f"tasks-{old.updated_at.strftime('%Y-%m')}.db"
+    ]
+
+    await store.close()
+
+
+async def test_count_policy_keeps_latest_rows(temp_db):
+    """max_count 只保留最近的 N 条终态行，分块归档其余行。"""
+    store = SQLiteStore(temp_db)
+    await store.open()
+
+    for i in range(7):
+        await store.upsert(_finished(f"t{i}", age=100 - i))
+
+    engine = RetentionEngine(store, RetentionPolicy(max_count=2, chunk_size=2))
+    assert await engine.sweep() == 5
+
+    assert {t.name for t in await store.load_all()} == {"t5", "t6"}
+    assert len(await store.load_archived()) == 5
+
+    await store.close()
+
+
+async def test_ndjson_archive_is_queryable(temp_db):
+    """ndjson 格式：归档写入 gzip NDJSON，按 id / state 过滤查询。"""
+    store = SQLiteStore(temp_db, archive_format="ndjson")
+    await store.open()
+
+    done = _finished("done", age=10)
+    failed = _finished("broken", age=10, state=LifecycleState.FAILED)
+    await store.upsert(done)
+    await store.upsert(failed)
+
+    policy = RetentionPolicy(states=frozenset({LifecycleState.FAILED}))
+    assert await RetentionEngine(store, policy).sweep() == 1
+
+    assert [t.name for t in await store.load_all()] == ["done"]
+    (hit,) = await store.load_archived(task_id=failed.id)
+    assert hit.state == LifecycleState.FAILED
+    assert await store.load_archived(state=LifecycleState.COMPLETED) == []
+
+    await store.close()
+
+
+@pytest.mark.parametrize("archive_format", ["sqlite", "ndjson"])
+async def test_archival_inlines_blobs_and_collects_them(temp_db, archive_format):
+    """归档行内联 blob 的值；不再被热表引用的 blob 被回收，仍被引用的保留。"""
+    store = SQLiteStore(temp_db, archive_format=archive_format, blob_threshold=256)
+    await store.open()
+    old_map = {"cells": list(range(200))}
+    new_map = {"cells": list(range(300))}
+    old = _finished("old", age=3600)
+    old.metadata["map"] = old_map
+    fresh = _finished("fresh", age=1)
+    fresh.metadata["map"] = new_map
+    await store.upsert(old)
+    await store.upsert(fresh)
+    for digest in store._blobs.digests():  # 超过 collect 的 min_age
+        os.utime(store._blobs.path(digest), (0, 0))
+
+    assert await RetentionEngine(store, RetentionPolicy(max_age=60)).sweep() == 1
+
+    (archived,) = await store.load_archived()
+    assert archived.metadata["map"] == old_map
+    assert len(list(store._blobs.digests())) == 1
+    (hot,) = await store.load_all()
+    assert hot.metadata["map"].value() == new_map
+
+    await store.close()
+
+
+@pytest.mark.parametrize("archive_format", ["sqlite", "ndjson"])
+async def test_archives_do_not_need_compression_dictionaries(temp_db, archive_format):
+    """字典压缩的行归档后不依赖热库中的字典。"""
+    store = SQLiteStore(
+        temp_db, archive_format=archive_format, metadata_codec="zlib-dict"
+    )
+    await store.open()
+    task = _finished("wipe_table", age=3600)
+    task.metadata["path"] = [[i, i + 1] for i in range(500)]
+    await store.upsert(task)
+
+    assert await RetentionEngine(store, RetentionPolicy(max_age=60)).sweep() == 1
+    (archived,) = await store.load_archived()
+    assert archived.metadata == task.metadata
+
+    await store.close()
+
+
+@pytest.mark.parametrize("archive_format", ["sqlite", "ndjson"])
+async def test_archival_deletes_stored_results(temp_db, archive_format):
+    """归档任务时一并删除其结果行，热库不再保留已归档任务的结果。"""
+    store = SQLiteStore(temp_db, archive_format=archive_format)
+    await store.open()
+    done = _finished("done", age=3600)
+    await store.upsert(done)
+    await store.put_result(done.id, b"x" * 200_000)  # 多个分块
+    fresh = _finished("fresh", age=1)
+    await store.upsert(fresh)
+    await store.put_result(fresh.id, "ok")
+
+    assert await RetentionEngine(store, RetentionPolicy(max_age=60)).sweep() == 1
+    assert await store.load_result(done.id) is None
+    assert await store._db.execute_fetchall(
+        "SELECT 1 FROM result_chunks WHERE task_id = ?", (done.id,)
+    ) == []
+    assert [r[0] for r in await store._db.execute_fetchall("SELECT task_id FROM results")] == [
+        fresh.id
+    ]
+    assert await store.load_result(fresh.id) == "ok"
+    await store.close()
+
+
+async def test_change_seq_survives_archival_and_restart(temp_db):
+    """最新的行被归档后重启，seq 仍从持久化的最大值继续，不会重复使用。"""
+    store = SQLiteStore(temp_db)
+    await store.open()
+    pending = Task(name="pending", priority=5)
+    await store.upsert(pending)
+    await store.upsert(_finished("done", age=3600))
+    (_, last_seq) = [seq for seq, _ in await store.changes()]
+    assert await RetentionEngine(store, RetentionPolicy(max_age=60)).sweep() == 1
+    await store.close()
+
+    reopened = SQLiteStore(temp_db)
+    await reopened.open()
+    pending.transition(LifecycleState.ACTIVE)
+    await reopened.upsert(pending)
+    assert [seq for seq, _ in await reopened.changes()] == [last_seq + 1]
+    await reopened.close()
+
+
+def test_policy_rejects_non_terminal_states():
+    with pytest.raises(ValueError):
+        RetentionPolicy(states=frozenset({LifecycleState.PAUSED}))
+
+
+async def test_kernel_forgets_archived_tasks(temp_db):
+    """kernel 集成：归档后的任务从内存中移除，但仍可从归档查询。"""
+    kernel = RARKKernel(db_path=temp_db, retention=RetentionPolicy(interval=3600))
+    await kernel.start()
+
+    task = Task(name="short_job", priority=5)
+    await kernel.emit(Event(type=EventType.TASK_SUBMIT, payload={"task": task}))
+    await kernel._dispatch(await kernel._queue.get())
+    await kernel._tick()
+    await kernel.emit(Event(type=EventType.TASK_COMPLETE, task_id=task.id))
+    await kernel._dispatch(await kernel._queue.get())
+
+    assert await kernel._retention.sweep() == 1
+    assert kernel.get_task(task.id) is None
+    (archived,) = await kernel._store.load_archived(task_id=task.id)
+    assert archived.state == LifecycleState.COMPLETED
+
+    await kernel.stop()
@@ -144,6 +144,48 @@ async def test_cancel_active_skill(temp_db):
     await runner.stop()
 
 
+async def test_outcome_queued_behind_interrupt_or_cancel_is_applied_first(temp_db):
+    """skill 已完成但 COMPLETE 仍在队列中：先到的中断/取消不会让它重跑或丢失结果"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    runs: list[str] = []
+
+    @runner.skill("wipe_table")
+    async def wipe_table(t: Task) -> str:
+        runs.append(t.id)
+        return "clean"
+
+    @runner.skill("urgent")
+    async def urgent(t: Task) -> None:
+        pass
+
+    wipe = await runner.submit(Task(name="wipe_table", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)  # skill 完成，TASK_COMPLETE 已入队
+    await runner.interrupt(Task(name="urgent", priority=10))
+    await _drain(runner)  # 中断在安全通道中先被处理
+    assert wipe.state == LifecycleState.COMPLETED
+    await _drain(runner)  # 已应用的 TASK_COMPLETE 被跳过
+    assert runner._queue.empty()
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # urgent 完成
+    await runner._tick()
+    assert runs == [wipe.id]
+
+    towel = await runner.submit(Task(name="wipe_table", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+    await runner.cancel(towel.id)
+    await _drain(runner)
+    await _drain(runner)
+    assert towel.state == LifecycleState.COMPLETED
+    assert await runner.get_result(towel.id) == "clean"
+    await runner.stop()
+
+
 # ── Phase 2.2: Skill 重试机制 ─────────────────────────────────────────────
 
 
@@ -346,3 +388,577 @@ async def test_resume_reads_metadata_checkpoint(temp_db):
     assert stages_seen == [0, 1]
 
     await runner.stop()
+
+
+# ── 中断风暴合并 ──────────────────────────────────────────────────────────
+
+
+async def test_interrupt_storm_is_coalesced(temp_db):
+    """窗口内重复中断被合并进同一个任务：只有一个 INTERRUPT 事件。"""
+    runner = SkillRunner(db_path=temp_db, interrupt_window=1.0)
+    await runner.start()
+
+    first = await runner.interrupt(
+        Task(name="avoid_obstacle", priority=10, metadata={"distance": 0.9})
+    )
+    for d in (0.8, 0.7, 0.6):
+        t = await runner.interrupt(
+            Task(name="avoid_obstacle", priority=10, metadata={"distance": d})
+        )
+        assert t is first
+
+    assert runner._queue.qsize() == 1
+    assert len(runner.list_tasks()) == 1
+    assert first.metadata == {"distance": 0.6, "coalesced": 3}
+
+    await runner.stop()
+
+
+async def test_interrupt_coalescing_respects_key_and_state(temp_db):
+    runner = SkillRunner(db_path=temp_db, interrupt_window=1.0)
+    await runner.start()
+
+    a = await runner.interrupt(Task(name="avoid_obstacle", priority=10))
+    b = await runner.interrupt(
+        Task(name="avoid_obstacle", priority=10), dedup_key="rear_bumper"
+    )
+    assert a is not b  # different dedup key
+
+    await _drain(runner)  # INTERRUPT a
+    await runner.emit(Event(type=EventType.TASK_CANCEL, task_id=a.id))
+    await _drain(runner)  # INTERRUPT b
+    await _drain(runner)  # TASK_CANCEL a
+    c = await runner.interrupt(Task(name="avoid_obstacle", priority=10))
+    assert c is not a  # a is no longer pending/active
+
+    await runner.stop()
+
+
+async def test_expired_interrupt_keys_are_evicted(temp_db, monkeypatch):
+    """超出窗口的去重键在下一次 interrupt() 时被清除，表不会随键的种类无限增长。"""
+    runner = SkillRunner(db_path=temp_db, interrupt_window=1.0)
+    await runner.start()
+    clock = [100.0]
+    monkeypatch.setattr("rark.core.runner.time.monotonic", lambda: clock[0])
+
+    for i in range(50):
+        task = Task(name="avoid_obstacle", priority=10)
+        await runner.interrupt(task, dedup_key=f"sensor-{i}")
+        clock[0] += 0.25
+    assert len(runner._recent_interrupts) == 5  # 仅最近 1 秒内的键
+    clock[0] += 1.0
+    last = await runner.interrupt(Task(name="avoid_obstacle", priority=10))
+    assert list(runner._recent_interrupts) == ["avoid_obstacle"]
+    assert runner._recent_interrupts["avoid_obstacle"][0] == last.id
+
+    await runner.stop()
+
+
+async def test_wait_for_resolves_on_transition(temp_db):
+    """wait_for 在状态写入时唤醒；已处于目标状态时立即返回。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+
+    async def greeter(t: Task) -> None:
+        pass
+
+    runner.register("greeter", greeter)
+    task = Task(name="greeter", priority=5)
+    await runner.submit(task)
+
+    active = asyncio.create_task(runner.wait_for(task.id, states={LifecycleState.ACTIVE}))
+    done = asyncio.create_task(runner.wait_for(task.id))
+    await asyncio.sleep(0)
+    assert not active.done() and not done.done()
+
+    await _drain(runner)  # TASK_SUBMIT
+    await runner._tick()  # → ACTIVE
+    assert (await active) is task
+    assert not done.done()
+
+    await asyncio.sleep(0)
+    await _drain(runner)  # TASK_COMPLETE
+    assert (await done).state == LifecycleState.COMPLETED
+    assert runner._waiters == {}
+
+    again = await runner.wait_for(task.id, timeout=0)
+    assert again.state == LifecycleState.COMPLETED
+
+    await runner.stop()
+
+
+async def test_wait_for_timeout_and_unknown_task(temp_db):
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    task = Task(name="idle", priority=5)
+    await runner.submit(task)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await runner.wait_for(task.id, timeout=0.01)
+    assert runner._waiters == {}
+    with pytest.raises(KeyError):
+        await runner.wait_for("missing")
+
+    await runner.stop()
+
+
+async def test_idempotent_submit_returns_original(temp_db):
+    """同一幂等键重复提交返回原任务，不再进入调度器。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    first = await runner.submit(Task(name="pour", priority=5), idempotency_key="k1")
+    retry = await runner.submit(Task(name="pour", priority=5), idempotency_key="k1")
+    other = await runner.submit(Task(name="pour", priority=5), idempotency_key="k2")
+
+    assert retry is first
+    assert other is not first
+    assert len(runner.list_tasks()) == 2
+    while not runner._queue.empty():
+        await runner._dispatch(runner._queue.get_nowait())
+    await runner.stop()
+
+    # 崩溃恢复后键依然有效（已完成的任务也能查到）
+    runner2 = SkillRunner(db_path=temp_db)
+    await runner2.start()
+    again = await runner2.submit(Task(name="pour", priority=5), idempotency_key="k1")
+    assert again.id == first.id
+    assert runner2._queue.empty()
+    await runner2.stop()
+
+
+async def test_idempotency_key_expires(temp_db):
+    runner = SkillRunner(db_path=temp_db, idempotency_ttl=0.05)
+    await runner.start()
+    first = await runner.submit(Task(name="pour", priority=5), idempotency_key="k")
+    await _drain(runner)
+    await asyncio.sleep(0.06)
+    second = await runner.submit(Task(name="pour", priority=5), idempotency_key="k")
+    assert second.id != first.id
+    await _drain(runner)
+    await runner.stop()
+
+    runner2 = SkillRunner(db_path=temp_db)  # 默认 TTL：恢复最新的绑定
+    await runner2.start()
+    assert runner2._idempotency["k"][0] == second.id
+    await runner2.stop()
+
+
+async def test_equivalent_pending_submit_is_merged(temp_db):
+    """同一目标的重复提交合并进仍在等待的任务，等待者一起完成。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+
+    @runner.skill("navigate_to", merge_key=lambda t: t.metadata["target"])
+    async def navigate_to(task: Task) -> None:
+        pass
+
+    first = await runner.submit(
+        Task(name="navigate_to", priority=3, metadata={"target": "kitchen"})
+    )
+    dup = Task(name="navigate_to", priority=7, metadata={"target": "kitchen"})
+    merged = await runner.submit(dup)
+    other = await runner.submit(
+        Task(name="navigate_to", priority=3, metadata={"target": "door"})
+    )
+
+    assert merged is first
+    assert other is not first
+    assert first.priority == 7 and first.metadata["merged"] == 1
+    assert runner.get_task(dup.id) is first
+    assert len(runner.list_tasks()) == 2
+
+    waiter = asyncio.create_task(runner.wait_for(dup.id))
+    await _drain(runner)  # TASK_SUBMIT first
+    await _drain(runner)  # TASK_SUBMIT other
+    await runner._tick()
+    assert runner._active_task is first  # 提升后的优先级生效
+    await asyncio.sleep(0)
+    await _drain(runner)  # TASK_COMPLETE
+    assert (await waiter) is first
+
+    # 已开始执行的任务不再合并
+    late = await runner.submit(
+        Task(name="navigate_to", priority=3, metadata={"target": "kitchen"})
+    )
+    assert late is not first
+    await _drain(runner)
+    assert (await runner._store.get(first.id)).priority == 7
+    await runner.stop()
+
+
+async def test_staged_skill_skips_completed_stages_on_resume(temp_db):
+    """异步生成器 skill：每个 yield 的阶段完成后自动 checkpoint，resume 时跳过已完成阶段。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    calls: list[str] = []
+    results: list = []
+    released = asyncio.Event()
+
+    async def stage(label: str) -> str:
+        calls.append(label)
+        if label == "pour":
+            await released.wait()  # 第一次运行阻塞在此处被中断
+        return label
+
+    @runner.skill("pour_water")
+    async def pour_water(t: Task):
+        results.append((yield stage("move")))
+        results.append((yield lambda: stage("pour")))
+
+    @runner.skill("urgent")
+    async def urgent(t: Task) -> None:
+        pass
+
+    task = await runner.submit(Task(name="pour_water", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    while "pour" not in calls:
+        await asyncio.sleep(0.01)  # move 完成并写入 checkpoint，阻塞在 pour
+    assert task.metadata["stage"] == 1
+    assert (await runner._store.get(task.id)).metadata["stage"] == 1
+
+    await runner.interrupt(Task(name="urgent", priority=10))
+    await _drain(runner)
+    assert task.state == LifecycleState.PAUSED
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # urgent 完成
+
+    released.set()
+    await runner._tick()  # resume
+    await _drain(runner)  # TASK_COMPLETE
+
+    assert task.state == LifecycleState.COMPLETED
+    assert calls == ["move", "pour", "pour"]  # move 没有重跑
+    assert results == ["move", None, "pour"]  # 跳过的阶段结果为 None
+    assert task.metadata["stage"] == 2
+    await runner.stop()
+
+
+async def test_preemption_grace_lets_skill_reach_safe_point(temp_db):
+    """宽限期内 skill 在安全点自行让出并保存进度；resume 从该进度继续。"""
+    runner = SkillRunner(db_path=temp_db, preempt_grace=1.0)
+    await runner.start()
+    done_steps: list[int] = []
+    cancelled = []
+
+    @runner.skill("wipe_table")
+    async def wipe_table(t: Task) -> None:
+        try:
+            for step in range(t.metadata.get("step", 0), 3):
+                await asyncio.sleep(0.01)  # 一个不可打断的动作
+                done_steps.append(step)
+                t.metadata["step"] = step + 1
+                await t.safe_point()
+        except asyncio.CancelledError:
+            cancelled.append(t.id)
+            raise
+
+    @runner.skill("urgent")
+    async def urgent(t: Task) -> None:
+        pass
+
+    task = await runner.submit(Task(name="wipe_table", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0.005)  # 第一个动作进行到一半
+
+    await runner.interrupt(Task(name="urgent", priority=10))
+    await _drain(runner)  # 请求让出后立即返回，不阻塞事件循环
+    assert task.state == LifecycleState.ACTIVE and task.preempt_requested
+    await _drain(runner)  # skill 到达安全点后的 TASK_SUSPEND
+    assert task.state == LifecycleState.PAUSED
+    assert done_steps == [0] and task.metadata["step"] == 1
+    assert cancelled == []
+    assert (await runner._store.get(task.id)).metadata["step"] == 1
+
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # urgent 完成
+    await runner._tick()  # resume
+    await _drain(runner)
+    assert task.state == LifecycleState.COMPLETED
+    assert done_steps == [0, 1, 2]
+    await runner.stop()
+
+
+async def test_bare_yield_in_staged_skill_is_a_safe_point(temp_db):
+    """阶段式 skill 中不带值的 yield 是安全点而非阶段：不计入 stage，被抢占时在此让出。"""
+    runner = SkillRunner(db_path=temp_db, preempt_grace=1.0)
+    await runner.start()
+    started: list[int] = []
+    done_steps: list[int] = []
+
+    async def step(i: int) -> None:
+        started.append(i)
+        await asyncio.sleep(0.01)
+        done_steps.append(i)
+
+    @runner.skill("wipe_table")
+    async def wipe_table(t: Task):
+        yield step(0)
+        for i in range(t.metadata.get("step", 1), 3):
+            await step(i)  # 生成器内部的动作，自行记录进度
+            t.metadata["step"] = i + 1
+            yield
+
+    @runner.skill("urgent")
+    async def urgent(t: Task) -> None:
+        pass
+
+    task = await runner.submit(Task(name="wipe_table", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    while started != [0, 1]:
+        await asyncio.sleep(0.001)  # 第 0 阶段已完成，生成器内的动作 1 进行中
+
+    await runner.interrupt(Task(name="urgent", priority=10))
+    await _drain(runner)
+    await _drain(runner)  # 到达裸 yield 后的 TASK_SUSPEND
+    assert task.state == LifecycleState.PAUSED
+    assert done_steps == [0, 1]
+    assert task.metadata == {"stage": 1, "step": 2}
+    assert (await runner._store.get(task.id)).metadata == {"stage": 1, "step": 2}
+
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # urgent 完成
+    await runner._tick()  # resume
+    await _drain(runner)
+    assert task.state == LifecycleState.COMPLETED
+    assert done_steps == [0, 1, 2]
+    assert task.metadata["stage"] == 1
+    await runner.stop()
+
+
+async def test_preemption_grace_expires_or_skill_finishes(temp_db):
+    """不响应的 skill 在宽限期后被强制取消；宽限期内完成的 skill 正常完成。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+
+    @runner.skill("stubborn", preempt_grace=0.05)
+    async def stubborn(t: Task) -> None:
+        await asyncio.sleep(100)
+
+    @runner.skill("almost_done", preempt_grace=1.0)
+    async def almost_done(t: Task) -> None:
+        await asyncio.sleep(0.02)  # 不检查安全点，直接完成
+
+    @runner.skill("urgent")
+    async def urgent(t: Task) -> None:
+        pass
+
+    slow = await runner.submit(Task(name="stubborn", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await runner.interrupt(Task(name="urgent", priority=10))
+    await _drain(runner)
+    assert loop.time() - started < 0.05
+    await _drain(runner)  # 宽限期到期、强制取消后的 TASK_SUSPEND
+    assert 0.05 <= loop.time() - started < 1.0
+    assert slow.state == LifecycleState.PAUSED
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)  # urgent 完成
+    await runner.cancel(slow.id)
+    await _drain(runner)
+
+    quick = await runner.submit(Task(name="almost_done", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+    await runner.interrupt(Task(name="urgent", priority=10))
+    await _drain(runner)
+    await _drain(runner)  # 宽限期内完成，TASK_COMPLETE 照常应用
+    assert quick.state == LifecycleState.COMPLETED
+    assert runner._queue.empty()
+    await runner.stop()
+
+
+async def test_skill_resources_warmed_in_parallel_and_reused(temp_db):
+    """资源在 start() 中并行创建，跨任务复用，作为第二个参数注入，stop() 时释放。"""
+    runner = SkillRunner(db_path=temp_db)
+    opened: list[str] = []
+    closed: list[str] = []
+
+    def opener(name: str):
+        async def open_driver() -> str:
+            await asyncio.sleep(0.1)  # 连接驱动很慢
+            opened.append(name)
+            return f"{name}-driver"
+
+        return open_driver
+
+    seen: list[str] = []
+
+    @runner.skill("grasp", on_startup=opener("gripper"), on_shutdown=closed.append)
+    async def grasp(t: Task, gripper: str) -> None:
+        seen.append(gripper)
+
+    @runner.skill("look", on_startup=opener("camera"))
+    async def look(t: Task, camera: str) -> None:
+        seen.append(camera)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await runner.start()
+    assert loop.time() - started < 0.19  # 两个 0.1s 的连接并行完成
+    assert sorted(opened) == ["camera", "gripper"]
+
+    for name in ("grasp", "grasp", "look"):
+        await runner.submit(Task(name=name, priority=5))
+        await _drain(runner)
+        await runner._tick()
+        await asyncio.sleep(0)
+        await _drain(runner)
+
+    assert seen == ["gripper-driver", "gripper-driver", "camera-driver"]
+    assert len(opened) == 2  # 没有重新连接
+    await runner.stop()
+    assert closed == ["gripper-driver"]
+
+
+async def test_failed_resource_startup_fails_start(temp_db):
+    runner = SkillRunner(db_path=temp_db)
+    closed: list[str] = []
+
+    async def broken() -> None:
+        raise ConnectionError("serial port busy")
+
+    async def noop(t: Task, resource) -> None:
+        pass
+
+    runner.register("ok", noop, on_startup=lambda: "r", on_shutdown=closed.append)
+    runner.register("broken", noop, on_startup=broken)
+    with pytest.raises(ConnectionError):
+        await runner.start()
+    assert closed == ["r"]  # 已创建的资源被释放
+
+
+async def test_prepare_runs_ahead_for_next_task(temp_db):
+    """当前任务执行时预先为下一个任务运行 prepare；队列顺序变化时丢弃过期的准备结果。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    planned: list[str] = []
+    cancelled: list[str] = []
+    used: list = []
+    release = asyncio.Event()
+
+    async def plan(t: Task) -> str:
+        try:
+            await asyncio.sleep(0.01)  # 路径规划
+        except asyncio.CancelledError:
+            cancelled.append(t.metadata["goal"])
+            raise
+        planned.append(t.metadata["goal"])
+        return f"path to {t.metadata['goal']}"
+
+    @runner.skill("pick", prepare=plan)
+    async def pick(t: Task) -> None:
+        used.append(t.prepared)
+        await release.wait()
+
+    first = await runner.submit(Task(name="pick", priority=5, metadata={"goal": "a"}))
+    await runner.submit(Task(name="pick", priority=5, metadata={"goal": "b"}))
+    await _drain(runner)
+    await _drain(runner)
+    await runner._tick()  # a 开始执行（内联准备），b 开始预先准备
+    await asyncio.sleep(0.005)
+
+    # b 还在准备时更高优先级的 c 插队：b 的准备被取消，改为准备 c
+    await runner.submit(Task(name="pick", priority=9, metadata={"goal": "c"}))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0.05)
+    assert used == ["path to a"]
+    assert planned == ["a", "c"] and cancelled == ["b"]
+
+    await runner.submit(Task(name="pick", priority=8, metadata={"goal": "d"}))
+    await _drain(runner)
+    await runner._tick()  # 下一个仍是 c，不重新准备
+    await asyncio.sleep(0.05)
+    assert planned == ["a", "c"]
+
+    release.set()
+    await _drain(runner)  # a 完成
+    await runner._tick()  # c 开始，直接使用预先准备的结果；d 开始准备
+    await asyncio.sleep(0.05)
+    assert used == ["path to a", "path to c"]
+    assert planned == ["a", "c", "d"]
+    assert first.prepared is None  # 运行结束后清除
+    await runner._cancel_running_skill()
+    await runner.stop()
+
+
+async def test_merge_into_next_task_discards_its_preparation(temp_db):
+    """合并改变了下一个任务的 metadata：旧的预先准备被丢弃，按合并后的内容重新准备。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    used: list = []
+    release = asyncio.Event()
+
+    async def plan(t: Task) -> str:
+        await asyncio.sleep(0.01)
+        return f"path to {t.metadata['goal']}"
+
+    @runner.skill("pick", prepare=plan, merge_key=lambda t: t.metadata["object"])
+    async def pick(t: Task) -> None:
+        used.append(t.prepared)
+        await release.wait()
+
+    await runner.submit(Task(name="pick", priority=5, metadata={"object": "cup", "goal": "a"}))
+    await runner.submit(Task(name="pick", priority=5, metadata={"object": "bowl", "goal": "b"}))
+    await _drain(runner)
+    await _drain(runner)
+    await runner._tick()  # cup 开始执行，bowl 开始预先准备
+    await asyncio.sleep(0.05)
+
+    # bowl 的目标在合并后变为 c
+    await runner.submit(Task(name="pick", priority=5, metadata={"object": "bowl", "goal": "c"}))
+    assert runner._speculation is None
+    await runner._tick()  # 重新准备
+    release.set()
+    await _drain(runner)  # cup 完成
+    await runner._tick()
+    await asyncio.sleep(0.05)
+    assert used == ["path to a", "path to c"]
+    await runner._cancel_running_skill()
+    await runner.stop()
+
+
+async def test_skill_results_are_persisted(temp_db):
+    """技能返回值随完成状态持久化；缓存命中同样保存结果，无法编码的结果只记录警告。"""
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+
+    @runner.skill("locate_object", cache_key=lambda t: t.metadata["object"])
+    async def locate_object(t: Task) -> dict:
+        return {"object": t.metadata["object"], "pose": [0.1, 0.2, 0.3]}
+
+    @runner.skill("grab_handle")
+    async def grab_handle(t: Task) -> object:
+        return object()
+
+    first = await runner.submit(Task(name="locate_object", priority=5, metadata={"object": "cup"}))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)
+    pose = {"object": "cup", "pose": [0.1, 0.2, 0.3]}
+    assert await runner.get_result(first.id) == pose
+
+    cached = await runner.submit(Task(name="locate_object", priority=5, metadata={"object": "cup"}))
+    assert await runner.get_result(cached.id) == pose
+
+    handle = await runner.submit(Task(name="grab_handle", priority=5))
+    await _drain(runner)
+    await runner._tick()
+    await asyncio.sleep(0)
+    await _drain(runner)
+    assert handle.state == LifecycleState.COMPLETED
+    assert await runner.get_result(handle.id) is None
+    assert await runner.get_result("missing") is None
+    await runner.stop()
@@ -0,0 +1,196 @@
+import random
+
+import pytest
+
+from rark.core.scheduler import AgingPolicy, Scheduler
+from rark.core.task import Task
+from rark.core.transitions import LifecycleState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("queue", ["heap", "bucket"])
+def test_equal_priority_is_fifo(queue):
+    """同优先级按提交顺序调度，而不是按 UUID 字符串顺序。"""
+    sched = Scheduler(queue=queue)
+    tasks = [Task(name=f"t{i}", priority=5) for i in range(20)]
+    for t in tasks:
+        sched.add(t)
+
+    picked = [sched.pick_next().name for _ in tasks]
+    assert picked == [t.name for t in tasks]
+
+
+def test_without_aging_low_priority_starves():
+    sched = Scheduler()
+    sched.add(Task(name="housekeeping", priority=1))
+    for i in range(5):
+        sched.add(Task(name=f"hot{i}", priority=9))
+        assert sched.pick_next().name == f"hot{i}"
+
+
+def test_aging_promotes_long_waiting_task():
+    """老化：等待足够久的低优先级任务最终超过新到的高优先级任务。"""
+    clock = FakeClock()
+    sched = Scheduler(aging=AgingPolicy(interval=1.0, step=1), clock=clock)
+    sched.add(Task(name="housekeeping", priority=1))
+
+    clock.now = 5.0  # housekeeping effective priority 1 + 5 = 6
+    sched.add(Task(name="fresh_high", priority=5))
+    assert sched.pick_next().name == "housekeeping"
+    assert sched.pick_next().name == "fresh_high"
+
+
+def test_aging_max_boost_caps_promotion():
+    clock = FakeClock()
+    sched = Scheduler(aging=AgingPolicy(interval=1.0, max_boost=2), clock=clock)
+    sched.add(Task(name="housekeeping", priority=1))
+
+    clock.now = 100.0
+    sched.add(Task(name="high", priority=4))
+    assert sched.pick_next().name == "high"  # 1 + 2 < 4
+
+
+def test_aging_ties_prefer_oldest_and_skip_blocked():
+    clock = FakeClock()
+    sched = Scheduler(aging=AgingPolicy(interval=1.0), clock=clock)
+    gate = Task(name="gate", priority=3)
+    blocked = Task(name="blocked", priority=5, blocked_by={gate.id})
+    older = Task(name="older", priority=3)
+    sched.add(blocked)
+    sched.add(older)
+    clock.now = 2.0
+    sched.add(gate)
+    clock.now = 2.5
+    sched.add(Task(name="newer", priority=5))
+
+    # older: 3 + 2 = 5 ties newer: 5 + 0 → older was queued first
+    assert sched.pick_next().name == "older"
+    assert sched.pick_next().name == "newer"
+    assert sched.pick_next().name == "gate"
+    assert sched.pick_next() is None  # blocked still waits on gate
+
+
+def test_bucket_matches_heap_order():
+    """bucket 队列与堆给出完全相同的调度顺序（含范围外优先级）。"""
+    rng = random.Random(3)
+    tasks = [Task(name=str(i), priority=rng.randint(-3, 14)) for i in range(300)]
+    orders = []
+    for queue in ("heap", "bucket"):
+        sched = Scheduler(queue=queue, priority_range=(0, 10))
+        for t in tasks:
+            sched.add(t)
+        orders.append([sched.pick_next().name for _ in tasks])
+        assert sched.pick_next() is None
+    assert orders[0] == orders[1]
+
+
+def test_bucket_keeps_blocked_tasks_in_fifo_order():
+    sched = Scheduler(queue="bucket")
+    gate = Task(name="gate", priority=2)
+    first = Task(name="first", priority=7, blocked_by={gate.id})
+    second = Task(name="second", priority=7, blocked_by={gate.id})
+    for t in (first, second, gate):
+        sched.add(t)
+
+    assert sched.pick_next().name == "gate"
+    sched.release_dependents(gate.id)
+    assert [sched.pick_next().name, sched.pick_next().name] == ["first", "second"]
+
+
+def test_bucket_falls_back_to_heap_for_wide_ranges():
+    sched = Scheduler(queue="bucket", priority_range=(0, 10**6))
+    assert type(sched._queue).__name__ == "_HeapQueue"
+
+
+@pytest.mark.parametrize("queue", ["heap", "bucket"])
+def test_prerequisite_inherits_dependent_priority(queue):
+    """优先级继承：高优先级任务的低优先级前置任务先于无关中优先级任务。"""
+    sched = Scheduler(queue=queue, priority_inheritance=True)
+    prereq = Task(name="prereq", priority=1)
+    sched.add(prereq)
+    sched.add(Task(name="medium", priority=5))
+    sched.add(Task(name="mission", priority=9, blocked_by={prereq.id}))
+
+    assert sched.effective_priority(prereq.id) == 9
+    assert sched.pick_next().name == "prereq"
+
+
+def test_inheritance_is_transitive_and_order_independent():
+    sched = Scheduler(priority_inheritance=True)
+    a = Task(name="a", priority=1)
+    b = Task(name="b", priority=2, blocked_by={a.id})
+    c = Task(name="c", priority=8, blocked_by={b.id})
+    # dependents submitted before their prerequisites
+    for t in (c, b, a):
+        sched.add(t)
+
+    assert sched.effective_priority(b.id) == 8
+    assert sched.effective_priority(a.id) == 8
+
+
+def test_inherited_priority_drops_when_dependent_finishes():
+    sched = Scheduler(priority_inheritance=True)
+    prereq = Task(name="prereq", priority=1)
+    mission = Task(name="mission", priority=9, blocked_by={prereq.id})
+    sched.add(prereq)
+    sched.add(mission)
+    sched.add(Task(name="medium", priority=5))
+
+    mission.transition(LifecycleState.CANCELLED)
+    sched.finish(mission.id)
+
+    assert sched.effective_priority(prereq.id) == 1
+    assert sched.pick_next().name == "medium"
+    assert sched.pick_next().name == "prereq"
+
+
+@pytest.mark.parametrize("queue", ["heap", "bucket"])
+def test_merge_index_tracks_pending_tasks(queue):
+    """合并索引只指向仍为 PENDING 的任务；合并可提升优先级并按新优先级调度。"""
+    sched = Scheduler(queue=queue, merge_key=lambda t: t.metadata.get("target"))
+    nav = Task(name="nav", priority=2, metadata={"target": "kitchen"})
+    sched.add(nav)
+    sched.add(Task(name="medium", priority=5))
+    again = Task(name="nav", priority=8, metadata={"target": "kitchen"})
+
+    assert sched.find_equivalent(again) is nav
+    assert sched.find_equivalent(Task(name="nav", priority=2, metadata={"target": "door"})) is None
+    sched.merge(again, nav)
+    assert nav.priority == 8
+    assert sched.get(again.id) is nav
+
+    picked = sched.pick_next()
+    assert picked is nav
+    picked.transition(LifecycleState.ACTIVE)
+    assert sched.find_equivalent(again) is None  # no longer pending
+    assert sched.pick_next().name == "medium"
+
+    sched.remove(nav.id)
+    assert sched.get(again.id) is None
+
+
+@pytest.mark.parametrize("queue", ["heap", "bucket", "aged"])
+def test_peek_next_matches_pick_next(queue):
+    """peek_next 返回 pick_next 将选出的任务，且不改变队列。"""
+    rng = random.Random(7)
+    if queue == "aged":
+        sched = Scheduler(aging=AgingPolicy(interval=1.0), clock=FakeClock())
+    else:
+        sched = Scheduler(queue=queue)
+    tasks = [Task(name=f"t{i}", priority=rng.randint(0, 10)) for i in range(50)]
+    for t in tasks:
+        sched.add(t)
+    tasks[3].blocked_by.add("missing")  # 被阻塞的任务永远不会被选中
+    tasks[4].transition(LifecycleState.CANCELLED)  # 过期条目
+
+    while (peeked := sched.peek_next()) is not None:
+        assert sched.peek_next() is peeked
+        assert sched.pick_next() is peeked
+    assert sched.pick_next() is None
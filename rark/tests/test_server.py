@@ -105,3 +105,209 @@ async def test_submit_with_metadata(client):
     data = r.json()
     assert data["metadata"]["target"] == "kitchen"
     assert data["priority"] == 7
+
+
+
+async def test_history_reads_persisted_tasks(temp_db):
+    # ASGITransport does not run the lifespan, so drive the runner by hand.
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+    transport = httpx.ASGITransport(app=create_app(runner))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        r = await c.post("/tasks", json={"name": "unregistered", "priority": 4})
+        task_id = r.json()["id"]
+        await asyncio.sleep(0.05)  # let run_loop persist the submission
+
+        r2 = await c.get("/history", params={"name": "unregistered"})
+        assert r2.status_code == 200
+        assert [t["id"] for t in r2.json()] == [task_id]
+
+        r3 = await c.get("/history", params={"state": "cancelled"})
+        assert r3.status_code == 200
+        assert r3.json() == []
+
+    await runner.stop()
+    loop_task.cancel()
+
+
+async def test_blob_metadata_is_inlined_in_responses(temp_db):
+    runner = SkillRunner(db_path=temp_db, blob_threshold=256)
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+    transport = httpx.ASGITransport(app=create_app(runner))
+    cells = list(range(200))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        r = await c.post(
+            "/tasks", json={"name": "unregistered", "metadata": {"map": cells}}
+        )
+        assert r.json()["metadata"]["map"] == cells
+        for _ in range(100):  # history reads the store: Blob handles come back
+            r2 = await c.get("/history", params={"name": "unregistered"})
+            if r2.json():
+                break
+            await asyncio.sleep(0.01)
+        assert [t["metadata"]["map"] for t in r2.json()] == [cells]
+
+    await runner.stop()
+    loop_task.cancel()
+
+
+async def test_threaded_app_routes_through_kernel_thread(temp_db):
+    runner = SkillRunner(db_path=temp_db)
+
+    @runner.skill("instant")
+    async def instant(task: Task) -> None:
+        pass
+
+    app = create_app(runner, threaded=True)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            r = await c.post("/tasks", json={"name": "instant", "priority": 5})
+            assert r.status_code == 201
+            task_id = r.json()["id"]
+
+            for _ in range(100):
+                r2 = await c.get(f"/tasks/{task_id}")
+                if r2.json()["state"] == "completed":
+                    break
+                await asyncio.sleep(0.01)
+            assert r2.json()["state"] == "completed"
+            assert (await c.get("/health")).json()["active_task"] is None
+
+
+async def test_wait_long_polls_until_terminal(temp_db):
+    runner = SkillRunner(db_path=temp_db)
+
+    @runner.skill("instant")
+    async def instant(task: Task) -> None:
+        pass
+
+    @runner.skill("slow")
+    async def slow(task: Task) -> None:
+        await asyncio.sleep(100)
+
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+    transport = httpx.ASGITransport(app=create_app(runner))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        r = await c.post("/tasks", json={"name": "instant", "priority": 5})
+        task_id = r.json()["id"]
+
+        r2 = await c.get(f"/tasks/{task_id}/wait", params={"timeout": 5})
+        assert r2.status_code == 200
+        assert r2.json()["state"] == "completed"
+
+        # 超时后返回当前状态
+        r3 = await c.post("/tasks", json={"name": "slow", "priority": 5})
+        r4 = await c.get(f"/tasks/{r3.json()['id']}/wait", params={"timeout": 0.05})
+        assert r4.status_code == 200
+        assert r4.json()["state"] in ("pending", "active")
+
+        r5 = await c.get("/tasks/missing/wait", params={"timeout": 0})
+        assert r5.status_code == 404
+
+    await runner._queue.join()
+    await runner._cancel_running_skill()
+    await runner.stop()
+    loop_task.cancel()
+
+
+async def test_change_feed_and_etags(temp_db):
+    runner = SkillRunner(db_path=temp_db)
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+    transport = httpx.ASGITransport(app=create_app(runner))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        r = await c.post("/tasks", json={"name": "unregistered", "priority": 4})
+        task_id = r.json()["id"]
+        await asyncio.sleep(0.05)  # let run_loop persist the submission
+
+        feed = (await c.get("/tasks/changes")).json()
+        assert task_id in [t["id"] for t in feed["tasks"]]
+        empty = (await c.get("/tasks/changes", params={"since": feed["seq"]})).json()
+        assert empty == {"seq": feed["seq"], "tasks": []}
+
+        r1 = await c.get(f"/tasks/{task_id}")
+        etag = r1.headers["etag"]
+        r2 = await c.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+        assert r2.status_code == 304
+        assert r2.content == b""
+
+        listed = await c.get("/tasks")
+        assert listed.json()[0]["id"] == task_id
+        same = await c.get("/tasks", headers={"If-None-Match": listed.headers["etag"]})
+        assert same.status_code == 304
+
+        await c.post("/tasks", json={"name": "unregistered", "priority": 1})
+        changed = await c.get("/tasks", headers={"If-None-Match": listed.headers["etag"]})
+        assert changed.status_code == 200
+        assert len(changed.json()) == 2
+
+    await runner._queue.join()
+    await runner.stop()
+    loop_task.cancel()
+
+
+async def test_submit_rate_limited_with_retry_after(temp_db):
+    from rark import AdmissionPolicy
+
+    runner = SkillRunner(db_path=temp_db, admission=AdmissionPolicy(rate=0.5, burst=1))
+    transport = httpx.ASGITransport(app=create_app(runner))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        headers = {"X-Client-Id": "planner"}
+        r1 = await c.post("/tasks", json={"name": "instant"}, headers=headers)
+        assert r1.status_code == 201
+        r2 = await c.post("/tasks", json={"name": "instant"}, headers=headers)
+        assert r2.status_code == 429
+        assert r2.headers["retry-after"] == "2"
+        r3 = await c.post("/tasks", json={"name": "instant"}, headers={"X-Client-Id": "ui"})
+        assert r3.status_code == 201
+        r4 = await c.post("/interrupt", json={"name": "instant"}, headers=headers)
+        assert r4.status_code == 201
+
+
+async def test_submit_retry_with_idempotency_key(client):
+    body = {"name": "instant", "priority": 5, "idempotency_key": "plan-42/step-1"}
+    r1 = await client.post("/tasks", json=body)
+    r2 = await client.post("/tasks", json=body)
+    assert r1.status_code == r2.status_code == 201
+    assert r2.json()["id"] == r1.json()["id"]
+    assert len((await client.get("/tasks")).json()) == 1
+
+
+async def test_result_streams_in_chunks(temp_db):
+    runner = SkillRunner(db_path=temp_db)
+    scan = bytes(range(256)) * 1024  # 256 KiB，多个分块
+
+    @runner.skill("scan_room")
+    async def scan_room(task: Task) -> bytes:
+        return scan
+
+    @runner.skill("instant")
+    async def instant(task: Task) -> None:
+        pass
+
+    await runner.start()
+    loop_task = asyncio.create_task(runner.run_loop())
+    transport = httpx.ASGITransport(app=create_app(runner))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        r = await c.post("/tasks", json={"name": "scan_room", "priority": 5})
+        task_id = r.json()["id"]
+        await c.get(f"/tasks/{task_id}/wait", params={"timeout": 5})
+
+        r2 = await c.get(f"/tasks/{task_id}/result")
+        assert r2.status_code == 200
+        assert r2.headers["content-type"] == "application/octet-stream"
+        assert r2.headers["content-length"] == str(len(scan))
+        assert r2.content == scan
+        assert "result" not in (await c.get(f"/tasks/{task_id}")).json()  # 任务行保持精简
+
+        r3 = await c.post("/tasks", json={"name": "instant", "priority": 5})
+        await c.get(f"/tasks/{r3.json()['id']}/wait", params={"timeout": 5})
+        assert (await c.get(f"/tasks/{r3.json()['id']}/result")).status_code == 404
+
+    await runner._queue.join()
+    await runner.stop()
+    loop_task.cancel()
@@ -0,0 +1,316 @@
+import asyncio
+import json
+
+import pytest
+
+from rark.core.task import Task
+from rark.persistence.blobs import Blob
+from rark.core.transitions import LifecycleState
+from rark.persistence.sqlite_store import (
+    RESULT_CHUNK,
+    WRITE_BACKGROUND,
+    WRITE_KERNEL,
+    SQLiteStore,
+)
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+async def test_reads_do_not_wait_for_writer(temp_db):
+    """读连接池独立于写连接：写锁被占用时查询仍能完成。"""
+    store = SQLiteStore(temp_db)
+    await store.open()
+    await store.upsert(Task(name="persisted", priority=5))
+
+    async with store._writer(WRITE_BACKGROUND):
+        rows = await asyncio.wait_for(store.query(), timeout=1.0)
+        assert [t.name for t in rows] == ["persisted"]
+
+    await store.close()
+
+
+async def test_kernel_writes_jump_background_writes(temp_db):
+    """写锁释放时，排队的 kernel 写优先于先到的后台写。"""
+    store = SQLiteStore(temp_db)
+    await store.open()
+    order = []
+
+    async def write(priority: int, label: str) -> None:
+        async with store._writer(priority):
+            order.append(label)
+
+    async with store._writer(WRITE_KERNEL):
+        background = asyncio.create_task(write(WRITE_BACKGROUND, "background"))
+        await asyncio.sleep(0)
+        kernel = asyncio.create_task(write(WRITE_KERNEL, "kernel"))
+        await asyncio.sleep(0)
+
+    await asyncio.gather(background, kernel)
+    assert order == ["kernel", "background"]
+
+    await store.close()
+
+
+async def test_memory_store_reads_through_writer():
+    store = SQLiteStore(":memory:")
+    await store.open()
+    await store.upsert(Task(name="in_memory", priority=5))
+
+    assert [t.name for t in await store.load_all()] == ["in_memory"]
+
+    await store.close()
+
+
+async def test_batch_defers_upserts_until_exit(temp_db):
+    """batch() 内的写入在退出时一次提交，每个任务取调用时的最新快照。"""
+    store = SQLiteStore(temp_db)
+    await store.open()
+    task = Task(name="batched", priority=5)
+
+    async with store.batch():
+        await store.upsert(task)
+        task.transition(LifecycleState.ACTIVE)
+        await store.upsert(task)
+        task.transition(LifecycleState.COMPLETED)  # 未再 upsert，不应写入
+        assert await store.load_all() == []
+
+    [loaded] = await store.load_all()
+    assert loaded.state == LifecycleState.ACTIVE
+
+    await store.close()
+
+
+async def test_changes_feed_returns_rows_after_seq(temp_db):
+    """每次 upsert 分配递增 seq；changes(since) 只返回之后变更的行。"""
+    store = SQLiteStore(temp_db)
+    await store.open()
+    a, b = Task(name="a", priority=1), Task(name="b", priority=2)
+    await store.upsert(a)
+    await store.upsert(b)
+    mark = (await store.changes())[-1][0]
+
+    a.transition(LifecycleState.ACTIVE)
+    await store.upsert(a)
+    changes = await store.changes(since=mark)
+    assert [(seq, t.id, t.state) for seq, t in changes] == [
+        (mark + 1, a.id, LifecycleState.ACTIVE)
+    ]
+    assert [t.name for _, t in await store.changes()] == ["b", "a"]
+    assert await store.changes(since=mark + 1) == []
+    await store.close()
+
+    reopened = SQLiteStore(temp_db)
+    await reopened.open()
+    await reopened.upsert(b)  # 重启后从已提交的最大 seq 继续
+    assert [seq for seq, _ in await reopened.changes(since=mark + 1)] == [mark + 2]
+    await reopened.close()
+
+
+async def test_open_adds_seq_column_to_old_database(temp_db):
+    import aiosqlite
+
+    async with aiosqlite.connect(temp_db) as db:
+        await db.execute(
+            "CREATE TABLE tasks (id TEXT PRIMARY KEY, name TEXT NOT NULL, "
+            "priority INTEGER NOT NULL, state TEXT NOT NULL, created_at TEXT NOT NULL, "
+            "updated_at TEXT NOT NULL, metadata TEXT NOT NULL DEFAULT '{}', "
+            "blocked_by TEXT NOT NULL DEFAULT '[]')"
+        )
+        await db.execute(
+            "INSERT INTO tasks VALUES ('old', 'legacy', 1, 'completed', "
+            "'2026-01-01T00:00:00+00:00', '2026-01-01T00:00:00+00:00', '{}', '[]')"
+        )
+        await db.commit()
+
+    store = SQLiteStore(temp_db)
+    await store.open()
+    assert [t.id for _, t in await store.changes()] == []  # 旧行 seq 为 0
+    task = Task(name="new", priority=1)
+    await store.upsert(task)
+    assert [(seq, t.id) for seq, t in await store.changes()] == [(1, task.id)]
+    assert len(await store.load_all()) == 2
+    await store.close()
+
+
+async def test_results_are_chunked_and_round_trip(temp_db):
+    """结果按 RESULT_CHUNK 分块存储；bytes、str 与 JSON 值原样读回。"""
+    store = SQLiteStore(temp_db)
+    await store.open()
+    blob = bytes(range(256)) * (RESULT_CHUNK // 128 + 1)  # 超过两块
+
+    await store.put_result("a", blob)
+    await store.put_result("b", "水已倒好")
+    async with store.batch():
+        await store.put_result("c", {"ml": 250, "ok": True})
+        assert await store.load_result("c") == {"ml": 250, "ok": True}  # 提交前即可读
+    assert await store._db.execute_fetchall("SELECT 1 FROM results WHERE task_id = 'c'")
+    with pytest.raises(TypeError):
+        await store.put_result("d", object())
+
+    content_type, size, chunks = await store.result_info("a")
+    assert (content_type, size, chunks) == ("application/octet-stream", len(blob), 3)
+    assert len(await store.read_result_chunk("a", 0)) == RESULT_CHUNK
+    assert await store.load_result("a") == blob
+    assert await store.load_result("b") == "水已倒好"
+    assert await store.load_result("c") == {"ml": 250, "ok": True}
+    assert await store.load_result("d") is None
+    assert await store.result_info("d") is None
+
+    await store.close()
+
+
+async def test_large_metadata_values_go_to_blob_store(temp_db):
+    """超过阈值的 metadata 值按内容哈希存为 blob，任务行只保留引用；相同内容只存一份。"""
+    store = SQLiteStore(temp_db, blob_threshold=1024)
+    await store.open()
+    cloud = [[i * 0.01, i * 0.02, i * 0.03] for i in range(1000)]
+    first = Task(name="scan_room", priority=5, metadata={"cloud": cloud, "room": "kitchen"})
+    second = Task(name="plan_path", priority=5, metadata={"cloud": cloud})
+
+    await store.upsert(first)
+    async with store.batch():
+        await store.upsert(second)
+
+    rows = await store._db.execute_fetchall("SELECT metadata FROM tasks")
+    assert all(len(metadata) < 200 for (metadata,) in rows)
+    assert len(list(store._blobs.digests())) == 1
+    loaded = {t.name: t for t in await store.load_all()}
+    handle = loaded["scan_room"].metadata["cloud"]
+    assert isinstance(handle, Blob) and handle.value() == cloud
+    assert loaded["scan_room"].metadata["room"] == "kitchen"
+    assert (await store.get(second.id)).metadata == {"cloud": handle}
+    assert loaded["plan_path"].metadata["cloud"] is handle  # 同一内容共享一个句柄
+
+    [digest] = store._blobs.digests()
+    with store._blobs.open(digest) as view:
+        assert view.readonly and json.loads(bytes(view)) == cloud
+
+    await store.close()
+
+
+async def test_unchanged_blob_handles_are_not_reencoded(temp_db, monkeypatch):
+    """读回的 Blob 句柄惰性加载；原样写回只写引用，不重新编码、哈希或写文件。"""
+    store = SQLiteStore(temp_db, blob_threshold=1024)
+    await store.open()
+    cloud = Blob([[i * 0.01, i * 0.02] for i in range(1000)])
+    task = Task(name="scan_room", priority=5, metadata={"cloud": cloud})
+    await store.upsert(task)
+    [loaded] = await store.load_all()
+    assert loaded.metadata["cloud"] is cloud  # 存活的句柄被复用
+    await store.close()
+
+    store = SQLiteStore(temp_db, blob_threshold=1024)
+    await store.open()
+    [loaded] = await store.load_all()
+    handle = loaded.metadata["cloud"]
+    assert handle == cloud and handle._data is None  # 尚未读取文件
+
+    def fail(*args):
+        raise AssertionError("re-encoded")
+
+    monkeypatch.setattr("rark.persistence.blobs.BlobStore.digest", fail)
+    monkeypatch.setattr("rark.persistence.blobs.BlobStore.write", fail)
+    monkeypatch.setattr(Blob, "_from_json", fail)
+    loaded.transition(LifecycleState.ACTIVE)
+    loaded.metadata["stage"] = 1
+    await store.upsert(loaded)
+    async with store.batch():
+        await store.upsert(loaded)
+    monkeypatch.undo()
+
+    with handle.view() as view:
+        assert view.readonly and json.loads(bytes(view)) == cloud.value()
+    assert await store.collect_blobs(min_age=0) == 0  # 句柄仍存活：blob 保留
+    [reloaded] = await store.load_all()
+    assert reloaded.metadata == {"cloud": cloud, "stage": 1}
+    await store.close()
+
+
+async def test_writes_commit_in_snapshot_order_across_blob_writes(temp_db):
+    """需写 blob 的 batch 刷写期间，同一任务的直接 upsert 排在其后提交：新快照不被旧行覆盖。"""
+    store = SQLiteStore(temp_db, blob_threshold=1024)
+    await store.open()
+    task = Task(name="scan_room", priority=5, metadata={"cloud": list(range(2000))})
+
+    async def flush_stale_snapshot() -> None:
+        async with store.batch():
+            await store.upsert(task)
+
+    async def upsert_newer_after_first_yield() -> None:
+        await asyncio.sleep(0)  # batch 已在写锁内写 blob
+        task.metadata = {"stage": "planned"}
+        task.transition(LifecycleState.ACTIVE)
+        await store.upsert(task)
+
+    await asyncio.gather(flush_stale_snapshot(), upsert_newer_after_first_yield())
+    [loaded] = await store.load_all()
+    assert (loaded.state, loaded.metadata) == (LifecycleState.ACTIVE, {"stage": "planned"})
+    assert [(seq, t.state) for seq, t in await store.changes()] == [
+        (2, LifecycleState.ACTIVE)  # 后提交的新快照取得更大的 seq
+    ]
+    await store.close()
+
+
+@pytest.mark.parametrize(
+    "metadata_format, metadata_codec",
+    [("json", "zlib"), ("json", "zlib-dict"), ("msgpack", None), ("msgpack", "zlib-dict")],
+)
+async def test_metadata_codecs_round_trip(temp_db, metadata_format, metadata_codec):
+    """压缩/二进制格式的 metadata 带格式标记存储；不同设置写入的行可以混合读取。"""
+    store = SQLiteStore(
+        temp_db, metadata_format=metadata_format, metadata_codec=metadata_codec
+    )
+    await store.open()
+    waypoints = [{"x": i, "y": i * 2, "stage": "wipe"} for i in range(200)]
+    big = Task(name="wipe_table", priority=5, metadata={"waypoints": waypoints})
+    small = Task(name="wipe_table", priority=5, metadata={"stage": 1})
+    await store.upsert(big)
+    async with store.batch():
+        await store.upsert(small)
+    raw = dict(await store._db.execute_fetchall("SELECT id, metadata FROM tasks"))
+    assert isinstance(raw[big.id], bytes)
+    if metadata_codec is not None:
+        assert len(raw[big.id]) < len(json.dumps(waypoints)) / 4
+    if metadata_format == "json":
+        assert raw[small.id] == '{"stage": 1}'  # 低于阈值：仍是 JSON 文本
+    await store.close()
+
+    # 以默认设置重新打开：字典从库中加载，旧行照常读取
+    reopened = SQLiteStore(temp_db)
+    await reopened.open()
+    loaded = {t.id: t.metadata for t in await reopened.load_all()}
+    assert loaded == {big.id: {"waypoints": waypoints}, small.id: {"stage": 1}}
+    await reopened.close()
+
+
+async def test_compression_dictionary_commits_with_a_row_using_it(temp_db, monkeypatch):
+    """首个使用新字典的写入失败时，字典随之后引用它的行一起提交，重启后仍可解码。"""
+    store = SQLiteStore(temp_db, blob_threshold=8192, metadata_codec="zlib-dict")
+    await store.open()
+    waypoints = [{"x": i, "y": i * 2} for i in range(100)]  # 内联且超过压缩阈值
+    first = Task(
+        name="wipe_table",
+        priority=5,
+        metadata={"waypoints": waypoints, "map": list(range(5000))},
+    )
+
+    def disk_full(self, blobs):
+        raise OSError("no space left on device")
+
+    monkeypatch.setattr("rark.persistence.blobs.BlobStore.write", disk_full)
+    with pytest.raises(OSError):
+        await store.upsert(first)  # 创建了字典，但这次写入没有提交
+    monkeypatch.undo()
+    second = Task(name="wipe_table", priority=5, metadata={"waypoints": waypoints})
+    async with store.batch():
+        await store.upsert(second)
+    await store.close()
+
+    reopened = SQLiteStore(temp_db, blob_threshold=8192)
+    await reopened.open()
+    [loaded] = await reopened.load_all()
+    assert loaded.metadata == {"waypoints": waypoints}
+    await reopened.close()